@@ -0,0 +1,75 @@
+"""
+Benchmark: `LGBMRegressor.predict` vs the NumPy-only `CompiledTrees.predict`.
+
+Run from phase-1/:
+    python -m benchmarks.compiled_trees --rows 1 1000 1000000
+"""
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import load
+
+from src.inference_pipeline.compiled_trees import CompiledTrees
+from src.inference_pipeline.inference import DEFAULT_MODEL, PROJECT_ROOT
+from src.storage import read_table
+
+DEFAULT_DATA = PROJECT_ROOT / "data" / "processed" / "feature_engineered_holdout"
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(model_path: str, data_path: str, row_counts: list[int], repeat: int, seed: int = 42):
+    t0 = time.perf_counter()
+    model = load(model_path)
+    load_lgbm = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    compiled = CompiledTrees.from_model(model)
+    export_s = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = compiled.save(Path(tmp) / "trees.npz")
+        t0 = time.perf_counter()
+        compiled = CompiledTrees.load(path)
+        load_compiled = time.perf_counter() - t0
+
+    print(f"Trees: {compiled.n_trees}  nodes: {len(compiled.feature)}  max depth: {compiled.max_depth}")
+    print(f"Unpickle LGBM model (incl. lightgbm/sklearn import): {load_lgbm * 1000:.1f}ms")
+    print(f"Load compiled .npz: {load_compiled * 1000:.1f}ms   export: {export_s * 1000:.1f}ms")
+
+    base = read_table(data_path)
+    base = base.drop(columns=["price"], errors="ignore")
+    rng = np.random.default_rng(seed)
+
+    print(f"{'rows':>10} {'lightgbm':>12} {'compiled':>12} {'ratio':>8} {'max |diff|':>12}")
+    for n in row_counts:
+        X = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        X_np = X.to_numpy(dtype=np.float64)
+        runs = repeat if n < 100_000 else 1
+        lgbm_s = _best_of(lambda: model.predict(X), runs)
+        compiled_s = _best_of(lambda: compiled.predict(X_np), runs)
+        diff = float(np.max(np.abs(model.predict(X) - compiled.predict(X_np))))
+        print(f"{n:>10} {lgbm_s * 1000:>10.2f}ms {compiled_s * 1000:>10.2f}ms {lgbm_s / compiled_s:>7.2f}x {diff:>12.3g}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiled tree predictor benchmark.")
+    parser.add_argument("--model", type=str, default=str(DEFAULT_MODEL))
+    parser.add_argument("--data", type=str, default=str(DEFAULT_DATA), help="Feature-engineered table to sample rows from")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 1_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.model, args.data, args.rows, args.repeat)
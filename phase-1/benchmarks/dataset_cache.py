@@ -0,0 +1,70 @@
+"""
+Benchmark: per-fit LightGBM setup, pandas frame vs the cached binned Dataset.
+
+Resamples the feature-engineered train table to N rows and times
+  - Dataset construction from the frame (what every `LGBMRegressor.fit` pays),
+  - loading the saved binary Dataset (a later train / tune process),
+  - T short "trials" with `LGBMRegressor.fit` vs `fit_regressor` on one shared Dataset.
+
+Run from phase-1/:
+    python -m benchmarks.dataset_cache --rows 1000000 --trials 5
+"""
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+
+import lightgbm as lgb
+import numpy as np
+from lightgbm import LGBMRegressor
+
+from src.storage import read_table
+from src.training_pipeline.dataset_cache import _dataset_params, binned_dataset, fit_regressor
+from src.training_pipeline.train import DEFAULT_TRAIN
+
+
+def run(train_path: str, n_rows: int, n_trials: int, n_estimators: int, seed: int = 42):
+    base = read_table(train_path)
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    X, y = df.drop(columns=["price"]), df["price"]
+    params = {"n_estimators": n_estimators, "random_state": seed, "n_jobs": -1, "verbosity": -1}
+    print(f"Rows: {n_rows:,}  features: {X.shape[1]}  trials: {n_trials}  trees/trial: {n_estimators}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        train_set = binned_dataset(X, y, params, cache_dir=tmp)
+        build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        binned_dataset(X, y, params, cache_dir=tmp)
+        load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    lgb.Dataset(X, label=y, params=_dataset_params(params)).construct()
+    construct_s = time.perf_counter() - t0
+    print(f"Dataset from frame: {construct_s:.2f}s   build + save: {build_s:.2f}s   "
+          f"load cached (incl. hashing the frame): {load_s:.2f}s")
+
+    trial_params = [{**params, "num_leaves": int(n), "min_child_samples": int(m)}
+                    for n, m in zip(rng.integers(31, 256, n_trials), rng.integers(10, 61, n_trials))]
+    t0 = time.perf_counter()
+    for p in trial_params:
+        LGBMRegressor(**p).fit(X, y)
+    frame_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for p in trial_params:
+        fit_regressor(p, train_set)
+    cached_s = time.perf_counter() - t0
+    print(f"{n_trials} trials: LGBMRegressor.fit {frame_s:.2f}s   shared Dataset {cached_s:.2f}s   "
+          f"({(frame_s - cached_s) / n_trials:.2f}s setup saved per trial)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binned Dataset cache benchmark.")
+    parser.add_argument("--train", type=str, default=str(DEFAULT_TRAIN))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--n_estimators", type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.train, args.rows, args.trials, args.n_estimators)
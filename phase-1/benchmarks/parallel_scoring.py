@@ -0,0 +1,65 @@
+"""
+Benchmark: batch-scoring throughput of `predict_stream` vs number of worker processes.
+
+Run from phase-1/:
+    python -m benchmarks.parallel_scoring --input data/raw/holdout --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.inference_pipeline.inference import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_FREQ_ENCODER,
+    DEFAULT_MODEL,
+    DEFAULT_TARGET_ENCODER,
+    TRAIN_FE_PATH,
+    predict_stream,
+)
+
+
+def run(input_path: str, worker_counts: list[int], chunksize: int, artifacts: dict):
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            out = Path(tmp) / f"preds_{workers}.csv"
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                n_rows = predict_stream(input_path, out, chunksize=chunksize, workers=workers, **artifacts)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {n_rows / elapsed:>12,.0f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Parallel batch-scoring throughput benchmark.")
+    parser.add_argument("--input", type=str, required=True, help="RAW table (CSV or Parquet) to score")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, *[w for w in (2, 4, 8, 16, 32) if w <= cores], cores}))
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE // 4)
+    parser.add_argument("--model", type=str, default=str(DEFAULT_MODEL))
+    parser.add_argument("--freq_encoder", type=str, default=str(DEFAULT_FREQ_ENCODER))
+    parser.add_argument("--target_encoder", type=str, default=str(DEFAULT_TARGET_ENCODER))
+    parser.add_argument("--train_features", type=str, default=str(TRAIN_FE_PATH))
+    args = parser.parse_args()
+
+    run(
+        args.input,
+        args.workers,
+        args.chunksize,
+        dict(
+            model_path=args.model,
+            freq_encoder_path=args.freq_encoder,
+            target_encoder_path=args.target_encoder,
+            train_features_path=args.train_features,
+        ),
+    )
@@ -0,0 +1,85 @@
+"""
+Microbenchmark: single-record latency of `predict` vs the compiled `RowPlan` fast path.
+
+Run from phase-1/:
+    python -m benchmarks.row_plan --input data/processed/cleaning_holdout
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.inference_pipeline.inference import (
+    DEFAULT_FREQ_ENCODER,
+    DEFAULT_MODEL,
+    DEFAULT_TARGET_ENCODER,
+    TRAIN_FE_PATH,
+    predict,
+)
+from src.inference_pipeline.registry import ARTIFACT_REGISTRY
+from src.inference_pipeline.row_plan import compile_row_plan, predict_record
+from src.storage import read_table
+
+
+def _percentiles(samples_s: list[float]) -> str:
+    ms = np.asarray(samples_s) * 1000
+    return f"p50={np.percentile(ms, 50):.3f}ms  p99={np.percentile(ms, 99):.3f}ms"
+
+
+def run(input_path: str, n_records: int, model: str, freq_encoder: str, target_encoder: str, train_features: str):
+    bundle = ARTIFACT_REGISTRY.get(model, freq_encoder, target_encoder, train_features)
+    if compile_row_plan(bundle) is None:
+        raise SystemExit("Row plan needs the training feature schema (--train_features).")
+
+    raw = read_table(input_path).head(n_records)
+    # JSON round-trip so records look exactly like API Gateway payloads
+    records = json.loads(raw.to_json(orient="records"))
+
+    slow, fast, mismatches, fallbacks, rejected = [], [], 0, 0, 0
+    for record in records:
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):  # pipeline prints per call
+                expected = predict(pd.DataFrame([record]), bundle=bundle)
+        except ValueError:
+            rejected += 1  # e.g. null features: the API answers 400 on both paths
+            continue
+        t1 = time.perf_counter()
+        got = predict_record(record, bundle)
+        t2 = time.perf_counter()
+
+        if got is None:
+            fallbacks += 1
+            continue
+        slow.append(t1 - t0)
+        fast.append(t2 - t1)
+        if expected.empty or got[0] != float(expected["predicted_price"].iloc[0]):
+            mismatches += 1
+
+    print(
+        f"Records: {len(records)}  fast-path: {len(fast)}  fallbacks: {fallbacks}  "
+        f"rejected: {rejected}  mismatches: {mismatches}"
+    )
+    if fast:
+        print(f"predict   : {_percentiles(slow)}")
+        print(f"row plan  : {_percentiles(fast)}")
+        print(f"speedup p50: {np.median(slow) / np.median(fast):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-record inference latency benchmark.")
+    parser.add_argument("--input", type=str, required=True, help="RAW (or cleaned) table to draw records from")
+    parser.add_argument("--n", type=int, default=500, help="Number of records to score")
+    parser.add_argument("--model", type=str, default=str(DEFAULT_MODEL))
+    parser.add_argument("--freq_encoder", type=str, default=str(DEFAULT_FREQ_ENCODER))
+    parser.add_argument("--target_encoder", type=str, default=str(DEFAULT_TARGET_ENCODER))
+    parser.add_argument("--train_features", type=str, default=str(TRAIN_FE_PATH))
+    args = parser.parse_args()
+
+    run(args.input, args.n, args.model, args.freq_encoder, args.target_encoder, args.train_features)
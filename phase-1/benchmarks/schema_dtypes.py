@@ -0,0 +1,69 @@
+"""
+Benchmark: default parser dtypes vs the compact schema (`src.schema`).
+
+Writes the feature-engineered train/eval tables as CSV, reads them back with and
+without the schema, and reports frame memory, parse time and the eval metrics of a
+LightGBM model trained on each — the metrics should match to within noise.
+
+Run from phase-1/:
+    python -m benchmarks.schema_dtypes --n_estimators 200
+"""
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from lightgbm import LGBMRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.schema import TARGET
+from src.storage import read_table, write_table
+from src.training_pipeline.train import DEFAULT_EVAL, DEFAULT_TRAIN
+
+
+def _fit_and_score(train_df, eval_df, n_estimators: int, seed: int) -> dict[str, float]:
+    model = LGBMRegressor(n_estimators=n_estimators, learning_rate=0.05, num_leaves=64,
+                          random_state=seed, n_jobs=-1, verbosity=-1)
+    model.fit(train_df.drop(columns=[TARGET]), train_df[TARGET])
+    y_pred = model.predict(eval_df.drop(columns=[TARGET]))
+    y_eval = eval_df[TARGET]
+    return {
+        "mae": float(mean_absolute_error(y_eval, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_eval, y_pred))),
+        "r2": float(r2_score(y_eval, y_pred)),
+    }
+
+
+def run(train_path: str, eval_path: str, n_estimators: int, seed: int = 42):
+    with tempfile.TemporaryDirectory() as tmp:
+        train_csv = write_table(read_table(train_path), Path(tmp) / "train", fmt="csv")
+        eval_csv = write_table(read_table(eval_path), Path(tmp) / "eval", fmt="csv")
+
+        results = {}
+        for label, compact in (("default", False), ("compact", True)):
+            t0 = time.perf_counter()
+            train_df = read_table(train_csv, compact=compact)
+            parse_s = time.perf_counter() - t0
+            eval_df = read_table(eval_csv, compact=compact)
+            memory = train_df.memory_usage(deep=True).sum() / 2**20
+            metrics = _fit_and_score(train_df, eval_df, n_estimators, seed)
+            results[label] = (memory, metrics)
+            print(f"{label:8s}: train frame {memory:8.2f} MB  parse {parse_s:6.3f}s  "
+                  f"MAE={metrics['mae']:.2f}  RMSE={metrics['rmse']:.2f}  R²={metrics['r2']:.4f}")
+
+    (mem_default, m_default), (mem_compact, m_compact) = results["default"], results["compact"]
+    rel_mae = abs(m_compact["mae"] - m_default["mae"]) / m_default["mae"]
+    print(f"memory   : {mem_default / mem_compact:.2f}x smaller   MAE change {rel_mae:.4%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact dtype schema benchmark.")
+    parser.add_argument("--train", type=str, default=str(DEFAULT_TRAIN))
+    parser.add_argument("--eval", type=str, default=str(DEFAULT_EVAL))
+    parser.add_argument("--n_estimators", type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.train, args.eval, args.n_estimators)
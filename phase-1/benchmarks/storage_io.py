@@ -0,0 +1,63 @@
+"""
+Benchmark: CSV vs Parquet for the pipeline's intermediate tables.
+
+Resamples a table to N rows, then times write, full read and a projected read
+(a few columns, what schema checks / eval need) through `src.storage`.
+
+Run from phase-1/:
+    python -m benchmarks.storage_io --input data/processed/feature_engineered_train --rows 1000000
+"""
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.storage import SUFFIXES, read_table, write_table
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(input_path: str, n_rows: int, n_columns: int, repeat: int, seed: int = 42):
+    base = read_table(input_path)
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    projection = list(df.columns[:n_columns])
+    print(f"Rows: {n_rows:,}  columns: {df.shape[1]}  projected read: {n_columns} columns")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in SUFFIXES:
+            stem = Path(tmp) / "table"
+            write_s = _best_of(lambda: write_table(df, stem, fmt=fmt), repeat)
+            path = stem.with_suffix(SUFFIXES[fmt])
+            read_s = _best_of(lambda: read_table(path), repeat)
+            project_s = _best_of(lambda: read_table(path, columns=projection), repeat)
+            results[fmt] = (write_s, read_s, project_s, path.stat().st_size / 2**20)
+            print(f"{fmt:8s}: write {write_s:6.2f}s  read {read_s:6.2f}s  "
+                  f"projected read {project_s:6.3f}s  size {results[fmt][3]:8.1f} MB")
+
+    csv, parquet = results["csv"], results["parquet"]
+    print(f"speedup  : write {csv[0] / parquet[0]:.1f}x  read {csv[1] / parquet[1]:.1f}x  "
+          f"projected read {csv[2] / parquet[2]:.1f}x  size {csv[3] / parquet[3]:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intermediate table I/O benchmark.")
+    parser.add_argument("--input", type=str, required=True, help="Table (CSV or Parquet) to resample rows from")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to write / read")
+    parser.add_argument("--columns", type=int, default=5, help="Columns in the projected read")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.input, args.rows, args.columns, args.repeat)
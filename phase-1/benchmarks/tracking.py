@@ -0,0 +1,92 @@
+"""
+Benchmark: per-trial MLflow tracking time, synchronous calls vs the background TrialLogger.
+
+Logs N trial runs (tuning-sized params + metrics) to a fresh file-based tracking store
+  - synchronously, as tuning used to: `start_run(nested=True)` + `log_params` + `log_metrics`,
+  - through `TrialLogger.log_run` (tune.py), which only enqueues,
+with `--trial_ms` of simulated training between runs, and reports the time spent in
+tracking calls per trial plus the final flush.
+
+Run from phase-1/:
+    python -m benchmarks.tracking --trials 100 --trial_ms 50
+"""
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import mlflow
+import numpy as np
+
+from src.training_pipeline.tracking import TrialLogger
+
+
+def _trial(rng: np.random.Generator) -> tuple[dict, dict]:
+    params = {
+        "n_estimators": int(rng.integers(300, 900)),
+        "learning_rate": float(rng.uniform(0.01, 0.3)),
+        "num_leaves": int(rng.integers(31, 255)),
+        "max_depth": int(rng.integers(-1, 12)),
+        "subsample": float(rng.uniform(0.5, 1.0)),
+        "colsample_bytree": float(rng.uniform(0.5, 1.0)),
+        "min_child_samples": int(rng.integers(10, 60)),
+        "reg_alpha": float(rng.uniform(1e-8, 10.0)),
+        "reg_lambda": float(rng.uniform(1e-8, 10.0)),
+        "random_state": 42,
+        "n_jobs": -1,
+        "verbosity": -1,
+        "metric": "rmse",
+        "train_fraction": 1.0,
+    }
+    metrics = {"rmse": float(rng.uniform(1e4, 2e4)), "mae": float(rng.uniform(4e3, 6e3)), "r2": 0.99}
+    return params, metrics
+
+
+def run(n_trials: int, trial_ms: float, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    trials = [_trial(rng) for _ in range(n_trials)]
+    print(f"Trials: {n_trials}  simulated training: {trial_ms:.0f} ms/trial  store: file")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mlflow.set_tracking_uri(Path(tmp).as_uri())
+
+        mlflow.set_experiment("sync")
+        in_loop = 0.0
+        t_start = time.perf_counter()
+        for params, metrics in trials:
+            time.sleep(trial_ms / 1000)
+            t0 = time.perf_counter()
+            with mlflow.start_run(nested=True):
+                mlflow.log_params(params)
+                mlflow.log_metrics(metrics)
+            in_loop += time.perf_counter() - t0
+        sync_total = time.perf_counter() - t_start
+        sync_ms = 1000 * in_loop / n_trials
+        print(f"sync      : {sync_ms:7.2f} ms/trial in tracking calls   total {sync_total:6.2f}s")
+
+        experiment = mlflow.set_experiment("async")
+        t_start = time.perf_counter()
+        logger = TrialLogger(experiment.experiment_id, Path(tmp).as_uri())
+        for i, (params, metrics) in enumerate(trials):
+            time.sleep(trial_ms / 1000)
+            logger.log_run(params, metrics, run_name=f"trial-{i}")
+        t0 = time.perf_counter()
+        logger.close()
+        flush_s = time.perf_counter() - t0
+        async_total = time.perf_counter() - t_start
+        async_ms = 1000 * logger.in_loop_seconds / n_trials
+        print(f"background: {async_ms:7.2f} ms/trial in tracking calls   total {async_total:6.2f}s "
+              f"(final flush {flush_s:.2f}s, {logger.n_logged} runs, {logger.n_failed} failed)")
+
+    print(f"in-loop tracking time: {sync_ms / max(async_ms, 1e-9):.0f}x lower")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background MLflow trial logging benchmark.")
+    parser.add_argument("--trials", type=int, default=100)
+    parser.add_argument("--trial_ms", type=float, default=50.0, help="Simulated training time per trial")
+    args = parser.parse_args()
+
+    run(args.trials, args.trial_ms)
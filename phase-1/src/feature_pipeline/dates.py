@@ -0,0 +1,60 @@
+"""
+Date parsing + year/quarter/month features, computed once per distinct date.
+
+- The data is monthly: millions of rows carry only a few hundred distinct dates, so
+  dates are factorized, the uniques are parsed with an explicit DATE_FORMAT and the
+  results are broadcast back through the codes.
+- Values that do not match DATE_FORMAT fall back to pandas' format inference
+  (same result as a plain `pd.to_datetime`).
+- Shared by load, feature engineering and the inference paths.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%Y-%m-%d"
+DATE_PARTS = ("year", "quarter", "month")
+
+
+def _parse_uniques(values) -> pd.DatetimeIndex:
+    try:
+        return pd.DatetimeIndex(pd.to_datetime(values, format=DATE_FORMAT))
+    except (ValueError, TypeError):
+        return pd.DatetimeIndex(pd.to_datetime(values))
+
+
+def date_features(dates: pd.Series) -> tuple[pd.Series, dict[str, np.ndarray]]:
+    """(parsed dates, {year/quarter/month: values}) with the parsing done per distinct value."""
+    codes, uniques = pd.factorize(dates, use_na_sentinel=False)
+    if not isinstance(uniques, pd.DatetimeIndex):
+        uniques = np.asarray(uniques, dtype=object)
+    parsed = _parse_uniques(uniques)
+    parts = {part: np.asarray(getattr(parsed, part)).take(codes) for part in DATE_PARTS}
+    return pd.Series(parsed.take(codes), index=dates.index, name=dates.name), parts
+
+
+def parse_dates(dates: pd.Series) -> pd.Series:
+    """`pd.to_datetime(dates)`, parsing each distinct value once."""
+    if pd.api.types.is_datetime64_dtype(dates):
+        return dates
+    codes, uniques = pd.factorize(dates, use_na_sentinel=False)
+    parsed = _parse_uniques(np.asarray(uniques, dtype=object))
+    return pd.Series(parsed.take(codes), index=dates.index, name=dates.name)
+
+
+@lru_cache(maxsize=4096)
+def date_parts_of(value: str) -> tuple[int, int, int] | None:
+    """(year, quarter, month) of one date string, memoized; None if it does not parse."""
+    try:
+        ts = pd.to_datetime(value, format=DATE_FORMAT)
+    except (ValueError, OverflowError):
+        try:
+            ts = pd.to_datetime(value)
+        except (ValueError, OverflowError):
+            return None
+    if pd.isna(ts):
+        return None
+    return ts.year, ts.quarter, ts.month
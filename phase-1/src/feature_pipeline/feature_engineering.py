@@ -3,68 +3,233 @@ Feature engineering: date parts, frequency encoding, target encoding, drop leaka
 
 - Reads cleaned train/eval CSVs
 - Applies feature engineering
-- Saves feature-engineered CSVs
+- Saves feature-engineered tables (Parquet by default, see src/storage.py)
 - ALSO saves fitted encoders for inference
+- `stream_feature_engineering` is the out-of-core variant: encoders are fitted per
+  train chunk / partition (optionally in worker processes) and merged, then every
+  split is transformed chunk by chunk into part files.
 """
 
+import argparse
+import multiprocessing as mp
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from joblib import dump #joblib.dump saves encoders/mappings to disk (important for reusing at inference).
 
+from src.feature_pipeline.dates import DATE_PARTS, date_features
+from src.storage import iter_table, part_files, read_columns, read_table, remove_table, resolve_table, write_part, write_table
 
-class SimpleTargetEncoder:
-    """Lightweight replacement for category_encoders.TargetEncoder."""
+PROCESSED_DIR = Path("data/processed")
+MODELS_DIR = Path("models")
+CHUNKSIZE = 500_000  # rows per chunk in streaming mode
+# to avoid permission issues in Lambda, do not execute this line if lambda environment
+if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class _LookupEncoder:
+    """Category → value table stored as a sorted category array + parallel value array.
+
+    `transform` is one vectorized hash lookup (pandas Index codes) + `take`; unknown
+    categories get `default`. Pickles are two flat arrays instead of a dict.
+
+    Subclasses keep per-category sufficient statistics (counts, target sums) next to
+    the values, so encoders fitted on separate chunks / partitions can be combined with
+    `merge` (or grown with `partial_fit`) into the same table as one in-memory fit.
+    """
+
+    _STATS: tuple[str, ...] = ()  # names of the per-category statistic arrays
 
     def __init__(self):
-        self.mapping: dict[str, float] = {}
+        self.categories = np.empty(0, dtype=object)
+        self.values = np.empty(0, dtype=np.float64)
+        self._index_cache: tuple | None = None
+
+    @property
+    def default(self) -> float:
+        return 0  # int, so integer count tables are not upcast
+
+    def _set_table(self, categories, values, **stats) -> None:
+        categories, values = np.asarray(categories), np.asarray(values)
+        try:
+            order = np.argsort(categories, kind="stable")
+        except TypeError:  # mixed, unorderable categories: keep fit order
+            order = np.arange(len(categories))
+        self.categories, self.values = categories[order], values[order]
+        for name, array in stats.items():
+            setattr(self, name, np.asarray(array)[order])
+
+    def _stats_frame(self) -> pd.DataFrame:
+        if any(getattr(self, name, None) is None for name in self._STATS):
+            raise ValueError(f"{type(self).__name__} has no fit statistics (pickled by an older version); refit it")
+        return pd.DataFrame({name: getattr(self, name) for name in self._STATS}, index=self.categories)
+
+    def _merge_stats(self, other: pd.DataFrame) -> pd.DataFrame:
+        """Per-category sum of this encoder's statistics and `other` (first-seen category order)."""
+        if not len(self.categories):
+            return other
+        return pd.concat([self._stats_frame(), other]).groupby(level=0, sort=False).sum()
+
+    @property
+    def mapping(self) -> dict:
+        return dict(zip(self.categories.tolist(), self.values.tolist()))
+
+    @mapping.setter
+    def mapping(self, mapping: dict) -> None:
+        self._set_table(list(mapping.keys()), list(mapping.values()))
+        for name in self._STATS:  # a bare mapping carries no statistics
+            setattr(self, name, None)
+
+    def _index(self) -> pd.Index:
+        # Built lazily and rebuilt if the category array is replaced
+        if self._index_cache is None or self._index_cache[0] is not self.categories:
+            self._index_cache = (self.categories, pd.Index(self.categories))
+        return self._index_cache[1]
+
+    def transform(self, X: pd.Series) -> pd.Series:
+        series = pd.Series(X)
+        codes = self._index().get_indexer(series)
+        # Position -1 (unknown) picks the appended default; NaN values behave like map().fillna()
+        table = np.append(self.values, self.default)
+        if table.dtype.kind == "f":
+            table[np.isnan(table)] = self.default
+        return pd.Series(table.take(codes), index=series.index, name=series.name)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_index_cache"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        mapping = state.pop("mapping", None)  # encoders pickled before the array layout
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_index_cache", None)
+        if mapping is not None:
+            self.mapping = mapping
+        for name in self._STATS:  # pickled before the statistics were kept
+            self.__dict__.setdefault(name, None)
+
+
+class SimpleTargetEncoder(_LookupEncoder):
+    """Lightweight replacement for category_encoders.TargetEncoder.
+
+    Statistics: per-category `counts` / `sums` of the target plus the overall row count
+    and target sum (for `global_mean`).
+    """
+
+    _STATS = ("counts", "sums")
+
+    def __init__(self):
+        super().__init__()
         self.global_mean: float = 0.0
+        self.counts = np.empty(0, dtype=np.int64)
+        self.sums = np.empty(0, dtype=np.float64)
+        self.n_rows = 0
+        self.target_sum = 0.0
+
+    @property
+    def default(self) -> float:
+        return self.global_mean
 
     def fit(self, X: pd.Series, y: pd.Series):
+        self.__init__()
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X: pd.Series, y: pd.Series):
+        """Add one chunk of (category, target) rows to the statistics."""
         series = pd.Series(X)
         target = pd.Series(y).astype(float)
-        means = target.groupby(series).mean()
-        self.mapping = means.to_dict()
-        self.global_mean = float(target.mean())
+        grouped = target.groupby(series, observed=True)
+        chunk = pd.DataFrame({"counts": grouped.count().astype(np.int64), "sums": grouped.sum()})
+        self._update(chunk, len(target) - int(target.isna().sum()), float(target.sum()))
         return self
 
-    def transform(self, X: pd.Series) -> pd.Series:
-        series = pd.Series(X)
-        return series.map(self.mapping).fillna(self.global_mean)
+    def merge(self, other: "SimpleTargetEncoder"):
+        """Combine with an encoder fitted on other rows (in place; returns self)."""
+        self._update(other._stats_frame(), other.n_rows, other.target_sum)
+        return self
+
+    def _update(self, stats: pd.DataFrame, n_rows: int, target_sum: float) -> None:
+        stats = self._merge_stats(stats)
+        counts = stats["counts"].to_numpy(dtype=np.int64)
+        sums = stats["sums"].to_numpy(dtype=np.float64)
+        # Categories whose targets were all NaN get NaN (→ global mean at transform)
+        means = np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+        self._set_table(stats.index, means, counts=counts, sums=sums)
+        self.n_rows += n_rows
+        self.target_sum += target_sum
+        self.global_mean = self.target_sum / self.n_rows if self.n_rows else 0.0
 
     def fit_transform(self, X: pd.Series, y: pd.Series) -> pd.Series:
         self.fit(X, y)
         return self.transform(X)
 
-PROCESSED_DIR = Path("data/processed")
-MODELS_DIR = Path("models")
-# to avoid permission issues in Lambda, do not execute this line if lambda environment
-import os
-if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+
+class FrequencyEncoder(_LookupEncoder):
+    """Category → training count (unknown → 0); replaces the pickled value_counts Series.
+
+    The counts are their own sufficient statistic, so `merge` just adds them up.
+    """
+
+    def fit(self, X: pd.Series):
+        self.__init__()
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: pd.Series):
+        """Add the counts of one chunk."""
+        counts = pd.Series(X).value_counts()
+        counts = counts[counts > 0]  # categorical input also lists unobserved categories
+        return self._add_counts(counts)
+
+    def merge(self, other: "FrequencyEncoder"):
+        """Combine with an encoder fitted on other rows (in place; returns self)."""
+        return self._add_counts(pd.Series(other.values, index=other.categories))
+
+    def _add_counts(self, counts: pd.Series):
+        merged = counts
+        if len(self.categories):
+            merged = pd.concat([pd.Series(self.values, index=self.categories), counts])
+            merged = merged.groupby(level=0, sort=False).sum()
+        self._set_table(merged.index, merged.to_numpy(dtype=np.int64))
+        return self
+
+    @classmethod
+    def from_counts(cls, counts: pd.Series) -> "FrequencyEncoder":
+        encoder = cls()
+        encoder._set_table(counts.index, counts.to_numpy())
+        return encoder
+
+
+def as_frequency_encoder(encoder) -> FrequencyEncoder:
+    """Accept both a `FrequencyEncoder` and a legacy pickled value_counts Series."""
+    if isinstance(encoder, pd.Series):
+        return FrequencyEncoder.from_counts(encoder)
+    return encoder
 
 
 # ---------- feature functions ----------
 
 def add_date_features(df: pd.DataFrame) -> pd.DataFrame:
-    df["date"] = pd.to_datetime(df["date"])
-    df["year"] = df["date"].dt.year
-    df["quarter"] = df["date"].dt.quarter
-    df["month"] = df["date"].dt.month
+    df["date"], parts = date_features(df["date"])
     # place after date for readability (optional)
-    df.insert(1, "year", df.pop("year"))
-    df.insert(2, "quarter", df.pop("quarter"))
-    df.insert(3, "month", df.pop("month"))
+    for position, part in enumerate(DATE_PARTS, start=1):
+        if part in df.columns:
+            del df[part]
+        df.insert(position, part, parts[part])
     return df
 
 
 #Creates a frequency encoding (how often a value appears).
 #Fit only on train, then applied to eval.
 def frequency_encode(train: pd.DataFrame, eval: pd.DataFrame, col: str):
-    freq_map = train[col].value_counts()
-    train[f"{col}_freq"] = train[col].map(freq_map)
-    eval[f"{col}_freq"] = eval[col].map(freq_map).fillna(0)
-    return train, eval, freq_map
+    fe = FrequencyEncoder().fit(train[col])
+    train[f"{col}_freq"] = fe.transform(train[col])
+    if train[col].isna().any():  # value_counts skips NaN: missing train values stay NaN, not 0
+        train[f"{col}_freq"] = train[f"{col}_freq"].where(train[col].notna())
+    eval[f"{col}_freq"] = fe.transform(eval[col])
+    return train, eval, fe
 
 
 #Uses target encoding (replace category with average of target variable).
@@ -98,27 +263,31 @@ def run_feature_engineering(
     in_eval_path: Path | str | None = None,
     in_holdout_path: Path | str | None = None,
     output_dir: Path | str = PROCESSED_DIR,
+    encoders_dir: Path | str = MODELS_DIR,
 ):
     """
     Run feature engineering and write outputs + encoders to disk.
     Applies the same transformations to train, eval, and holdout.
+    The fitted encoders are saved to `encoders_dir`.
     """
     output_dir = Path(output_dir)
+    encoders_dir = Path(encoders_dir)
     
     if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
         output_dir.mkdir(parents=True, exist_ok=True)
+        encoders_dir.mkdir(parents=True, exist_ok=True)
 
     # Defaults for inputs
     if in_train_path is None:
-        in_train_path = PROCESSED_DIR / "cleaning_train.csv"
+        in_train_path = PROCESSED_DIR / "cleaning_train"
     if in_eval_path is None:
-        in_eval_path = PROCESSED_DIR / "cleaning_eval.csv"
+        in_eval_path = PROCESSED_DIR / "cleaning_eval"
     if in_holdout_path is None:
-        in_holdout_path = PROCESSED_DIR / "cleaning_holdout.csv"
+        in_holdout_path = PROCESSED_DIR / "cleaning_holdout"
 
-    train_df = pd.read_csv(in_train_path)
-    eval_df = pd.read_csv(in_eval_path)
-    holdout_df = pd.read_csv(in_holdout_path)
+    train_df = read_table(in_train_path)
+    eval_df = read_table(in_eval_path)
+    holdout_df = read_table(in_holdout_path)
 
     print("Train date range:", train_df["date"].min(), "to", train_df["date"].max())
     print("Eval date range:", eval_df["date"].min(), "to", eval_df["date"].max())
@@ -130,39 +299,144 @@ def run_feature_engineering(
     holdout_df = add_date_features(holdout_df)
 
     # Frequency encode zipcode (fit on train only)
-    freq_map = None
+    freq_encoder = None
     if "zipcode" in train_df.columns:
-        train_df, eval_df, freq_map = frequency_encode(train_df, eval_df, "zipcode")
-        holdout_df["zipcode_freq"] = holdout_df["zipcode"].map(freq_map).fillna(0)
-        dump(freq_map, MODELS_DIR / "freq_encoder.pkl")   # save mapping
+        train_df, eval_df, freq_encoder = frequency_encode(train_df, eval_df, "zipcode")
+        holdout_df["zipcode_freq"] = freq_encoder.transform(holdout_df["zipcode"])
+        dump(freq_encoder, encoders_dir / "freq_encoder.pkl")   # save encoder
 
     # Target encode city_full (fit on train only)
     target_encoder = None
     if "city_full" in train_df.columns:
         train_df, eval_df, target_encoder = target_encode(train_df, eval_df, "city_full", "price")
         holdout_df["city_full_encoded"] = target_encoder.transform(holdout_df["city_full"])
-        dump(target_encoder, MODELS_DIR / "target_encoder.pkl")  # save encoder
+        dump(target_encoder, encoders_dir / "target_encoder.pkl")  # save encoder
 
     # Drop leakage / raw categoricals
     train_df, eval_df = drop_unused_columns(train_df, eval_df)
     holdout_df, _ = drop_unused_columns(holdout_df.copy(), holdout_df.copy())
 
     # Save engineered data
-    out_train_path = output_dir / "feature_engineered_train.csv"
-    out_eval_path = output_dir / "feature_engineered_eval.csv"
-    out_holdout_path = output_dir / "feature_engineered_holdout.csv"
-    train_df.to_csv(out_train_path, index=False)
-    eval_df.to_csv(out_eval_path, index=False)
-    holdout_df.to_csv(out_holdout_path, index=False)
+    write_table(train_df, output_dir / "feature_engineered_train")
+    write_table(eval_df, output_dir / "feature_engineered_eval")
+    write_table(holdout_df, output_dir / "feature_engineered_holdout")
 
     print("✅ Feature engineering complete.")
     print("   Train shape:", train_df.shape)
     print("   Eval  shape:", eval_df.shape)
     print("   Holdout shape:", holdout_df.shape)
-    print("   Encoders saved to models/")
+    print(f"   Encoders saved to {encoders_dir}/")
+
+    return train_df, eval_df, holdout_df, freq_encoder, target_encoder
+
+
+# ---------- streaming pipeline ----------
+
+def _fit_encoders(path: Path | str, chunksize: int) -> tuple[FrequencyEncoder | None, SimpleTargetEncoder | None]:
+    """Fit both encoders over one train table / partition, one chunk at a time."""
+    available = read_columns(path)
+    freq_encoder = FrequencyEncoder() if "zipcode" in available else None
+    target_encoder = SimpleTargetEncoder() if "city_full" in available else None
+    columns = [c for c in ("zipcode", "city_full", "price") if c in available]
+    for chunk in iter_table(path, chunksize, columns=columns):
+        if freq_encoder is not None:
+            freq_encoder.partial_fit(chunk["zipcode"])
+        if target_encoder is not None:
+            target_encoder.partial_fit(chunk["city_full"], chunk["price"])
+    return freq_encoder, target_encoder
+
+
+def _merge_all(encoders: list):
+    merged = None
+    for encoder in encoders:
+        if encoder is not None:
+            merged = encoder if merged is None else merged.merge(encoder)
+    return merged
+
+
+def fit_encoders(train_path: Path | str, chunksize: int = CHUNKSIZE, n_jobs: int = 1):
+    """
+    Fit the zipcode frequency + city_full target encoders without loading the train split.
+
+    A partitioned train table is fitted one partition per task (in `n_jobs` processes);
+    the partial encoders are merged in partition order.
+    """
+    partitions = part_files(train_path) or [resolve_table(train_path)]
+    if n_jobs > 1 and len(partitions) > 1:
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        with ctx.Pool(min(n_jobs, len(partitions))) as pool:
+            fitted = pool.starmap(_fit_encoders, [(p, chunksize) for p in partitions])
+    else:
+        fitted = [_fit_encoders(p, chunksize) for p in partitions]
+    return _merge_all([f for f, _ in fitted]), _merge_all([t for _, t in fitted])
+
+
+def engineer_features(df: pd.DataFrame, freq_encoder, target_encoder, is_train: bool) -> pd.DataFrame:
+    """Cleaned rows → feature-engineered rows with already fitted encoders (modifies `df`)."""
+    df = add_date_features(df)
+    if freq_encoder is not None:
+        df["zipcode_freq"] = freq_encoder.transform(df["zipcode"])
+        if is_train and df["zipcode"].isna().any():  # same as frequency_encode: NaN train values stay NaN
+            df["zipcode_freq"] = df["zipcode_freq"].where(df["zipcode"].notna())
+    if target_encoder is not None:
+        df["city_full_encoded"] = target_encoder.transform(df["city_full"])
+    df, _ = drop_unused_columns(df, df.iloc[:0])
+    return df
 
-    return train_df, eval_df, holdout_df, freq_map, target_encoder
+
+def stream_feature_engineering(
+    in_train_path: Path | str | None = None,
+    in_eval_path: Path | str | None = None,
+    in_holdout_path: Path | str | None = None,
+    output_dir: Path | str = PROCESSED_DIR,
+    encoders_dir: Path | str = MODELS_DIR,
+    chunksize: int = CHUNKSIZE,
+    n_jobs: int = 1,
+):
+    """
+    Out-of-core `run_feature_engineering`: same features and encoders, but memory is
+    bounded by one chunk. Outputs are part-file tables (read back with `read_table`).
+    """
+    output_dir = Path(output_dir)
+    encoders_dir = Path(encoders_dir)
+    if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        encoders_dir.mkdir(parents=True, exist_ok=True)
+    inputs = {
+        "train": in_train_path or PROCESSED_DIR / "cleaning_train",
+        "eval": in_eval_path or PROCESSED_DIR / "cleaning_eval",
+        "holdout": in_holdout_path or PROCESSED_DIR / "cleaning_holdout",
+    }
+
+    freq_encoder, target_encoder = fit_encoders(inputs["train"], chunksize=chunksize, n_jobs=n_jobs)
+    if freq_encoder is not None:
+        dump(freq_encoder, encoders_dir / "freq_encoder.pkl")
+    if target_encoder is not None:
+        dump(target_encoder, encoders_dir / "target_encoder.pkl")
+
+    rows = {}
+    for split, in_path in inputs.items():
+        out = output_dir / f"feature_engineered_{split}"
+        remove_table(out)
+        rows[split] = 0
+        for i, chunk in enumerate(iter_table(in_path, chunksize)):
+            chunk = engineer_features(chunk, freq_encoder, target_encoder, is_train=split == "train")
+            write_part(chunk, out, i)
+            rows[split] += len(chunk)
+
+    print("✅ Streaming feature engineering complete.")
+    print(f"   Train rows: {rows['train']}, Eval rows: {rows['eval']}, Holdout rows: {rows['holdout']}")
+    print(f"   Encoders saved to {encoders_dir}/")
+    return freq_encoder, target_encoder
 
 
 if __name__ == "__main__":
-    run_feature_engineering()
+    parser = argparse.ArgumentParser(description="Feature engineering for train/eval/holdout.")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream splits in chunks of N rows")
+    parser.add_argument("--n_jobs", type=int, default=1, help="Processes for fitting encoders over train partitions")
+    args = parser.parse_args()
+
+    if args.chunksize or args.n_jobs > 1:
+        stream_feature_engineering(chunksize=args.chunksize or CHUNKSIZE, n_jobs=args.n_jobs)
+    else:
+        run_feature_engineering()
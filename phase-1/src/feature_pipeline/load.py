@@ -3,29 +3,45 @@ Load & time-split the raw dataset.
 
 - Production default writes to data/raw/
 - Tests can pass a temp `output_dir` so nothing in data/ is touched.
+- Splits are written through `src.storage` (Parquet by default, CSV optional).
+- `stream_split_data` is the out-of-core variant: the raw file is read in chunks, rows
+  are spooled per month and each month is routed to its split as part files, so memory
+  is bounded by one chunk + one month. Optionally partitioned as <split>/<YYYY>/<MM>/.
 """
 
+import argparse
 import os
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.feature_pipeline.dates import parse_dates
+from src.storage import iter_table, read_table, remove_table, write_part, write_table
+
 DATA_DIR = Path("data/raw")
+RAW_PATH = "data/raw/untouched_raw_original.csv"
+CUTOFF_DATE_EVAL = "2020-01-01"     # eval starts
+CUTOFF_DATE_HOLDOUT = "2022-01-01"  # holdout starts
+SPLITS = ("train", "eval", "holdout")
+CHUNKSIZE = 500_000  # raw rows per chunk in streaming mode
 
 
 def load_and_split_data(
-    raw_path: str = "data/raw/untouched_raw_original.csv",
+    raw_path: str = RAW_PATH,
     output_dir: Path | str = DATA_DIR,
 ):
     """Load raw dataset, split into train/eval/holdout by date, and save to output_dir."""
-    df = pd.read_csv(raw_path)
+    df = read_table(raw_path)
 
     # Ensure datetime + sort
-    df["date"] = pd.to_datetime(df["date"])
+    df["date"] = parse_dates(df["date"])
     df = df.sort_values("date")
 
     # Cutoffs
-    cutoff_date_eval = pd.Timestamp("2020-01-01")     # eval starts
-    cutoff_date_holdout = pd.Timestamp("2022-01-01")  # holdout starts
+    cutoff_date_eval = pd.Timestamp(CUTOFF_DATE_EVAL)
+    cutoff_date_holdout = pd.Timestamp(CUTOFF_DATE_HOLDOUT)
 
     # Splits
     train_df = df[df["date"] < cutoff_date_eval]
@@ -36,9 +52,9 @@ def load_and_split_data(
     outdir = Path(output_dir)
     if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
         outdir.mkdir(parents=True, exist_ok=True)
-    train_df.to_csv(outdir / "train.csv", index=False)
-    eval_df.to_csv(outdir / "eval.csv", index=False)
-    holdout_df.to_csv(outdir / "holdout.csv", index=False)
+    write_table(train_df, outdir / "train")
+    write_table(eval_df, outdir / "eval")
+    write_table(holdout_df, outdir / "holdout")
 
     print(f"✅ Data split completed (saved to {outdir}).")
     print(f"   Train: {train_df.shape}, Eval: {eval_df.shape}, Holdout: {holdout_df.shape}")
@@ -46,5 +62,71 @@ def load_and_split_data(
     return train_df, eval_df, holdout_df
 
 
+def _split_codes(dates: pd.Series) -> np.ndarray:
+    """0 / 1 / 2 = train / eval / holdout for each date."""
+    cutoffs = pd.DatetimeIndex([CUTOFF_DATE_EVAL, CUTOFF_DATE_HOLDOUT]).values
+    return np.searchsorted(cutoffs, dates.values, side="right")
+
+
+def stream_split_data(
+    raw_path: str = RAW_PATH,
+    output_dir: Path | str = DATA_DIR,
+    chunksize: int = CHUNKSIZE,
+    partition_by_month: bool = False,
+) -> dict[str, int]:
+    """
+    Split a raw file that may not fit in memory; returns the row count per split.
+
+    Pass 1 reads `chunksize` rows at a time and spools them into one directory per
+    month. Pass 2 sorts each month by date and writes it to its split, so the parts
+    of a split read back in date order (like the in-memory split).
+    """
+    outdir = Path(output_dir)
+    if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+        outdir.mkdir(parents=True, exist_ok=True)
+    spool = Path(tempfile.mkdtemp(prefix=".split-", dir=outdir))
+
+    try:
+        for i, chunk in enumerate(iter_table(raw_path, chunksize)):
+            chunk["date"] = parse_dates(chunk["date"])
+            # Rows without a date belong to no split (the in-memory split drops them too)
+            chunk = chunk[chunk["date"].notna()]
+            months = (chunk["date"].dt.year * 100 + chunk["date"].dt.month).astype(np.int64)
+            for month, part in chunk.groupby(months, sort=False):
+                write_part(part, spool / str(month), i)
+
+        for split in SPLITS:
+            remove_table(outdir / split)
+        counts = dict.fromkeys(SPLITS, 0)
+        n_parts = dict.fromkeys(SPLITS, 0)
+        for month_dir in sorted(spool.iterdir(), key=lambda p: int(p.name)):
+            df = read_table(month_dir)
+            df["date"] = parse_dates(df["date"])
+            df = df.sort_values("date", kind="stable")
+            codes = _split_codes(df["date"])
+            year, month = divmod(int(month_dir.name), 100)
+            partition = f"{year:04d}/{month:02d}" if partition_by_month else None
+            for code in np.unique(codes):
+                split = SPLITS[code]
+                write_part(df[codes == code], outdir / split, n_parts[split], partition=partition)
+                n_parts[split] += 1
+                counts[split] += int((codes == code).sum())
+    finally:
+        shutil.rmtree(spool, ignore_errors=True)
+
+    print(f"✅ Streaming data split completed (saved to {outdir}).")
+    print(f"   Train: {counts['train']} rows, Eval: {counts['eval']} rows, Holdout: {counts['holdout']} rows")
+    return counts
+
+
 if __name__ == "__main__":
-    load_and_split_data()
+    parser = argparse.ArgumentParser(description="Time-split the raw dataset.")
+    parser.add_argument("--stream", action="store_true", help="Read the raw file in chunks (bounded memory)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--partition_by_month", action="store_true", help="Write <split>/<YYYY>/<MM>/ part files")
+    args = parser.parse_args()
+
+    if args.stream or args.partition_by_month:
+        stream_split_data(chunksize=args.chunksize, partition_by_month=args.partition_by_month)
+    else:
+        load_and_split_data()
@@ -3,9 +3,11 @@
 
 - Reads train/eval/holdout CSVs from data/raw/.
 - Cleans and normalizes city names.
-- Maps cities to metros and merges lat/lng.
+- Maps cities to metros and merges lat/lng (unmatched cities: nearest metro to the
+  zipcode centroid, when data/raw/zip_centroids.csv is available; build it once with
+  `--build-zip-centroids <Census Gazetteer ZCTA file>`).
 - Drops duplicates and extreme outliers.
-- Saves cleaned splits to data/processed/.
+- Saves cleaned splits to data/processed/ (Parquet by default, see src/storage.py).
 
 """
 
@@ -17,13 +19,22 @@ Preprocessing: city normalization + (optional) lat/lng merge, duplicate drop, ou
   to skip merge safely without touching disk assets.
 """
 
+import argparse
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from src.storage import read_table, write_table
+
 RAW_DIR = Path("data/raw")
 PROCESSED_DIR = Path("data/processed")
+METROS_PATH = "data/raw/usmetros.csv"
+ZIP_CENTROIDS_PATH = "data/raw/zip_centroids.csv"  # optional: zipcode,lat,lng (see build_zip_centroids)
+OUTLIER_PRICE = 19_000_000  # rows with a higher median_list_price are dropped as outliers
+DUPLICATE_IGNORE = ("date", "year")  # rows equal on every other column are duplicates
     
 if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
@@ -99,42 +110,242 @@ def normalize_city(s: str) -> str:
     return s
 
 
-def clean_and_merge(df: pd.DataFrame, metros_path: str | None = "data/raw/usmetros.csv") -> pd.DataFrame:
+# Normalized once at import instead of on every clean_and_merge call
+NORMALIZED_CITY_MAPPING = {normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()}
+
+
+@lru_cache(maxsize=65_536)
+def canonical_city(s: str) -> str:
+    """normalize_city + CITY_MAPPING for one raw value, memoized across calls."""
+    s = normalize_city(s)
+    return NORMALIZED_CITY_MAPPING.get(s, s)
+
+
+def canonicalize_cities(cities: pd.Series) -> pd.Series:
+    """
+    Vectorized `canonical_city`: the work runs once per DISTINCT raw value and is
+    broadcast back through factorized codes, so cost scales with the number of
+    cities, not rows.
+    """
+    codes, uniques = pd.factorize(cities, use_na_sentinel=False)
+    canonical = np.empty(len(uniques), dtype=object)
+    canonical[:] = [u if pd.isna(u) else canonical_city(u) for u in uniques]
+    return pd.Series(canonical.take(codes), index=cities.index, name=cities.name)
+
+
+class CoordinateTable:
+    """
+    Key → (lat, lng) as contiguous arrays behind a hash index.
+
+    Enrichment is one vectorized index lookup + `take` instead of a DataFrame merge;
+    the arrays are what the inference bundle stores. Duplicate keys keep their first
+    row (a merge would have duplicated the matching input rows).
+    """
+
+    KEY = "key"
+
+    def __init__(self, keys: np.ndarray, lat: np.ndarray, lng: np.ndarray):
+        self.keys = keys
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self._index = pd.Index(keys)
+
+    @staticmethod
+    def _normalize_keys(keys: pd.Series) -> pd.Series:
+        return keys
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame):
+        keys = cls._normalize_keys(frame[cls.KEY])
+        first = (~keys.duplicated() & keys.notna()).to_numpy()
+        return cls(
+            keys.to_numpy()[first],
+            frame["lat"].to_numpy(dtype=np.float64)[first],
+            frame["lng"].to_numpy(dtype=np.float64)[first],
+        )
+
+    def lookup(self, keys) -> tuple[np.ndarray, np.ndarray]:
+        """(lat, lng) arrays for the given keys; unknown keys → NaN."""
+        pos = self._index.get_indexer(pd.Index(keys))
+        lat, lng = np.append(self.lat, np.nan), np.append(self.lng, np.nan)
+        return lat.take(pos), lng.take(pos)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def _unit_vectors(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    # Points on the unit sphere: Euclidean (chord) order == great-circle order
+    lat, lng = np.radians(lat), np.radians(lng)
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+
+class MetroTable(CoordinateTable):
+    """Normalized metro name → centroid (lat, lng), plus a nearest-metro spatial index."""
+
+    KEY = "metro_full"
+
+    def __init__(self, keys: np.ndarray, lat: np.ndarray, lng: np.ndarray):
+        super().__init__(np.asarray(keys, dtype=object), lat, lng)
+        self._tree = None
+
+    @staticmethod
+    def _normalize_keys(keys: pd.Series) -> pd.Series:
+        return keys.apply(normalize_city)
+
+    def nearest(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """Row positions of the nearest metro centroid for each query point (one batched query)."""
+        if self._tree is None:
+            from scipy.spatial import cKDTree  # lazy: only rows without a metro match need it
+
+            valid = np.flatnonzero(~(np.isnan(self.lat) | np.isnan(self.lng)))
+            points = _unit_vectors(self.lat[valid], self.lng[valid])
+            self._tree = (valid, cKDTree(points) if len(valid) else None)
+        valid, tree = self._tree
+        if tree is None or not len(lat):
+            return np.full(len(lat), -1, dtype=np.int64)
+
+        queries = _unit_vectors(np.asarray(lat, dtype=np.float64), np.asarray(lng, dtype=np.float64))
+        _, nearest = tree.query(queries, k=1)
+        return valid[nearest]
+
+
+class ZipCentroids(CoordinateTable):
+    """Zipcode → centroid (lat, lng); used to place rows whose city has no metro match."""
+
+    KEY = "zipcode"
+
+
+# Census Gazetteer ZCTA file columns → zip centroids columns
+GAZETTEER_COLUMNS = {"GEOID": "zipcode", "INTPTLAT": "lat", "INTPTLONG": "lng"}
+
+
+def build_zip_centroids(gazetteer_path: str | Path, out_path: str | Path = ZIP_CENTROIDS_PATH) -> Path:
+    """
+    Write the zipcode,lat,lng table read by `load_zip_centroids` from the Census
+    Gazetteer ZIP Code Tabulation Areas file (e.g. 2023_Gaz_zcta_national.txt,
+    https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html).
+
+    - The Gazetteer is tab-separated; its last header name carries trailing spaces.
+    - ZCTA codes are written as integers, like the zipcode column of the housing data.
+    """
+    frame = pd.read_csv(gazetteer_path, sep="\t", dtype={"GEOID": str})
+    frame.columns = frame.columns.str.strip()
+    missing = set(GAZETTEER_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"Not a Gazetteer ZCTA file, missing columns: {sorted(missing)}")
+    centroids = frame[list(GAZETTEER_COLUMNS)].rename(columns=GAZETTEER_COLUMNS)
+    centroids["zipcode"] = centroids["zipcode"].astype(int)
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    centroids.to_csv(out_path, index=False)
+    print(f"✅ Wrote {len(centroids)} zip centroids to {out_path}")
+    return out_path
+
+
+def fill_from_nearest_metro(
+    lat: np.ndarray,
+    lng: np.ndarray,
+    zipcodes,
+    metros: MetroTable,
+    zip_centroids: ZipCentroids,
+) -> int:
+    """
+    Fill NaN lat/lng (in place) with the centroid of the metro nearest to the row's
+    zipcode centroid. All unresolved rows go through one KD-tree query.
+    Returns the number of rows filled.
+    """
+    missing = np.flatnonzero(np.isnan(lat) | np.isnan(lng))
+    if not len(missing):
+        return 0
+    zip_lat, zip_lng = zip_centroids.lookup(np.asarray(zipcodes)[missing])
+    located = ~(np.isnan(zip_lat) | np.isnan(zip_lng))
+    nearest = metros.nearest(zip_lat[located], zip_lng[located])
+    found = nearest >= 0
+    rows, nearest = missing[located][found], nearest[found]
+    lat[rows], lng[rows] = metros.lat[nearest], metros.lng[nearest]
+    return len(rows)
+
+
+@lru_cache(maxsize=8)
+def _read_coordinate_table(table_cls: type, path: str, mtime_ns: int, size: int) -> CoordinateTable | None:
+    frame = pd.read_csv(path)
+    if table_cls.KEY not in frame.columns or not {"lat", "lng"}.issubset(frame.columns):
+        return None
+    return table_cls.from_frame(frame)
+
+
+def _load_coordinate_table(table_cls: type, path: str | Path | None) -> CoordinateTable | None:
+    if not path or not Path(path).exists():
+        return None
+    stat = os.stat(path)
+    return _read_coordinate_table(table_cls, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def load_metro_table(metros_path: str | Path | None = METROS_PATH) -> MetroTable | None:
+    """
+    Metros lookup table, read and normalized ONCE per process (re-read if the file
+    changes). None if the file is missing or lacks metro_full/lat/lng.
+    """
+    return _load_coordinate_table(MetroTable, metros_path)
+
+
+def load_zip_centroids(zip_centroids_path: str | Path | None = ZIP_CENTROIDS_PATH) -> ZipCentroids | None:
+    """Optional zipcode,lat,lng table (read once per process); None if missing."""
+    return _load_coordinate_table(ZipCentroids, zip_centroids_path)
+
+
+def clean_and_merge(
+    df: pd.DataFrame,
+    metros_path: str | None = METROS_PATH,
+    metros_table: MetroTable | None = None,
+    zip_centroids_path: str | None = ZIP_CENTROIDS_PATH,
+    zip_centroids: ZipCentroids | None = None,
+) -> pd.DataFrame:
     """
     Normalize city names, optionally merge lat/lng from metros dataset.
     If `city_full` column or `metros_path` is missing, skip gracefully.
+    A preloaded `metros_table` / `zip_centroids` (e.g. from the inference bundle)
+    takes precedence over the paths.
+    Cities with no metro match fall back to the metro nearest to their zipcode
+    centroid when a zip centroids file is available.
     """
 
     if "city_full" not in df.columns:
         print("⚠️ Skipping city merge: no 'city_full' column present.")
         return df
 
-    # Normalize city_full
-    df["city_full"] = df["city_full"].apply(normalize_city)
-    # Apply mapping
-    norm_mapping = {normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()}
-    df["city_full"] = df["city_full"].replace(norm_mapping)
+    # Normalize city_full + apply mapping (once per distinct city)
+    df["city_full"] = canonicalize_cities(df["city_full"])
 
     # 🚨 If lat/lng already present, skip merge
     if {"lat", "lng"}.issubset(df.columns):
         print("⚠️ Skipping lat/lng merge: already present in DataFrame.")
         return df
 
-    # If no metros file provided / exists, skip merge
-    if not metros_path or not Path(metros_path).exists():
-        print("⚠️ Skipping lat/lng merge: metros file not provided or not found.")
-        return df
-
-    # Merge lat/lng
-    metros = pd.read_csv(metros_path)
-    if "metro_full" not in metros.columns or not {"lat", "lng"}.issubset(metros.columns):
-        print("⚠️ Skipping lat/lng merge: metros file missing required columns.")
-        return df
-
-    metros["metro_full"] = metros["metro_full"].apply(normalize_city)
-    df = df.merge(metros[["metro_full", "lat", "lng"]],
-                  how="left", left_on="city_full", right_on="metro_full")
-    df.drop(columns=["metro_full"], inplace=True, errors="ignore")
+    if metros_table is None:
+        # If no metros file provided / exists, skip merge
+        if not metros_path or not Path(metros_path).exists():
+            print("⚠️ Skipping lat/lng merge: metros file not provided or not found.")
+            return df
+
+        metros_table = load_metro_table(metros_path)
+        if metros_table is None:
+            print("⚠️ Skipping lat/lng merge: metros file missing required columns.")
+            return df
+
+    # Merge lat/lng (indexed lookup; row order and index unchanged)
+    lat, lng = metros_table.lookup(df["city_full"])
+
+    # Unmatched cities → nearest metro to the zipcode centroid
+    if zip_centroids is None:
+        zip_centroids = load_zip_centroids(zip_centroids_path)
+    if zip_centroids is not None and "zipcode" in df.columns:
+        resolved = fill_from_nearest_metro(lat, lng, df["zipcode"].to_numpy(), metros_table, zip_centroids)
+        if resolved:
+            print(f"✅ Resolved lat/lng for {resolved} rows via nearest metro to zipcode centroid.")
+    df = df.assign(lat=lat, lng=lng)
 
     missing = df[df["lat"].isnull()]["city_full"].unique()
     if len(missing) > 0:
@@ -148,7 +359,7 @@ def clean_and_merge(df: pd.DataFrame, metros_path: str | None = "data/raw/usmetr
 def drop_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     """Drop exact duplicates while keeping different dates/years."""
     before = df.shape[0]
-    df = df.drop_duplicates(subset=df.columns.difference(["date", "year"]), keep=False)
+    df = df.drop_duplicates(subset=df.columns.difference(list(DUPLICATE_IGNORE)), keep=False)
     after = df.shape[0]
     print(f"✅ Dropped {before - after} duplicate rows (excluding date/year).")
     return df
@@ -159,7 +370,7 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     if "median_list_price" not in df.columns:
         return df
     before = df.shape[0]
-    df = df[df["median_list_price"] <= 19_000_000].copy()
+    df = df[df["median_list_price"] <= OUTLIER_PRICE].copy()
     after = df.shape[0]
     print(f"✅ Removed {before - after} rows with median_list_price > 19M.")
     return df
@@ -169,22 +380,21 @@ def preprocess_split(
     split: str,
     raw_dir: Path | str = RAW_DIR,
     processed_dir: Path | str = PROCESSED_DIR,
-    metros_path: str | None = "data/raw/usmetros.csv",
+    metros_path: str | None = METROS_PATH,
+    zip_centroids_path: str | None = ZIP_CENTROIDS_PATH,
 ) -> pd.DataFrame:
     """Run preprocessing for a split and save to processed_dir."""
     raw_dir = Path(raw_dir)
     processed_dir = Path(processed_dir)
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    path = raw_dir / f"{split}.csv"
-    df = pd.read_csv(path)
+    df = read_table(raw_dir / split)
 
-    df = clean_and_merge(df, metros_path=metros_path)
+    df = clean_and_merge(df, metros_path=metros_path, zip_centroids_path=zip_centroids_path)
     df = drop_duplicates(df)
     df = remove_outliers(df)
 
-    out_path = processed_dir / f"cleaning_{split}.csv"
-    df.to_csv(out_path, index=False)
+    out_path = write_table(df, processed_dir / f"cleaning_{split}")
     print(f"✅ Preprocessed {split} saved to {out_path} ({df.shape})")
     return df
 
@@ -193,11 +403,20 @@ def run_preprocess(
     splits: tuple[str, ...] = ("train", "eval", "holdout"),
     raw_dir: Path | str = RAW_DIR,
     processed_dir: Path | str = PROCESSED_DIR,
-    metros_path: str | None = "data/raw/usmetros.csv",
+    metros_path: str | None = METROS_PATH,
+    zip_centroids_path: str | None = ZIP_CENTROIDS_PATH,
 ):
     for s in splits:
-        preprocess_split(s, raw_dir=raw_dir, processed_dir=processed_dir, metros_path=metros_path)
+        preprocess_split(s, raw_dir=raw_dir, processed_dir=processed_dir, metros_path=metros_path,
+                         zip_centroids_path=zip_centroids_path)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocess the train/eval/holdout splits.")
+    parser.add_argument("--build-zip-centroids", metavar="GAZETTEER_FILE", default=None,
+                        help=f"First write {ZIP_CENTROIDS_PATH} from a Census Gazetteer ZCTA file")
+    args = parser.parse_args()
+
+    if args.build_zip_centroids:
+        build_zip_centroids(args.build_zip_centroids)
     run_preprocess()
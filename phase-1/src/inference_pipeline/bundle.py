@@ -0,0 +1,241 @@
+"""
+Single-file, memory-mappable inference bundle.
+
+Replaces the four separate artifacts (model pickle, two encoder pickles and the whole
+feature-engineered train CSV used only for its header) with ONE versioned file:
+
+    magic (8 bytes) | manifest length (uint64) | JSON manifest | aligned array sections
+
+- The manifest holds the feature schema, encoder defaults, the model description and a
+  sha256 per section; the bundle version is derived from those checksums.
+- Reading checks the manifest and that every section's size matches its dtype / shape
+  and lies inside the file; hashing the section contents (`verify=True`) reads the
+  whole file, so it is an opt-in for offline checks, not part of a cold start.
+- Sections are raw little-endian arrays aligned to 64 bytes and opened with `np.memmap`,
+  so a cold start is one download + one mmap, no unpickling.
+- The compiled trees are the default model; the LightGBM pickle can be embedded too
+  for exact-LightGBM scoring (`use_compiled_trees=False`).
+- The metros (and zip centroid) lat/lng tables travel in the bundle too, so inference
+  never reads the CSVs.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from joblib import load
+
+from src.feature_pipeline.feature_engineering import FrequencyEncoder, SimpleTargetEncoder, as_frequency_encoder
+from src.feature_pipeline.preprocess import (
+    METROS_PATH,
+    ZIP_CENTROIDS_PATH,
+    MetroTable,
+    ZipCentroids,
+    load_metro_table,
+    load_zip_centroids,
+)
+from src.inference_pipeline.compiled_trees import CompiledTrees
+
+BUNDLE_SUFFIX = ".bundle"
+FORMAT_VERSION = 1
+MAGIC = b"HRMLBNDL"
+_HEADER = struct.Struct("<8sQ")
+_ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _table_arrays(categories: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Encoder lookup table as (categories, values) arrays with a mmap-able dtype."""
+    categories = np.asarray(categories)
+    if categories.dtype == object:
+        categories = categories.astype(str)
+    return categories, np.asarray(values, dtype=np.float64)
+
+
+def write_inference_bundle(
+    output_path: Path | str,
+    model: Any,
+    feature_columns: list[str],
+    freq_encoder: FrequencyEncoder | pd.Series | None = None,
+    target_encoder: SimpleTargetEncoder | None = None,
+    embed_model_pickle: bool = True,
+    metros: MetroTable | None = None,
+    zip_centroids: ZipCentroids | None = None,
+) -> Path:
+    """Write model + encoders + schema (+ lat/lng tables) into a single bundle file."""
+    sections: dict[str, np.ndarray] = {}
+    manifest: dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "feature_columns": list(feature_columns),
+        "encoders": {},
+    }
+
+    if freq_encoder is not None:
+        freq_encoder = as_frequency_encoder(freq_encoder)
+        sections["freq.categories"], sections["freq.values"] = _table_arrays(freq_encoder.categories, freq_encoder.values)
+        manifest["encoders"]["freq"] = {"column": "zipcode", "default": 0.0}
+
+    if target_encoder is not None:
+        sections["target.categories"], sections["target.values"] = _table_arrays(
+            target_encoder.categories, target_encoder.values
+        )
+        manifest["encoders"]["target"] = {"column": "city_full", "default": float(target_encoder.global_mean)}
+
+    if metros is not None:
+        sections["metros.keys"] = np.asarray(metros.keys).astype(str)
+        sections["metros.lat"], sections["metros.lng"] = metros.lat, metros.lng
+    if zip_centroids is not None:
+        sections["zips.keys"] = np.asarray(zip_centroids.keys)
+        sections["zips.lat"], sections["zips.lng"] = zip_centroids.lat, zip_centroids.lng
+
+    compiled = model if isinstance(model, CompiledTrees) else CompiledTrees.from_model(model)
+    for name in CompiledTrees.ARRAYS:
+        sections[f"trees.{name}"] = getattr(compiled, name)
+    manifest["model"] = {
+        "kind": "compiled_trees",
+        "max_depth": compiled.max_depth,
+        "feature_names": compiled.feature_names,
+        "embedded_pickle": False,
+    }
+    if embed_model_pickle and not isinstance(model, CompiledTrees):
+        sections["model.pkl"] = np.frombuffer(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+        manifest["model"]["embedded_pickle"] = True
+
+    # Section table: offsets are relative to the start of the data area
+    offset = 0
+    table = {}
+    for name, arr in sections.items():
+        arr = np.ascontiguousarray(arr)
+        sections[name] = arr
+        table[name] = {
+            "offset": offset,
+            "nbytes": arr.nbytes,
+            "dtype": arr.dtype.newbyteorder("<").str,
+            "shape": list(arr.shape),
+            "sha256": hashlib.sha256(arr.tobytes()).hexdigest(),
+        }
+        offset = _align(offset + arr.nbytes)
+    manifest["sections"] = table
+    manifest["version"] = hashlib.sha256(
+        json.dumps([manifest["feature_columns"], manifest["encoders"], table], sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    manifest_bytes = json.dumps(manifest).encode("utf-8")
+    data_start = _align(_HEADER.size + len(manifest_bytes))
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        for name, arr in sections.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(arr.astype(arr.dtype.newbyteorder("<"), copy=False).tobytes())
+    return output_path
+
+
+def export_inference_bundle(
+    output_path: Path | str,
+    model: Any,
+    feature_columns: list[str],
+    freq_encoder_path: Path | str | None = None,
+    target_encoder_path: Path | str | None = None,
+    metros_path: Path | str | None = METROS_PATH,
+    zip_centroids_path: Path | str | None = ZIP_CENTROIDS_PATH,
+) -> Path:
+    """Training-side helper: bundle a fitted model with the encoders saved by feature engineering
+    and the lat/lng tables used by preprocessing (so inference never reads the CSVs)."""
+    freq_encoder = load(freq_encoder_path) if freq_encoder_path and Path(freq_encoder_path).exists() else None
+    target_encoder = load(target_encoder_path) if target_encoder_path and Path(target_encoder_path).exists() else None
+    return write_inference_bundle(
+        output_path, model, feature_columns, freq_encoder, target_encoder,
+        metros=load_metro_table(metros_path), zip_centroids=load_zip_centroids(zip_centroids_path),
+    )
+
+
+def read_manifest(path: Path | str) -> tuple[dict, int]:
+    """Return (manifest, data_start) without touching the array sections."""
+    with open(path, "rb") as f:
+        magic, manifest_len = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not an inference bundle: {path}")
+        manifest = json.loads(f.read(manifest_len))
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format: {manifest.get('format_version')}")
+    return manifest, _align(_HEADER.size + manifest_len)
+
+
+def read_inference_bundle(
+    path: Path | str,
+    verify: bool = False,
+    use_compiled_trees: bool = True,
+) -> dict[str, Any]:
+    """Memory-map a bundle file and return the parts of an `ArtifactBundle`.
+
+    `verify=True` also checks every section's sha256 (reads the whole file).
+    """
+    manifest, data_start = read_manifest(path)
+    file_size = os.path.getsize(path)
+
+    arrays: dict[str, np.ndarray] = {}
+    for name, meta in manifest["sections"].items():
+        dtype, shape = np.dtype(meta["dtype"]), tuple(meta["shape"])
+        end = data_start + meta["offset"] + meta["nbytes"]
+        if meta["nbytes"] != dtype.itemsize * int(np.prod(shape, dtype=np.int64)) or end > file_size:
+            raise ValueError(f"Bundle section '{name}' does not match the manifest (truncated file?): {path}")
+        if meta["nbytes"] == 0:  # zero-length sections cannot be mapped
+            arr = np.empty(shape, dtype=dtype)
+        else:
+            arr = np.memmap(path, mode="r", dtype=dtype, offset=data_start + meta["offset"], shape=shape)
+        if verify and hashlib.sha256(arr.tobytes()).hexdigest() != meta["sha256"]:
+            raise ValueError(f"Checksum mismatch in bundle section '{name}': {path}")
+        arrays[name] = arr
+
+    freq_encoder = None
+    if "freq" in manifest["encoders"]:
+        # Tables were written sorted: use the mapped arrays as they are
+        freq_encoder = FrequencyEncoder()
+        freq_encoder.categories, freq_encoder.values = arrays["freq.categories"], arrays["freq.values"]
+
+    target_encoder = None
+    if "target" in manifest["encoders"]:
+        target_encoder = SimpleTargetEncoder()
+        target_encoder.categories, target_encoder.values = arrays["target.categories"], arrays["target.values"]
+        target_encoder.global_mean = float(manifest["encoders"]["target"]["default"])
+
+    metros = None
+    if "metros.keys" in manifest["sections"]:
+        metros = MetroTable(arrays["metros.keys"], arrays["metros.lat"], arrays["metros.lng"])
+    zip_centroids = None
+    if "zips.keys" in manifest["sections"]:
+        zip_centroids = ZipCentroids(arrays["zips.keys"], arrays["zips.lat"], arrays["zips.lng"])
+
+    model_meta = manifest["model"]
+    if not use_compiled_trees and model_meta.get("embedded_pickle"):
+        model = pickle.loads(arrays["model.pkl"].tobytes())
+    else:
+        model = CompiledTrees(
+            **{name: arrays[f"trees.{name}"] for name in CompiledTrees.ARRAYS},
+            max_depth=model_meta["max_depth"],
+            feature_names=model_meta["feature_names"],
+        )
+
+    return {
+        "model": model,
+        "freq_encoder": freq_encoder,
+        "target_encoder": target_encoder,
+        "feature_columns": manifest["feature_columns"],
+        "version": manifest["version"],
+        "metros": metros,
+        "zip_centroids": zip_centroids,
+    }
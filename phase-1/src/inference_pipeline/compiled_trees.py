@@ -0,0 +1,208 @@
+"""
+Dependency-free tree predictor exported from a trained LightGBM model.
+
+- `export_compiled_trees` flattens every tree of the booster into packed NumPy arrays
+  (split feature, threshold, left/right child, leaf value, missing-value routing).
+- `CompiledTrees.predict` scores a matrix with NumPy only, so the inference side
+  does not need to import LightGBM / sklearn (the slow part of a Lambda cold start).
+- Numerical splits only (this project has no categorical features).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# LightGBM missing_type → code; see LightGBM's Tree::NumericalDecision
+_MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+_ZERO_THRESHOLD = 1e-35
+# Objectives whose raw score is the prediction (no link function)
+_IDENTITY_OBJECTIVES = {"regression", "regression_l1", "huber", "fair", "quantile", "mape"}
+
+
+class CompiledTrees:
+    """Packed tree ensemble with a vectorized NumPy evaluator."""
+
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "default_left", "missing_type", "roots")
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        default_left: np.ndarray,
+        missing_type: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        feature_names: list[str],
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.feature_names = list(feature_names)
+        self._is_leaf = left == np.arange(len(left))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    # ---------- export ----------
+
+    @classmethod
+    def from_model(cls, model: Any) -> "CompiledTrees":
+        """Flatten a fitted model with a `booster_` (LGBMRegressor, BoosterRegressor) or a raw Booster."""
+        booster = getattr(model, "booster_", model)
+        dump = booster.dump_model()
+
+        objective = str(dump.get("objective", "regression")).split()[0]
+        if objective not in _IDENTITY_OBJECTIVES or dump.get("average_output"):
+            raise NotImplementedError(f"Unsupported objective for tree export: {dump.get('objective')}")
+        if dump.get("num_tree_per_iteration", 1) != 1:
+            raise NotImplementedError("Multi-output models are not supported")
+
+        nodes: dict[str, list] = {name: [] for name in cls.ARRAYS if name != "roots"}
+        roots: list[int] = []
+        max_depth = 0
+
+        def add_node(node: dict, depth: int) -> int:
+            nonlocal max_depth
+            idx = len(nodes["feature"])
+            for name in nodes:
+                nodes[name].append(0)
+
+            if "leaf_value" in node:
+                # Leaves point to themselves so the evaluator can step past them safely
+                max_depth = max(max_depth, depth)
+                nodes["left"][idx] = nodes["right"][idx] = idx
+                nodes["value"][idx] = float(node["leaf_value"])
+                return idx
+
+            if node.get("decision_type") != "<=":
+                raise NotImplementedError(f"Unsupported split type: {node.get('decision_type')}")
+            nodes["feature"][idx] = int(node["split_feature"])
+            nodes["threshold"][idx] = float(node["threshold"])
+            nodes["default_left"][idx] = bool(node["default_left"])
+            nodes["missing_type"][idx] = _MISSING_TYPES[node["missing_type"]]
+            nodes["left"][idx] = add_node(node["left_child"], depth + 1)
+            nodes["right"][idx] = add_node(node["right_child"], depth + 1)
+            return idx
+
+        for tree in dump["tree_info"]:
+            roots.append(add_node(tree["tree_structure"], 0))
+
+        return cls(
+            feature=np.asarray(nodes["feature"], dtype=np.int32),
+            threshold=np.asarray(nodes["threshold"], dtype=np.float64),
+            left=np.asarray(nodes["left"], dtype=np.int32),
+            right=np.asarray(nodes["right"], dtype=np.int32),
+            value=np.asarray(nodes["value"], dtype=np.float64),
+            default_left=np.asarray(nodes["default_left"], dtype=bool),
+            missing_type=np.asarray(nodes["missing_type"], dtype=np.int8),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            feature_names=dump["feature_names"],
+        )
+
+    def save(self, path: Path | str) -> Path:
+        path = Path(path)
+        np.savez(
+            path,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+            max_depth=np.int64(self.max_depth),
+            feature_names=np.asarray(self.feature_names, dtype=str),
+            format_version=np.int64(FORMAT_VERSION),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: Path | str) -> "CompiledTrees":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled tree format: {int(data['format_version'])}")
+            return cls(
+                **{name: data[name] for name in cls.ARRAYS},
+                max_depth=int(data["max_depth"]),
+                feature_names=data["feature_names"].tolist(),
+            )
+
+    # ---------- scoring ----------
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        # Flat (tree, row) node cursors; every tree is walked for all rows at once and
+        # pairs that reached a leaf drop out of the working set.
+        nodes = np.repeat(self.roots, n_rows)
+        rows = np.tile(np.arange(n_rows), self.n_trees)
+        active = np.flatnonzero(~self._is_leaf[nodes])
+        while active.size:
+            node = nodes[active]
+            x = X[rows[active], self.feature[node]]
+            missing_type = self.missing_type[node]
+            is_nan = np.isnan(x)
+            x = np.where(is_nan & (missing_type != 2), 0.0, x)
+            use_default = ((missing_type == 1) & (np.abs(x) <= _ZERO_THRESHOLD)) | ((missing_type == 2) & is_nan)
+            go_left = np.where(use_default, self.default_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+            nodes[active] = node
+            active = active[~self._is_leaf[node]]
+
+        leaf_values = self.value[nodes].reshape(self.n_trees, n_rows)
+        # Accumulate tree by tree, in the same order as LightGBM
+        out = np.zeros(n_rows, dtype=np.float64)
+        for tree_values in leaf_values:
+            out += tree_values
+        return out
+
+    def predict(self, X: Any, block_size: int | None = None) -> np.ndarray:
+        """Score a (rows, features) matrix or DataFrame aligned to `feature_names`.
+
+        A DataFrame must have exactly the training columns, in training order.
+        """
+        columns = getattr(X, "columns", None)
+        if columns is not None:
+            # LightGBM stores feature names with spaces replaced by underscores
+            names = [str(c).replace(" ", "_") for c in columns]
+            if names != self.feature_names:
+                raise ValueError(f"DataFrame columns do not match the model features (same names, same order): "
+                                 f"expected {self.feature_names}, got {list(columns)}")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        if block_size is None:
+            # keep the (trees x rows) working set around a few MB
+            block_size = max(1, (1 << 20) // max(self.n_trees, 1))
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], block_size):
+            stop = start + block_size
+            out[start:stop] = self._predict_block(X[start:stop])
+        return out
+
+
+def export_compiled_trees(model: Any, path: Path | str) -> Path:
+    """Flatten a trained model to a `.npz` file loadable without LightGBM."""
+    compiled = CompiledTrees.from_model(model)
+    return compiled.save(path)
+
+
+def compiled_trees_path(model_path: Path | str) -> Path:
+    """Conventional location of the compiled export next to a model pickle."""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}_trees.npz")
@@ -3,22 +3,34 @@ Inference pipeline for Housing Regression MLE.
 
 - Takes RAW input data (same schema as holdout.csv).
 - Applies preprocessing + feature engineering using saved encoders.
-- Aligns features with training.
+- Aligns features with training (fused into one copy-free `TransformPlan` when the
+  training schema is known).
 - Returns predictions.
+- CLI can stream large files in bounded chunks (`--chunksize`) to CSV or Parquet,
+  optionally scoring chunks on several cores (`--workers`).
 """
 
 # Raw → preprocess → feature engineering → align schema → model.predict → predictions.
 
 from __future__ import annotations
 import argparse
+import multiprocessing as mp
+import time
+from collections import deque
 from pathlib import Path
 from functools import lru_cache
+from typing import Iterator
+import numpy as np
 import pandas as pd
-from joblib import load
 
 # Import preprocessing + feature engineering helpers
 from src.feature_pipeline.preprocess import clean_and_merge, drop_duplicates, remove_outliers
 from src.feature_pipeline.feature_engineering import add_date_features, drop_unused_columns
+from src.inference_pipeline.prediction_cache import PredictionCache
+from src.inference_pipeline.registry import ARTIFACT_REGISTRY, ArtifactBundle, read_feature_columns
+from src.inference_pipeline.transform_plan import compile_transform_plan
+from src.schema import cast_int_columns
+from src.storage import iter_table, read_table, table_exists
 
 # ----------------------------
 # Default paths
@@ -28,85 +40,116 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_MODEL = PROJECT_ROOT / "data" / "models" / "lgbm_model.pkl"
 DEFAULT_FREQ_ENCODER = PROJECT_ROOT / "data" / "models" / "freq_encoder.pkl"
 DEFAULT_TARGET_ENCODER = PROJECT_ROOT / "data" / "models" / "target_encoder.pkl"
-TRAIN_FE_PATH = PROJECT_ROOT / "data" / "processed" / "feature_engineered_train.csv"
+TRAIN_FE_PATH = PROJECT_ROOT / "data" / "processed" / "feature_engineered_train"  # .parquet or .csv
 DEFAULT_OUTPUT = PROJECT_ROOT / "predictions.csv"
+DEFAULT_CHUNKSIZE = 100_000
 
 print("[INFO] Inference using project root:", PROJECT_ROOT)
 
 @lru_cache(maxsize=8)
 def _load_expected_feature_columns(train_features_path: str) -> list[str] | None:
     """Load the canonical training feature list once and cache it."""
-    path = Path(train_features_path)
-    if not path.exists():
-        return None
-    train_cols = pd.read_csv(path, nrows=1)
-    return [c for c in train_cols.columns if c != "price"]
+    return read_feature_columns(train_features_path)
 
 
 # Load training feature columns (strict schema from training dataset)
-if TRAIN_FE_PATH.exists():
+if table_exists(TRAIN_FE_PATH):
     TRAIN_FEATURE_COLUMNS = _load_expected_feature_columns(str(TRAIN_FE_PATH))
 else:
     TRAIN_FEATURE_COLUMNS = None
 
 
-# ----------------------------
-# Core inference function
-# ----------------------------
-def predict(
+def _featurize(
     input_df: pd.DataFrame,
-    model_path: Path | str = DEFAULT_MODEL,
-    freq_encoder_path: Path | str | None = DEFAULT_FREQ_ENCODER,
-    target_encoder_path: Path | str | None = DEFAULT_TARGET_ENCODER,
-    train_features_path: Path | str | None = TRAIN_FE_PATH,
-    expected_feature_columns: list[str] | None = None,
-) -> pd.DataFrame:
-    # Step 1: Preprocess raw input
-    df = clean_and_merge(input_df)
+    bundle: ArtifactBundle,
+    columns_to_align: list[str] | None,
+) -> tuple[pd.DataFrame, list | None]:
+    """Step-by-step preprocessing + feature engineering → (aligned features, actuals)."""
+    # Preprocess raw input
+    df = clean_and_merge(input_df, metros_table=bundle.metros, zip_centroids=bundle.zip_centroids)
     df = drop_duplicates(df)
     df = remove_outliers(df)
 
-    # Step 2: Feature engineering
+    # Feature engineering
     if "date" in df.columns:
         df = add_date_features(df)
 
-    # Step 3: Encodings ----------------
+    # Encodings ----------------
     # Frequency encoding (zipcode)
-    if freq_encoder_path and Path(freq_encoder_path).exists() and "zipcode" in df.columns:
-        freq_map = load(freq_encoder_path)
-        df["zipcode_freq"] = df["zipcode"].map(freq_map).fillna(0)
+    if bundle.freq_encoder is not None and "zipcode" in df.columns:
+        df["zipcode_freq"] = bundle.freq_encoder.transform(df["zipcode"])
         df = df.drop(columns=["zipcode"], errors="ignore")
 
     # Target encoding (city_full → city_full_encoded)
-    if target_encoder_path and Path(target_encoder_path).exists() and "city_full" in df.columns:
-        target_encoder = load(target_encoder_path)
+    if bundle.target_encoder is not None and "city_full" in df.columns:
+        target_encoder = bundle.target_encoder
         df["city_full_encoded"] = target_encoder.transform(df["city_full"])
         df = df.drop(columns=["city_full"], errors="ignore")
 
     # Drop leakage columns
     df, _ = drop_unused_columns(df.copy(), df.copy())
 
-    # Step 4: Separate actuals if present
+    # Separate actuals if present
     y_true = None
     if "price" in df.columns:
         y_true = df["price"].tolist()
         df = df.drop(columns=["price"])
 
-    # Step 5: Align columns with training schema
+    # Align columns with training schema
+    if columns_to_align is not None:
+        df = df.reindex(columns=columns_to_align, fill_value=0)
+    # Same integer dtypes as the feature tables (and the fused plan)
+    return cast_int_columns(df), y_true
+
+
+# ----------------------------
+# Core inference function
+# ----------------------------
+def predict(
+    input_df: pd.DataFrame,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str | None = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str | None = DEFAULT_TARGET_ENCODER,
+    train_features_path: Path | str | None = TRAIN_FE_PATH,
+    expected_feature_columns: list[str] | None = None,
+    bundle: ArtifactBundle | None = None,
+    cache: PredictionCache | None = None,
+) -> pd.DataFrame:
+    # Step 0: Resolve artifacts (served from the in-process registry after the first call)
+    if bundle is None:
+        bundle = ARTIFACT_REGISTRY.get(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+
+    # Step 1-5: Featurize. With a known training schema the fused plan writes the
+    # aligned matrix directly; otherwise run the step-by-step pipeline.
     columns_to_align = expected_feature_columns
-    if columns_to_align is None and train_features_path is not None:
-        columns_to_align = _load_expected_feature_columns(str(train_features_path))
+    if columns_to_align is None:
+        columns_to_align = bundle.feature_columns
     if columns_to_align is None:
         columns_to_align = TRAIN_FEATURE_COLUMNS
-    if columns_to_align is not None:
-        df = df.reindex(columns=columns_to_align, fill_value=0)
 
-    # Step 6: Load model & predict
-    model = load(model_path)
-    preds = model.predict(df)
+    plan = compile_transform_plan(bundle, tuple(columns_to_align)) if columns_to_align is not None else None
+    if plan is not None:
+        X, index, y_true = plan.transform(input_df)
+        df = plan.to_frame(X, index)
+    else:
+        df, y_true = _featurize(input_df, bundle, columns_to_align)
+        X = None
+
+    # Step 6: Predict with the already-loaded model (a chunk can be emptied by outlier removal)
+    if not len(df):
+        preds = np.empty(0)
+    elif cache is not None:
+        # Only rows never seen with this bundle version reach the model
+        preds = cache.predict(
+            bundle.version,
+            X if X is not None else df.to_numpy(dtype=np.float64),
+            lambda idx: bundle.model.predict(df.iloc[idx]),
+        )
+    else:
+        preds = bundle.model.predict(df)
 
-    # Step 7: Build output
-    out = df.copy()
+    # Step 7: Build output (the plan's frame is private to this call, no copy needed)
+    out = plan.restore_dtypes(df) if X is not None else df.copy()
     out["predicted_price"] = preds
     if y_true is not None:
         out["actual_price"] = y_true
@@ -114,27 +157,179 @@ def predict(
     return out
 
 
+# ----------------------------
+# Streaming batch inference
+# ----------------------------
+class PredictionWriter:
+    """Append prediction chunks to a CSV or Parquet file as they are produced."""
+
+    def __init__(self, output_path: Path | str, output_format: str | None = None):
+        self.output_path = Path(output_path)
+        self.output_format = output_format or ("parquet" if self.output_path.suffix == ".parquet" else "csv")
+        if self.output_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported output format: {self.output_format}")
+        self.rows_written = 0
+        self._parquet_writer = None
+        self._started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.output_format == "csv":
+            df.to_csv(self.output_path, mode="a" if self._started else "w", header=not self._started, index=False)
+        else:
+            self._write_parquet(df)
+        self._started = True
+        self.rows_written += len(df)
+
+    def _write_parquet(self, df: pd.DataFrame) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as err:  # optional dependency
+            raise ImportError("Parquet output requires `pyarrow` (pip install pyarrow).") from err
+
+        # Chunks may infer int vs float differently; pin numerics to float64 so every
+        # row group matches the schema of the first one.
+        numeric = df.select_dtypes(include="number").columns
+        table = pa.Table.from_pandas(df.astype({c: "float64" for c in numeric}), preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self) -> "PredictionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Set in the parent before the pool starts; forked workers inherit it copy-on-write.
+_WORKER_BUNDLE: ArtifactBundle | None = None
+
+
+def _init_worker(bundle: ArtifactBundle | None) -> None:
+    global _WORKER_BUNDLE
+    if bundle is not None:  # spawn start method: bundle is shipped once per worker
+        _WORKER_BUNDLE = bundle
+    try:
+        # One OpenMP thread per process, otherwise N workers x all cores oversubscribe
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _predict_partition(chunk: pd.DataFrame) -> pd.DataFrame:
+    return predict(chunk, bundle=_WORKER_BUNDLE)
+
+
+def _parallel_predictions(chunks, bundle: ArtifactBundle, workers: int) -> Iterator[pd.DataFrame]:
+    """Score chunks in a process pool, yielding results in input order."""
+    global _WORKER_BUNDLE
+    if "fork" in mp.get_all_start_methods():
+        ctx, init_bundle = mp.get_context("fork"), None
+        _WORKER_BUNDLE = bundle
+    else:
+        ctx, init_bundle = mp.get_context("spawn"), bundle
+
+    try:
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(init_bundle,)) as pool:
+            # Bounded number of chunks in flight keeps memory flat (Pool.imap would read ahead)
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_predict_partition, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+    finally:
+        _WORKER_BUNDLE = None  # do not pin the bundle in the parent once scoring is done
+
+
+def iter_predictions(
+    input_path: Path | str,
+    chunksize: int,
+    bundle: ArtifactBundle,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """Read the RAW table (CSV or Parquet) in bounded chunks and yield one predictions frame per chunk.
+
+    Note: `drop_duplicates` runs per chunk, so duplicates split across two chunks are kept.
+    """
+    chunks = iter_table(input_path, chunksize)
+    if workers > 1:
+        yield from _parallel_predictions(chunks, bundle, workers)
+        return
+    for chunk in chunks:
+        yield predict(chunk, bundle=bundle)
+
+
+def predict_stream(
+    input_path: Path | str,
+    output_path: Path | str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    output_format: str | None = None,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str | None = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str | None = DEFAULT_TARGET_ENCODER,
+    train_features_path: Path | str | None = TRAIN_FE_PATH,
+    workers: int = 1,
+) -> int:
+    """Score a RAW CSV chunk by chunk, appending results; memory is bounded by `chunksize`."""
+    bundle = ARTIFACT_REGISTRY.get(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+    start = time.perf_counter()
+    with PredictionWriter(output_path, output_format) as writer:
+        for preds_df in iter_predictions(input_path, chunksize, bundle, workers=workers):
+            writer.write(preds_df)
+    elapsed = time.perf_counter() - start
+    print(f"   Throughput: {writer.rows_written / max(elapsed, 1e-9):,.0f} rows/s "
+          f"({workers} worker{'s' if workers > 1 else ''}, {elapsed:.2f}s)")
+    return writer.rows_written
+
+
 # ----------------------------
 # CLI entrypoint
 # ----------------------------
 # Allows running inference directly from terminal.
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run inference on new housing data (raw).")
-    parser.add_argument("--input", type=str, required=True, help="Path to input RAW CSV file")
+    parser.add_argument("--input", type=str, required=True, help="Path to input RAW CSV / Parquet file")
     parser.add_argument("--output", type=str, default=str(DEFAULT_OUTPUT), help="Path to save predictions CSV")
     parser.add_argument("--model", type=str, default=str(DEFAULT_MODEL), help="Path to trained model file")
     parser.add_argument("--freq_encoder", type=str, default=str(DEFAULT_FREQ_ENCODER), help="Path to frequency encoder pickle")
     parser.add_argument("--target_encoder", type=str, default=str(DEFAULT_TARGET_ENCODER), help="Path to target encoder pickle")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream the input in chunks of this many rows")
+    parser.add_argument("--output_format", type=str, choices=["csv", "parquet"], default=None,
+                        help="Output format (default: inferred from --output suffix)")
+    parser.add_argument("--workers", type=int, default=1, help="Score chunks in N worker processes")
 
     args = parser.parse_args()
 
-    raw_df = pd.read_csv(args.input)
-    preds_df = predict(
-        raw_df,
-        model_path=args.model,
-        freq_encoder_path=args.freq_encoder,
-        target_encoder_path=args.target_encoder,
-    )
+    if args.chunksize or args.workers > 1:
+        n_rows = predict_stream(
+            args.input,
+            args.output,
+            chunksize=args.chunksize or DEFAULT_CHUNKSIZE,
+            workers=args.workers,
+            output_format=args.output_format,
+            model_path=args.model,
+            freq_encoder_path=args.freq_encoder,
+            target_encoder_path=args.target_encoder,
+        )
+        print(f"✅ {n_rows} predictions saved to {args.output}")
+    else:
+        raw_df = read_table(args.input)
+        preds_df = predict(
+            raw_df,
+            model_path=args.model,
+            freq_encoder_path=args.freq_encoder,
+            target_encoder_path=args.target_encoder,
+        )
 
-    preds_df.to_csv(args.output, index=False)
-    print(f"✅ Predictions saved to {args.output}")
+        with PredictionWriter(args.output, args.output_format) as writer:
+            writer.write(preds_df)
+        print(f"✅ Predictions saved to {args.output}")
@@ -0,0 +1,118 @@
+"""
+Optional memoization of predictions for repeated feature rows.
+
+- Key = the bundle version + the bytes of the aligned float64 feature row (exact, no
+  hash collisions), built for the whole batch at once; per row only the dict lookup runs
+  in Python, so a miss costs little next to scoring the row.
+- Size-bounded LRU with an optional TTL; hit / miss counters for monitoring.
+- Attached to an `ArtifactRegistry`, entries of a bundle are dropped as soon as that
+  bundle is reloaded, invalidated or evicted.
+- Tree predictions are computed row by row, so cached and uncached values are bit-identical.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from src.inference_pipeline.registry import ArtifactRegistry
+
+
+def canonical_rows(X: np.ndarray) -> np.ndarray:
+    """Contiguous float64 rows with -0.0 → 0.0 and a single NaN bit pattern."""
+    X = np.asarray(X, dtype=np.float64)
+    X = np.where(np.isnan(X), np.nan, X + 0.0)
+    return np.ascontiguousarray(X.reshape(X.shape[0], -1))
+
+
+def row_keys(version: str, X: np.ndarray) -> list[bytes]:
+    """One exact key per row: version bytes + canonical row bytes, built in one vectorized pass."""
+    rows = canonical_rows(X).view(np.uint8).reshape(len(X), -1)
+    prefix = np.frombuffer(version.encode(), dtype=np.uint8)
+    keyed = np.empty((len(rows), len(prefix) + rows.shape[1]), dtype=np.uint8)
+    keyed[:, :len(prefix)] = prefix
+    keyed[:, len(prefix):] = rows
+    # A void row converts straight to a bytes object (no per-row hashing in Python)
+    return keyed.view(np.dtype((np.void, keyed.shape[1]))).ravel().tolist()
+
+
+class PredictionCache:
+    """LRU + TTL cache of predictions keyed by (bundle version, feature row)."""
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl_seconds: float | None = None,
+        registry: ArtifactRegistry | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # row key → (version, prediction, expires_at)
+        self._entries: OrderedDict[bytes, tuple[str, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.add_discard_listener(self.discard_version)
+
+    def predict(
+        self,
+        version: str,
+        X: np.ndarray,
+        score: Callable[[np.ndarray], np.ndarray],
+    ) -> np.ndarray:
+        """Return predictions for every row of X; `score(idx)` is called for the missing rows only."""
+        keys = row_keys(version, X)
+        preds = np.empty(len(keys), dtype=np.float64)
+        missing: list[int] = []
+        now = time.monotonic()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[2] >= now:
+                    self._entries.move_to_end(key)
+                    preds[i] = entry[1]
+                else:
+                    if entry is not None:  # expired
+                        del self._entries[key]
+                    missing.append(i)
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            idx = np.asarray(missing)
+            fresh = np.asarray(score(idx), dtype=np.float64)
+            preds[idx] = fresh
+            expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+            with self._lock:
+                # Missing keys are absent (expired ones were deleted), so update() appends them as newest
+                self._entries.update(zip([keys[i] for i in missing], [(version, v, expires_at) for v in fresh.tolist()]))
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return preds
+
+    def discard_version(self, version: str) -> None:
+        """Drop every entry computed with the given bundle version."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[0] == version]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,212 @@
+"""
+In-process artifact registry for the inference pipeline.
+
+- Loads the model, encoders and training feature schema ONCE as a single bundle.
+- Bundles are keyed by artifact paths + (mtime, size) fingerprint, so a retrained
+  model dropped on disk is picked up on the next call.
+- Bounded LRU eviction and an explicit invalidate / reload API.
+- A model path ending in `.npz` loads the compiled NumPy trees instead of the pickle,
+  so LightGBM is never imported.
+- A model path ending in `.bundle` is a single-file inference bundle (model + encoders +
+  schema, memory-mapped); the other paths are ignored.
+- Bundles are keyed by the requested paths (normalized, not resolved). Suffix-less
+  table paths are resolved to their stored file when a bundle is loaded or
+  revalidated, so with `revalidate=False` a warm lookup is a pure in-memory hit (no
+  stat calls), which is what the Lambda handler uses.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from joblib import load
+
+from src.feature_pipeline.feature_engineering import as_frequency_encoder
+from src.inference_pipeline.bundle import BUNDLE_SUFFIX, read_inference_bundle
+from src.inference_pipeline.compiled_trees import CompiledTrees
+from src.storage import SUFFIXES, read_columns, resolve_table, table_exists
+
+
+@dataclass(frozen=True, eq=False)
+class ArtifactBundle:
+    """Everything `predict` needs, loaded together (hashed by identity)."""
+
+    model: Any
+    freq_encoder: Any | None
+    target_encoder: Any | None
+    feature_columns: list[str] | None
+    version: str
+    # Lat/lng tables shipped with the artifacts; None → read the CSVs under data/raw/
+    metros: Any | None = None
+    zip_centroids: Any | None = None
+
+
+def read_feature_columns(train_features_path: Path | str) -> list[str] | None:
+    """Read the training feature list (header / schema only) from the feature-engineered train table."""
+    if not table_exists(train_features_path):
+        return None
+    return [c for c in read_columns(train_features_path) if c != "price"]
+
+
+def _table_path(path: Path | str | None) -> Path | str | None:
+    # A suffix-less table path (e.g. data/processed/feature_engineered_train) is resolved
+    # to the stored Parquet/CSV file; explicit files are used as given (no stat).
+    if not path or Path(path).suffix in SUFFIXES.values():
+        return path
+    try:
+        return resolve_table(path)
+    except FileNotFoundError:
+        return path
+
+
+def load_model(model_path: Path | str) -> Any:
+    """Unpickle the LightGBM model, or load its compiled `.npz` export."""
+    if str(model_path).endswith(".npz"):
+        return CompiledTrees.load(model_path)
+    return load(model_path)
+
+
+def _normalize_path(path: Path | str | None) -> str | None:
+    # os.path.abspath does not touch the filesystem (unlike Path.resolve)
+    return os.path.abspath(os.fspath(path)) if path else None
+
+
+def _fingerprint(path: str | None) -> tuple[int, int] | None:
+    """(mtime_ns, size) of an artifact, or None if it is not provided / missing."""
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ArtifactRegistry:
+    """Bounded LRU of loaded `ArtifactBundle`s."""
+
+    def __init__(self, maxsize: int = 4, revalidate: bool = True):
+        self.maxsize = maxsize
+        self.revalidate = revalidate
+        # key -> (resolved paths, fingerprints, bundle)
+        self._entries: OrderedDict[tuple, tuple[tuple, tuple, ArtifactBundle]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._discard_listeners: list[Callable[[str], None]] = []
+
+    def add_discard_listener(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(version)` whenever a bundle is reloaded, invalidated or evicted."""
+        self._discard_listeners.append(callback)
+
+    def _discarded(self, bundle: ArtifactBundle) -> None:
+        for callback in self._discard_listeners:
+            callback(bundle.version)
+
+    @staticmethod
+    def _key(model_path, freq_encoder_path, target_encoder_path, train_features_path) -> tuple:
+        # Pure string work: no filesystem access on the lookup path
+        return tuple(_normalize_path(p) for p in (model_path, freq_encoder_path, target_encoder_path, train_features_path))
+
+    @staticmethod
+    def _resolve(key: tuple) -> tuple:
+        """Key → the files actually read (the train features table resolved to Parquet/CSV)."""
+        model_path, freq_path, target_path, train_features_path = key
+        return model_path, freq_path, target_path, _normalize_path(_table_path(train_features_path))
+
+    @staticmethod
+    def _load(paths: tuple, fingerprints: tuple) -> ArtifactBundle:
+        model_path, freq_path, target_path, train_features_path = paths
+        if fingerprints[0] is None:
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        if model_path.endswith(BUNDLE_SUFFIX):
+            return ArtifactBundle(**read_inference_bundle(model_path, verify=False))  # size checks only
+
+        digest = hashlib.sha1(repr((paths, fingerprints)).encode()).hexdigest()[:12]
+        return ArtifactBundle(
+            model=load_model(model_path),
+            freq_encoder=as_frequency_encoder(load(freq_path)) if fingerprints[1] is not None else None,
+            target_encoder=load(target_path) if fingerprints[2] is not None else None,
+            feature_columns=read_feature_columns(train_features_path) if fingerprints[3] is not None else None,
+            version=digest,
+        )
+
+    def peek(
+        self,
+        model_path: Path | str,
+        freq_encoder_path: Path | str | None = None,
+        target_encoder_path: Path | str | None = None,
+        train_features_path: Path | str | None = None,
+    ) -> ArtifactBundle | None:
+        """Return the cached bundle for these paths without loading or checking disk."""
+        key = self._key(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def get(
+        self,
+        model_path: Path | str,
+        freq_encoder_path: Path | str | None = None,
+        target_encoder_path: Path | str | None = None,
+        train_features_path: Path | str | None = None,
+    ) -> ArtifactBundle:
+        """Return the bundle for these paths, loading it on a miss or when the files changed."""
+        key = self._key(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self.revalidate:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+            paths = self._resolve(key)
+            fingerprints = tuple(_fingerprint(p) for p in paths)
+            if entry is not None and entry[:2] == (paths, fingerprints):
+                self._entries.move_to_end(key)
+                return entry[2]
+
+            bundle = self._load(paths, fingerprints)
+            if entry is not None:  # files changed on disk
+                self._discarded(entry[2])
+            self._entries[key] = (paths, fingerprints, bundle)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._discarded(evicted)
+            return bundle
+
+    def invalidate(self, model_path: Path | str | None = None) -> None:
+        """Drop cached bundles (all of them, or only those built from `model_path`)."""
+        target = _normalize_path(model_path)
+        with self._lock:
+            keys = [k for k in self._entries if target is None or k[0] == target]
+            for key in keys:
+                self._discarded(self._entries.pop(key)[2])
+
+    def reload(
+        self,
+        model_path: Path | str,
+        freq_encoder_path: Path | str | None = None,
+        target_encoder_path: Path | str | None = None,
+        train_features_path: Path | str | None = None,
+    ) -> ArtifactBundle:
+        """Force a fresh load from disk."""
+        key = self._key(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._discarded(entry[2])
+        return self.get(model_path, freq_encoder_path, target_encoder_path, train_features_path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared registry used by `predict` when no bundle is passed explicitly.
+ARTIFACT_REGISTRY = ArtifactRegistry()
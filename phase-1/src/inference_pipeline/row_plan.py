@@ -0,0 +1,179 @@
+"""
+Single-record fast path for the inference pipeline.
+
+- Most API calls carry ONE record; running the pandas pipeline for it is mostly overhead.
+- A `RowPlan` is compiled once per artifact bundle from the fitted encoders and the
+  training feature schema, and turns a raw dict straight into a float vector in
+  training column order.
+- Missing lat/lng are filled from the metros table (bundled or read once).
+- Records the plan cannot reproduce exactly (outliers, non-numeric values, ...)
+  return None so callers fall back to `predict`.
+"""
+
+from __future__ import annotations
+import numbers
+from functools import lru_cache
+from typing import Any, Mapping
+
+import numpy as np
+
+from src.feature_pipeline.dates import date_parts_of
+from src.feature_pipeline.preprocess import (
+    METROS_PATH,
+    OUTLIER_PRICE,
+    ZIP_CENTROIDS_PATH,
+    canonical_city,
+    fill_from_nearest_metro,
+    load_metro_table,
+    load_zip_centroids,
+)
+from src.inference_pipeline.prediction_cache import PredictionCache
+from src.inference_pipeline.registry import ArtifactBundle
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (numbers.Real, np.bool_))
+
+
+class RowPlan:
+    """Precompiled dict → feature vector transform for one artifact bundle."""
+
+    def __init__(self, bundle: ArtifactBundle, feature_columns: list[str]):
+        # Score through the LightGBM booster directly: the sklearn wrapper re-validates
+        # NumPy input on every call, which costs more than the prediction itself.
+        self.model = getattr(bundle.model, "booster_", bundle.model)
+        self.version = bundle.version
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self._positions = {c: i for i, c in enumerate(self.feature_columns)}
+
+        # Frequency encoder: zipcode → count (unknown → 0)
+        self.freq_lookup = None
+        if bundle.freq_encoder is not None:
+            self.freq_lookup = {k: float(v) for k, v in bundle.freq_encoder.mapping.items()}
+
+        # Target encoder: normalized city → mean price (unknown → global mean)
+        self.target_lookup = None
+        self.target_default = 0.0
+        if bundle.target_encoder is not None:
+            self.target_lookup = {k: float(v) for k, v in bundle.target_encoder.mapping.items()}
+            self.target_default = float(bundle.target_encoder.global_mean)
+
+        # `clean_and_merge` fills lat/lng from the metros table when it is available
+        metros = bundle.metros if bundle.metros is not None else load_metro_table(METROS_PATH)
+        self.metros_lookup = None
+        self.nearest_metro_by_zip = {}
+        if metros is not None:
+            self.metros_lookup = dict(zip(np.asarray(metros.keys).tolist(), zip(metros.lat.tolist(), metros.lng.tolist())))
+            # Unmatched cities: nearest metro to every zip centroid, resolved in one batch here
+            zips = bundle.zip_centroids if bundle.zip_centroids is not None else load_zip_centroids(ZIP_CENTROIDS_PATH)
+            if zips is not None:
+                lat = np.full(len(zips), np.nan)
+                lng = np.full(len(zips), np.nan)
+                fill_from_nearest_metro(lat, lng, zips.keys, metros, zips)
+                self.nearest_metro_by_zip = dict(zip(np.asarray(zips.keys).tolist(), zip(lat.tolist(), lng.tolist())))
+
+    def _derived_values(self, record: Mapping[str, Any]) -> dict[str, float] | None:
+        derived: dict[str, float] = {}
+
+        if "date" in record:
+            date = record["date"]
+            if not isinstance(date, str):
+                return None
+            parts = date_parts_of(date)
+            if parts is None:
+                return None
+            derived["year"], derived["quarter"], derived["month"] = (float(v) for v in parts)
+
+        if self.freq_lookup is not None and "zipcode" in record:
+            zipcode = record["zipcode"]
+            if isinstance(zipcode, (bool, np.bool_)) or not (zipcode is None or isinstance(zipcode, (str, numbers.Real))):
+                return None
+            derived["zipcode_freq"] = self.freq_lookup.get(zipcode, 0.0)
+
+        if "city_full" in record:
+            city = record["city_full"]
+            if city is not None and not isinstance(city, str):
+                return None
+            if city is not None:
+                city = canonical_city(city)
+            if self.target_lookup is not None:
+                derived["city_full_encoded"] = self.target_lookup.get(city, self.target_default)
+            if self.metros_lookup is not None and not {"lat", "lng"}.issubset(record):
+                lat_lng = self.metros_lookup.get(city)
+                if lat_lng is None or np.isnan(lat_lng).any():
+                    zipcode = record.get("zipcode")
+                    if isinstance(zipcode, (bool, np.bool_)) or not (zipcode is None or isinstance(zipcode, (str, numbers.Real))):
+                        return None
+                    lat_lng = self.nearest_metro_by_zip.get(zipcode, (np.nan, np.nan))
+                derived["lat"], derived["lng"] = lat_lng
+
+        return derived
+
+    def vectorize(self, record: Mapping[str, Any]) -> np.ndarray | None:
+        """Return a (1, n_features) float64 row, or None if the record needs the full pipeline."""
+        if not record:
+            return None
+
+        # remove_outliers drops the row (NaN included) → leave it to `predict`
+        if "median_list_price" in record:
+            price = record["median_list_price"]
+            if not _is_number(price) or not price <= OUTLIER_PRICE:
+                return None
+
+        derived = self._derived_values(record)
+        if derived is None:
+            return None
+
+        row = np.zeros((1, self.n_features), dtype=np.float64)  # reindex(fill_value=0)
+        for col, pos in self._positions.items():
+            if col in derived:
+                value = derived[col]
+            elif col in record:
+                value = record[col]
+                if not _is_number(value):
+                    return None
+            else:
+                continue
+            row[0, pos] = value
+        return row
+
+    def predict_record(
+        self, record: Mapping[str, Any], cache: PredictionCache | None = None
+    ) -> tuple[float, float | None] | None:
+        """Score one raw record → (predicted_price, actual_price or None), or None to fall back."""
+        row = self.vectorize(record)
+        if row is None:
+            return None
+        actual = None
+        if "price" in record:
+            actual = record["price"]
+            if actual is None:
+                actual = float("nan")
+            elif not _is_number(actual):
+                return None
+        if cache is not None:
+            pred = float(cache.predict(self.version, row, lambda idx: self.model.predict(row[idx]))[0])
+        else:
+            pred = float(self.model.predict(row)[0])
+        return pred, (float(actual) if actual is not None else None)
+
+
+@lru_cache(maxsize=4)
+def compile_row_plan(bundle: ArtifactBundle) -> RowPlan | None:
+    """Build (once per bundle) the row plan; None when the training schema is unknown."""
+    if bundle.feature_columns is None:
+        return None
+    return RowPlan(bundle, bundle.feature_columns)
+
+
+def predict_record(
+    record: Mapping[str, Any], bundle: ArtifactBundle, cache: PredictionCache | None = None
+) -> tuple[float, float | None] | None:
+    """Fast path for a single raw record; returns None when `predict` must be used instead."""
+    if not isinstance(record, Mapping):
+        return None
+    plan = compile_row_plan(bundle)
+    if plan is None:
+        return None
+    return plan.predict_record(record, cache=cache)
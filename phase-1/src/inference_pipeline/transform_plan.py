@@ -0,0 +1,153 @@
+"""
+Fused, copy-free featurization for batch inference.
+
+`predict` used to run clean_and_merge → drop_duplicates → remove_outliers →
+add_date_features → encoders → drop_unused_columns → reindex, copying the frame
+several times along the way. A `TransformPlan` compiles those steps once per artifact
+bundle and training schema, then for each input frame:
+
+- never copies or mutates the input (columns are read as NumPy views),
+- computes categorical work (city normalization, encodings, metros lookup, date
+  parts) once per distinct value and broadcasts it with factorized codes,
+- writes every output column exactly once into a preallocated column-major matrix
+  in training column order (it becomes the DataFrame block without another copy).
+
+Integer columns of the schema (year, month, zipcode, ...) come out of the float matrix
+as floats; `restore_dtypes` casts them back for the returned predictions frame.
+
+Calls without a known training schema keep the step-by-step pipeline.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.feature_pipeline.dates import date_features
+from src.feature_pipeline.preprocess import (
+    DUPLICATE_IGNORE,
+    METROS_PATH,
+    OUTLIER_PRICE,
+    ZIP_CENTROIDS_PATH,
+    canonical_city,
+    fill_from_nearest_metro,
+    load_metro_table,
+    load_zip_centroids,
+)
+from src.inference_pipeline.registry import ArtifactBundle
+from src.schema import cast_int_columns
+
+
+def _fill(out_col: np.ndarray, values: np.ndarray, kept: np.ndarray | None) -> None:
+    """Write `values[kept]` into a preallocated output column without temporaries."""
+    if kept is None:
+        out_col[...] = values
+    elif values.dtype == out_col.dtype:
+        np.take(values, kept, out=out_col)
+    else:
+        out_col[...] = values[kept]
+
+
+class TransformPlan:
+    """Raw frame → (feature matrix, index, actuals) for one bundle + training schema."""
+
+    def __init__(self, bundle: ArtifactBundle, feature_columns: list[str], dtype=np.float64):
+        self.feature_columns = list(feature_columns)
+        self.dtype = np.dtype(dtype)
+        self.freq_encoder = bundle.freq_encoder
+        self.target_encoder = bundle.target_encoder
+        self.metros = bundle.metros if bundle.metros is not None else load_metro_table(METROS_PATH)
+        self.zip_centroids = (
+            bundle.zip_centroids if bundle.zip_centroids is not None else load_zip_centroids(ZIP_CENTROIDS_PATH)
+        )
+
+    def _will_merge(self, df: pd.DataFrame) -> bool:
+        return "city_full" in df.columns and not {"lat", "lng"}.issubset(df.columns) and self.metros is not None
+
+    def _city_columns(self, df: pd.DataFrame, merge: bool) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """Per-row derived city values, computed once per distinct raw city."""
+        codes, uniques = pd.factorize(df["city_full"], use_na_sentinel=False)
+        normalized = pd.Series([c if pd.isna(c) else canonical_city(c) for c in uniques], dtype=object)
+
+        derived = {}
+        if self.target_encoder is not None:
+            derived["city_full_encoded"] = np.asarray(self.target_encoder.transform(normalized), dtype=np.float64)[codes]
+        if merge:
+            lat, lng = self.metros.lookup(normalized)
+            derived["lat"], derived["lng"] = lat[codes], lng[codes]
+
+        # Normalized-city codes stand in for the cleaned city column in duplicate detection
+        normalized_codes = pd.factorize(normalized, use_na_sentinel=False)[0][codes]
+        return derived, normalized_codes
+
+    def _keep_mask(self, df: pd.DataFrame, normalized_codes: np.ndarray | None, merge: bool) -> np.ndarray:
+        subset = {}
+        for col in df.columns:
+            # merged lat/lng are a function of the city, which is already in the subset
+            if col in DUPLICATE_IGNORE or (merge and col in ("lat", "lng")):
+                continue
+            subset[col] = normalized_codes if col == "city_full" and normalized_codes is not None else df[col]
+        keep = ~pd.DataFrame(subset, copy=False).duplicated(keep=False).to_numpy()
+
+        if "median_list_price" in df.columns:
+            keep &= df["median_list_price"].to_numpy() <= OUTLIER_PRICE
+        return keep
+
+    def transform(self, df: pd.DataFrame) -> tuple[np.ndarray, pd.Index, np.ndarray | None]:
+        merge = self._will_merge(df)
+
+        derived: dict[str, np.ndarray] = {}
+        normalized_codes = None
+        if "city_full" in df.columns:
+            derived, normalized_codes = self._city_columns(df, merge)
+        if merge and self.zip_centroids is not None and "zipcode" in df.columns:
+            fill_from_nearest_metro(derived["lat"], derived["lng"], df["zipcode"].to_numpy(), self.metros, self.zip_centroids)
+
+        keep = self._keep_mask(df, normalized_codes, merge)
+        kept = None if keep.all() else np.flatnonzero(keep)
+        n_out = len(df) if kept is None else len(kept)
+        index = df.index if kept is None else df.index[kept]
+
+        if "date" in df.columns:
+            _, parts = date_features(df["date"])
+            derived.update(parts)
+
+        if self.freq_encoder is not None and "zipcode" in df.columns:
+            codes, uniques = pd.factorize(df["zipcode"], use_na_sentinel=False)
+            freq = self.freq_encoder.transform(pd.Series(uniques))
+            derived["zipcode_freq"] = freq.to_numpy(dtype=np.float64)[codes]
+
+        # Column-major so every output column is one contiguous, write-once slot
+        X = np.zeros((n_out, len(self.feature_columns)), dtype=self.dtype, order="F")
+        for j, col in enumerate(self.feature_columns):
+            if col in derived:
+                values = derived[col]
+            elif col in df.columns:
+                series = df[col]
+                if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+                    raise ValueError(f"Feature column '{col}' must be int, float or bool, got {series.dtype}")
+                values = series.to_numpy()
+            else:
+                continue  # reindex(fill_value=0)
+            _fill(X[:, j], values, kept)
+
+        y_true = None
+        if "price" in df.columns:
+            y_true = df["price"].to_numpy()
+            y_true = y_true if kept is None else y_true[kept]
+        return X, index, y_true
+
+    def to_frame(self, X: np.ndarray, index: pd.Index) -> pd.DataFrame:
+        # A 2-D column-major array is exactly pandas' block layout: no copy
+        return pd.DataFrame(X, columns=self.feature_columns, index=index, copy=False)
+
+    def restore_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast the integer schema columns back from float (in place; NaN / fractional values stay float)."""
+        return cast_int_columns(df)
+
+
+@lru_cache(maxsize=8)
+def compile_transform_plan(bundle: ArtifactBundle, feature_columns: tuple[str, ...]) -> TransformPlan:
+    """Build (once per bundle + schema) the fused transform plan."""
+    return TransformPlan(bundle, list(feature_columns))
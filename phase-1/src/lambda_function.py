@@ -13,6 +13,9 @@ import boto3
 import pandas as pd
 
 from src.inference_pipeline.inference import predict
+from src.inference_pipeline.prediction_cache import PredictionCache
+from src.inference_pipeline.registry import ArtifactBundle, ArtifactRegistry
+from src.inference_pipeline.row_plan import predict_record
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -23,16 +26,40 @@ REGION_NAME = os.environ.get("REGION_NAME")
 
 # These are the folders paths INSIDE the S3 bucket (NOT our local project paths !)
 MODEL_KEY = os.environ.get("MODEL_KEY", "models/lgbm_model.pkl") # or models/lgbm_best_model.pkl
+# A compiled export (e.g. models/lgbm_model_trees.npz) is scored with NumPy only, no LightGBM import.
 FREQ_ENCODER_KEY = os.environ.get("FREQ_ENCODER_KEY", "models/freq_encoder.pkl")
 TARGET_ENCODER_KEY = os.environ.get("TARGET_ENCODER_KEY", "models/target_encoder.pkl")
+# Serving is CSV / bundle only: the Lambda layers ship without pyarrow, so export the
+# features table with `fmt="csv"` (or PIPELINE_STORAGE_FORMAT=csv), or use BUNDLE_KEY.
 TRAIN_FEATURES_KEY = os.environ.get("TRAIN_FEATURES_KEY", "processed/feature_engineered_train.csv")
+# Single-file bundle written by the training pipeline (e.g. models/lgbm_model.bundle).
+# When set, it replaces the four artifacts above: one download + one mmap on cold start.
+BUNDLE_KEY = os.environ.get("BUNDLE_KEY")
 ARTIFACT_DIR = Path(os.environ.get("ARTIFACT_DIR", "/tmp/ml_artifacts"))
+# Optional memoization of repeated requests (0 = disabled)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+
+if not BUNDLE_KEY and Path(TRAIN_FEATURES_KEY).suffix != ".csv":
+    raise ValueError(
+        f"TRAIN_FEATURES_KEY must point to a CSV file (got {TRAIN_FEATURES_KEY}): "
+        "the Lambda layers do not include pyarrow. Set BUNDLE_KEY or upload the CSV export."
+    )
 
 if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
     ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
 
 s3_client = boto3.client("s3", region_name= REGION_NAME)
 
+# Artifacts in ARTIFACT_DIR never change during the life of a container, so warm
+# invocations are served straight from memory without re-checking the files.
+artifact_registry = ArtifactRegistry(maxsize=1, revalidate=False)
+prediction_cache = (
+    PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, registry=artifact_registry)
+    if PREDICTION_CACHE_SIZE > 0
+    else None
+)
+
 
 def _ensure_local_artifact(key: str | None) -> Path | None:
     """Download an artifact from S3 the first time it is requested and reuse it afterwards."""
@@ -47,6 +74,32 @@ def _ensure_local_artifact(key: str | None) -> Path | None:
     return local_path
 
 
+def _load_bundle() -> ArtifactBundle:
+    """Return the warm artifact bundle; download + load it only on a cold start."""
+    if BUNDLE_KEY:
+        bundle_path = ARTIFACT_DIR / Path(BUNDLE_KEY)
+        bundle = artifact_registry.peek(bundle_path)
+        if bundle is None:
+            bundle = artifact_registry.get(_ensure_local_artifact(BUNDLE_KEY))
+        return bundle
+
+    local_paths = [
+        ARTIFACT_DIR / Path(key) if key else None
+        for key in (MODEL_KEY, FREQ_ENCODER_KEY, TARGET_ENCODER_KEY, TRAIN_FEATURES_KEY)
+    ]
+    bundle = artifact_registry.peek(*local_paths)
+    if bundle is not None:
+        return bundle
+
+    model_path = _ensure_local_artifact(MODEL_KEY)
+    if model_path is None or not model_path.exists():
+        raise FileNotFoundError("Model file is not available locally")
+    for key in (FREQ_ENCODER_KEY, TARGET_ENCODER_KEY, TRAIN_FEATURES_KEY):
+        _ensure_local_artifact(key)
+
+    return artifact_registry.get(*local_paths)
+
+
 def _parse_event(event: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Extract payload from an API Gateway proxy event and normalize to a list."""
     if "body" not in event:
@@ -82,25 +135,23 @@ def lambda_handler(event, context):
     """AWS Lambda handler compatible with API Gateway proxy integration."""
     try:
         records = _parse_event(event)
+        bundle = _load_bundle()
+
+        # Single-record fast path: dict → feature vector → model, no DataFrame involved
+        if len(records) == 1:
+            fast = predict_record(records[0], bundle, cache=prediction_cache)
+            if fast is not None:
+                prediction, actual = fast
+                fast_body: Dict[str, Any] = {"predictions": [prediction], "count": 1}
+                if actual is not None:
+                    fast_body["actuals"] = [actual]
+                return _build_response(200, fast_body)
+
         df = pd.DataFrame(records)
         if df.empty:
             raise ValueError("Request payload produced an empty DataFrame")
 
-        model_path = _ensure_local_artifact(MODEL_KEY)
-        if model_path is None or not model_path.exists():
-            raise FileNotFoundError("Model file is not available locally")
-
-        freq_path = _ensure_local_artifact(FREQ_ENCODER_KEY)
-        target_path = _ensure_local_artifact(TARGET_ENCODER_KEY)
-        train_path = _ensure_local_artifact(TRAIN_FEATURES_KEY)
-
-        preds_df = predict(
-            df,
-            model_path=model_path,
-            freq_encoder_path=freq_path,
-            target_encoder_path=target_path,
-            train_features_path=train_path,
-        )
+        preds_df = predict(df, bundle=bundle, cache=prediction_cache)
 
         response_body: Dict[str, Any] = {
             "predictions": preds_df["predicted_price"].astype(float).tolist(),
@@ -0,0 +1,310 @@
+"""
+Cached runner for the load → preprocess → feature engineering → train → eval DAG.
+
+- Each stage is fingerprinted from its input file contents, its parameters (cutoff
+  dates, CITY_MAPPING, storage format, model params, ...) and the source of the code
+  it runs: its entry module plus every `src.*` module that one imports, transitively
+  (found statically from the import statements). A stage whose fingerprint was seen
+  before is not re-run: its outputs are restored from the content-addressed cache
+  under data/.pipeline_cache/.
+- Independent stages (the three preprocess splits) run concurrently in a thread pool.
+- Prints a per-stage hit / miss + timing report.
+
+Run from phase-1/:
+    python -m src.pipeline                     # everything, cached
+    python -m src.pipeline --force train       # re-run one stage (and anything downstream)
+"""
+
+from __future__ import annotations
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+from src import storage
+from src.feature_pipeline import feature_engineering, load, preprocess
+from src.inference_pipeline import bundle, compiled_trees
+from src.training_pipeline import eval as evaluate, train
+
+CACHE_DIR = Path("data/.pipeline_cache")
+SPLITS = ("train", "eval", "holdout")
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Any]
+    inputs: list[Path]
+    outputs: list[Path]
+    params: dict[str, Any] = field(default_factory=dict)
+    code: list[ModuleType] = field(default_factory=list)  # entry modules; their src.* imports are added
+    deps: list[str] = field(default_factory=list)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "hit" | "miss" | "forced"
+    seconds: float
+    key: str
+
+
+# ---------- fingerprints ----------
+
+@lru_cache(maxsize=1024)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(path: Path | str) -> str | None:
+    """sha256 of a file's contents (memoized by mtime/size), None if missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _hash_file(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _src_imports(path: str, mtime_ns: int) -> tuple[str, ...]:
+    """Names of the `src.*` modules / objects imported by the source file at `path`."""
+    names = set()
+    for node in ast.walk(ast.parse(Path(path).read_bytes(), filename=path)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            # `from src.pkg import mod` imports a module, `from src.mod import name` an object
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return tuple(sorted(n for n in names if n == "src" or n.startswith("src.")))
+
+
+def code_closure(modules: list[ModuleType]) -> dict[str, str]:
+    """{module name: source path} for `modules` and every src.* module they import, transitively."""
+    found: dict[str, str] = {}
+    pending = [m.__name__ for m in modules]
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):  # `src.mod.name` where name is not a module
+            spec = None
+        if spec is None or not (spec.origin or "").endswith(".py"):
+            continue
+        found[name] = spec.origin
+        pending.extend(_src_imports(spec.origin, os.stat(spec.origin).st_mtime_ns))
+        parent = name.rpartition(".")[0]
+        if parent:
+            pending.append(parent)  # the package __init__ runs on import too
+    return dict(sorted(found.items()))
+
+
+def _code_digest(modules: list[ModuleType]) -> str:
+    digest = hashlib.sha256()
+    for name, path in code_closure(modules).items():
+        digest.update(name.encode())
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def stage_key(stage: Stage) -> str:
+    payload = {
+        "stage": stage.name,
+        "code": _code_digest(stage.code),
+        "params": stage.params,
+        "inputs": {str(p): file_digest(p) for p in stage.inputs},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+# ---------- cache ----------
+
+class StageCache:
+    """Content-addressed store: <cache_dir>/<stage>/<key>/{manifest.json, outputs...}."""
+
+    def __init__(self, cache_dir: Path | str = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _entry(self, stage: Stage, key: str) -> Path:
+        return self.cache_dir / stage.name.replace(":", "_") / key
+
+    def restore(self, stage: Stage, key: str) -> bool:
+        """Put the cached outputs in place; False if this key was never stored."""
+        entry = self._entry(stage, key)
+        manifest_path = entry / "manifest.json"
+        if not manifest_path.exists():
+            return False
+        manifest = json.loads(manifest_path.read_text())
+        for i, out in enumerate(stage.outputs):
+            if file_digest(out) == manifest["outputs"].get(str(out)):
+                continue  # already up to date on disk
+            out.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entry / str(i), out)  # copy, not link: stages rewrite outputs in place
+        return True
+
+    def store(self, stage: Stage, key: str, seconds: float) -> None:
+        entry = self._entry(stage, key)
+        tmp = entry.with_name(entry.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        outputs = {}
+        for i, out in enumerate(stage.outputs):
+            if not out.exists():
+                raise FileNotFoundError(f"Stage '{stage.name}' did not produce {out}")
+            shutil.copy2(out, tmp / str(i))
+            outputs[str(out)] = file_digest(out)
+        (tmp / "manifest.json").write_text(json.dumps({"stage": stage.name, "outputs": outputs, "seconds": seconds}))
+        shutil.rmtree(entry, ignore_errors=True)
+        tmp.rename(entry)  # publish atomically
+
+
+# ---------- DAG ----------
+
+def default_stages(model_params: dict | None = None) -> list[Stage]:
+    raw_dir, processed_dir = Path(preprocess.RAW_DIR), Path(preprocess.PROCESSED_DIR)
+    fmt = storage.default_format()
+    table = lambda stem: storage.table_path(stem, fmt)  # noqa: E731
+
+    stages = [
+        Stage(
+            name="load",
+            run=load.load_and_split_data,
+            inputs=[Path(load.RAW_PATH)],
+            outputs=[table(Path(load.DATA_DIR) / s) for s in SPLITS],
+            params={"cutoff_eval": load.CUTOFF_DATE_EVAL, "cutoff_holdout": load.CUTOFF_DATE_HOLDOUT, "format": fmt},
+            code=[load],
+        )
+    ]
+    for split in SPLITS:
+        stages.append(Stage(
+            name=f"preprocess:{split}",
+            run=lambda split=split: preprocess.preprocess_split(split),
+            inputs=[table(raw_dir / split), Path(preprocess.METROS_PATH), Path(preprocess.ZIP_CENTROIDS_PATH)],
+            outputs=[table(processed_dir / f"cleaning_{split}")],
+            params={"city_mapping": preprocess.CITY_MAPPING, "format": fmt},
+            code=[preprocess],
+            deps=["load"],
+        ))
+    encoders = [feature_engineering.MODELS_DIR / "freq_encoder.pkl", feature_engineering.MODELS_DIR / "target_encoder.pkl"]
+    stages.append(Stage(
+        name="features",
+        run=feature_engineering.run_feature_engineering,
+        inputs=[table(processed_dir / f"cleaning_{s}") for s in SPLITS],
+        outputs=[table(processed_dir / f"feature_engineered_{s}") for s in SPLITS] + encoders,
+        params={"format": fmt},
+        code=[feature_engineering],
+        deps=[f"preprocess:{s}" for s in SPLITS],
+    ))
+    model_out = Path(train.DEFAULT_OUT)
+    stages.append(Stage(
+        name="train",
+        run=lambda: train.train_model(model_params=model_params),
+        inputs=[table(train.DEFAULT_TRAIN), table(train.DEFAULT_EVAL), *encoders,
+                Path(preprocess.METROS_PATH), Path(preprocess.ZIP_CENTROIDS_PATH)],
+        outputs=[model_out, compiled_trees.compiled_trees_path(model_out), model_out.with_suffix(bundle.BUNDLE_SUFFIX)],
+        params={"model_params": model_params or {}},
+        code=[train],
+        deps=["features"],
+    ))
+    stages.append(Stage(
+        name="eval",
+        run=evaluate.evaluate_model,
+        inputs=[model_out, table(evaluate.DEFAULT_EVAL)],
+        outputs=[],
+        code=[evaluate],
+        deps=["train"],
+    ))
+    return stages
+
+
+def _downstream(stages: list[Stage], names: set[str]) -> set[str]:
+    out = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in stages:
+            if stage.name not in out and out.intersection(stage.deps):
+                out.add(stage.name)
+                changed = True
+    return out
+
+
+def run_pipeline(
+    stages: list[Stage] | None = None,
+    force: tuple[str, ...] = (),
+    workers: int = 4,
+    cache_dir: Path | str = CACHE_DIR,
+    model_params: dict | None = None,
+) -> list[StageResult]:
+    """Run the DAG, skipping stages whose fingerprint is cached; returns per-stage results."""
+    stages = stages if stages is not None else default_stages(model_params)
+    by_name = {s.name: s for s in stages}
+    unknown = set(force) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+    forced = _downstream(stages, set(force))
+    cache = StageCache(cache_dir)
+
+    def execute(stage: Stage) -> StageResult:
+        t0 = time.perf_counter()
+        # Fingerprint at run time: inputs are the outputs of stages that just finished
+        key = stage_key(stage)
+        if stage.name not in forced and stage.outputs and cache.restore(stage, key):
+            return StageResult(stage.name, "hit", time.perf_counter() - t0, key)
+        stage.run()
+        seconds = time.perf_counter() - t0
+        if stage.outputs:
+            cache.store(stage, key, seconds)
+        return StageResult(stage.name, "forced" if stage.name in forced else "miss", seconds, key)
+
+    results: dict[str, StageResult] = {}
+    pending = {s.name for s in stages}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending or running:
+            ready = [n for n in pending if all(d in results for d in by_name[n].deps)]
+            for name in sorted(ready):
+                pending.discard(name)
+                running[pool.submit(execute, by_name[name])] = name
+            if not running:
+                raise ValueError(f"Unsatisfiable dependencies for: {sorted(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+
+    ordered = [results[s.name] for s in stages]
+    print("📦 Pipeline stages:")
+    for r in ordered:
+        print(f"   {r.name:20s} {r.status:6s} {r.seconds:8.2f}s  key={r.key}")
+    hits = sum(r.status == "hit" for r in ordered)
+    print(f"✅ {hits}/{len(ordered)} stages served from cache.")
+    return ordered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipeline with stage caching.")
+    parser.add_argument("--force", nargs="*", default=[], help="Stage names to re-run (plus everything downstream)")
+    parser.add_argument("--workers", type=int, default=4, help="Max stages running concurrently")
+    parser.add_argument("--cache_dir", type=str, default=str(CACHE_DIR))
+    parser.add_argument("--n_estimators", type=int, default=None, help="Override the model's n_estimators")
+    args = parser.parse_args()
+
+    params = {"n_estimators": args.n_estimators} if args.n_estimators else None
+    run_pipeline(force=tuple(args.force), workers=args.workers, cache_dir=args.cache_dir, model_params=params)
@@ -0,0 +1,96 @@
+"""
+Column schema shared by every pipeline stage.
+
+- One declared dtype per known housing column: float32 for the measurements, small
+  ints for ids / date parts, category for the city strings. Prices, lat/lng and the
+  target (`price`) stay float64.
+- `src.storage.read_table` / `iter_table` apply it at parse time, so load, preprocess,
+  feature engineering, training, eval and the inference CLI all get the same compact
+  frames (roughly half the memory of the float64/int64/object defaults).
+- Integer columns holding NaN or out-of-range values fall back to float32 instead of
+  failing. Columns not listed here keep the parser's dtype.
+"""
+
+from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+TARGET = "price"
+
+FLOAT32_COLUMNS = (
+    "homes_sold", "pending_sales", "new_listings", "inventory", "median_dom", "avg_sale_to_list", "sold_above_list",
+    "off_market_in_two_weeks", "bank", "bus", "hospital", "mall", "park", "restaurant",
+    "school", "station", "supermarket", "Total Population", "Median Age", "Per Capita Income",
+    "Total Families Below Poverty", "Total Housing Units", "Median Rent", "Median Home Value",
+    "Total Labor Force", "Unemployed Population", "Total School Age Population",
+    "Total School Enrollment", "Median Commute Time",
+)
+# Prices and coordinates need float64: float32 rounds 19,000,001 to 19,000,000 (the
+# outlier cut-off) and inference builds these columns in float64 from raw values
+FLOAT64_COLUMNS = (
+    "median_list_price", "median_sale_price", "median_ppsf", "median_list_ppsf",
+    "lat", "lng", "city_full_encoded",
+)
+INT_COLUMNS = {
+    "zipcode": "int32",
+    "year": "int16",
+    "quarter": "int8",
+    "month": "int8",
+    "zipcode_freq": "int32",
+}
+CATEGORY_COLUMNS = ("city", "city_full")
+
+COLUMN_DTYPES: dict[str, str] = {
+    **{c: "float32" for c in FLOAT32_COLUMNS},
+    **{c: "float64" for c in FLOAT64_COLUMNS},
+    **INT_COLUMNS,
+    **{c: "category" for c in CATEGORY_COLUMNS},
+    TARGET: "float64",
+}
+
+
+def parse_dtypes(columns: Iterable[str] | None = None) -> dict[str, str]:
+    """Dtypes the CSV parser can apply directly (integers are checked after parsing)."""
+    wanted = COLUMN_DTYPES if columns is None else {c: COLUMN_DTYPES[c] for c in columns if c in COLUMN_DTYPES}
+    return {c: dtype for c, dtype in wanted.items() if c not in INT_COLUMNS}
+
+
+def compact_dtype(series: pd.Series, dtype: str) -> str:
+    """`dtype` if `series` fits it losslessly, else float32 for integer columns."""
+    if dtype not in INT_COLUMNS.values():
+        return dtype
+    values = series.to_numpy()
+    if values.dtype.kind not in "iuf":
+        return dtype
+    info = np.iinfo(dtype)
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values)
+        if not finite.all() or (values != np.round(values)).any():
+            return "float32"
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return "float32"
+    return dtype
+
+
+def cast_int_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the integer schema columns of `df` to their declared dtypes where lossless (in place)."""
+    for col in df.columns.intersection(list(INT_COLUMNS)):
+        dtype = compact_dtype(df[col], INT_COLUMNS[col])
+        if dtype in INT_COLUMNS.values():
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the known columns of `df` to their declared dtypes (in place; returns `df`)."""
+    for col in df.columns.intersection(list(COLUMN_DTYPES)):
+        dtype = compact_dtype(df[col], COLUMN_DTYPES[col])
+        if df[col].dtype == dtype:
+            continue
+        try:
+            df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError):  # e.g. free text in a numeric column: leave it as parsed
+            continue
+    return df
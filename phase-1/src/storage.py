@@ -0,0 +1,204 @@
+"""
+Table storage for the pipeline's intermediate files.
+
+- Every stage reads / writes through `read_table` / `write_table` instead of CSV.
+- Default format is Parquet (typed, zstd-compressed, columnar, row-group statistics),
+  so dtypes survive between stages and reads can project columns / filter row groups.
+- CSV stays available: set PIPELINE_STORAGE_FORMAT=csv, or pass `fmt="csv"` to export.
+- Paths may be given with or without a suffix. An explicit suffix is used as given;
+  for a suffix-less stem `resolve_table` finds the file in the configured format
+  first, then in the other one (e.g. CSVs from older runs).
+- A table may also be a directory of part files (`<stem>/[<partition>/]part-NNNNN.<fmt>`),
+  written incrementally with `write_part`; reads concatenate the parts in path order.
+- Reads apply the column schema from `src.schema` (compact dtypes) at parse time;
+  pass `compact=False` to get the parser's default dtypes.
+- Parquet needs `pyarrow` (a project dependency; the Lambda layers leave it out, see
+  lambda_function.py); without it the default falls back to CSV.
+"""
+
+from __future__ import annotations
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import pandas as pd
+
+from src.schema import apply_schema, parse_dtypes
+
+SUFFIXES = {"parquet": ".parquet", "csv": ".csv"}
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_SIZE = 100_000  # rows; keeps min/max statistics useful for filters
+PART_PREFIX = "part-"
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def default_format() -> str:
+    fmt = os.environ.get("PIPELINE_STORAGE_FORMAT")
+    if fmt is None:
+        return "parquet" if _pyarrow_available() else "csv"
+    if fmt not in SUFFIXES:
+        raise ValueError(f"Unsupported PIPELINE_STORAGE_FORMAT: {fmt} (expected one of {list(SUFFIXES)})")
+    return fmt
+
+
+def _format_of(path: Path) -> str:
+    return "parquet" if path.suffix == ".parquet" else "csv"
+
+
+def table_path(path: Path | str, fmt: str | None = None) -> Path:
+    """`path` with the suffix of `fmt` (default: the configured format)."""
+    return Path(path).with_suffix(SUFFIXES[fmt or default_format()])
+
+
+def part_files(path: Path | str) -> list[Path]:
+    """Part files of a partitioned table directory, in read order (empty if not one)."""
+    path = Path(path)
+    if not path.is_dir():
+        return []
+    return sorted(
+        p for p in path.rglob(f"{PART_PREFIX}*") if p.is_file() and p.suffix in SUFFIXES.values()
+    )
+
+
+def resolve_table(path: Path | str) -> Path:
+    """Existing table for `path`.
+
+    A path with an explicit .parquet / .csv suffix must exist as given. A suffix-less
+    stem resolves to a part directory, else the configured format, else any format.
+    """
+    path = Path(path)
+    if path.suffix in SUFFIXES.values():
+        if not path.exists():
+            raise FileNotFoundError(f"No table found at {path}")
+        return path
+    if part_files(path):
+        return path
+    preferred = default_format()
+    for fmt in [preferred] + [f for f in SUFFIXES if f != preferred]:
+        candidate = table_path(path, fmt)
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No table found for {path} (tried {', '.join(SUFFIXES.values())})")
+
+
+def table_exists(path: Path | str) -> bool:
+    try:
+        resolve_table(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def read_table(
+    path: Path | str,
+    columns: Sequence[str] | None = None,
+    filters: list | None = None,
+    compact: bool = True,
+) -> pd.DataFrame:
+    """Read a table; `columns` projects, `filters` (Parquet only) prunes row groups by statistics."""
+    path = resolve_table(path)
+    if path.is_dir():
+        parts = [read_table(p, columns=columns, filters=filters, compact=compact) for p in part_files(path)]
+        df = pd.concat(parts, ignore_index=True)
+    elif _format_of(path) == "parquet":
+        df = pd.read_parquet(path, columns=list(columns) if columns is not None else None, filters=filters)
+    elif filters is not None:
+        raise ValueError("Row filters need Parquet input")
+    else:
+        df = pd.read_csv(
+            path,
+            usecols=list(columns) if columns is not None else None,
+            dtype=parse_dtypes(columns) if compact else None,
+        )
+    return apply_schema(df) if compact else df
+
+
+def read_columns(path: Path | str) -> list[str]:
+    """Column names only (Parquet footer / CSV header)."""
+    path = resolve_table(path)
+    if path.is_dir():
+        return read_columns(part_files(path)[0])
+    if _format_of(path) == "parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_table(
+    path: Path | str,
+    chunksize: int,
+    columns: Sequence[str] | None = None,
+    compact: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """Stream a table in bounded chunks (CSV chunks / Parquet record batches); `columns` projects."""
+    path = resolve_table(path)
+    columns = list(columns) if columns is not None else None
+    if path.is_dir():
+        for part in part_files(path):
+            yield from iter_table(part, chunksize, columns=columns, compact=compact)
+        return
+    if _format_of(path) == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+        chunks = (batch.to_pandas() for batch in batches)
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns,
+                             dtype=parse_dtypes(columns) if compact else None)
+    for chunk in chunks:
+        yield apply_schema(chunk) if compact else chunk
+
+
+def write_table(df: pd.DataFrame, path: Path | str, fmt: str | None = None) -> Path:
+    """Write `df` (no index) in `fmt`; returns the path actually written (suffix adjusted)."""
+    path = table_path(path, fmt)
+    if part_files(path.with_suffix("")):
+        shutil.rmtree(path.with_suffix(""))  # a stale partitioned copy would shadow this file
+    _write_file(df, path)
+    return path
+
+
+def write_part(
+    df: pd.DataFrame,
+    table_dir: Path | str,
+    index: int,
+    partition: str | None = None,
+    fmt: str | None = None,
+) -> Path:
+    """Write one part file of a partitioned table (`table_dir/[partition/]part-NNNNN.<fmt>`)."""
+    directory = Path(table_dir) / partition if partition else Path(table_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = table_path(directory / f"{PART_PREFIX}{index:05d}", fmt)
+    _write_file(df, path)
+    return path
+
+
+def remove_table(path: Path | str) -> None:
+    """Delete every stored copy of a table (single files in any format and part directories)."""
+    stem = Path(path)
+    if stem.suffix in SUFFIXES.values():
+        stem = stem.with_suffix("")
+    for fmt in SUFFIXES:
+        table_path(stem, fmt).unlink(missing_ok=True)
+    if part_files(stem):
+        shutil.rmtree(stem)
+
+
+def _write_file(df: pd.DataFrame, path: Path) -> None:
+    if _format_of(path) == "parquet":
+        df.to_parquet(
+            path,
+            index=False,
+            engine="pyarrow",
+            compression=PARQUET_COMPRESSION,
+            row_group_size=PARQUET_ROW_GROUP_SIZE,
+        )
+    else:
+        df.to_csv(path, index=False)
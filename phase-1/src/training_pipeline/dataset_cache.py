@@ -0,0 +1,221 @@
+"""
+Binned LightGBM Dataset cache shared by train.py and tune.py.
+
+- Binning (bin boundaries + the binned feature matrix) is the fixed setup cost of every
+  LightGBM fit. It depends on the data and a few binning params only, not on the tree
+  params a trial changes, so it is built once per feature-engineered split and saved in
+  LightGBM's binary format under data/.lgb_dataset_cache/<key>.bin.
+- The key hashes the frame contents (values, columns, dtypes), the label, the binning
+  params and the LightGBM version.
+- `feature_pre_filter=False` keeps one binned Dataset valid for every min_child_samples.
+- The cache is bounded: a hit refreshes the file's mtime, and after each save the least
+  recently used files are deleted until the directory fits in DATASET_CACHE_MAX_BYTES.
+- `fit_regressor` trains on the Dataset with `lgb.train` and wraps the Booster in a
+  `BoosterRegressor` (the LGBMRegressor surface the pipeline uses: predict, booster_,
+  get_params, n_estimators). With early stopping the Booster is cut back to its best
+  iteration, so the compiled trees / bundle exports score exactly like `predict`.
+"""
+
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMRegressor
+
+DATASET_CACHE_DIR = Path("data/.lgb_dataset_cache")
+DATASET_CACHE_MAX_BYTES = 2 * 1024**3  # least recently used Datasets are deleted beyond this
+BINNING_PARAMS = {
+    "max_bin": 255,
+    "min_data_in_bin": 3,
+    "bin_construct_sample_cnt": 200_000,
+    "feature_pre_filter": False,
+}
+
+
+def booster_params(params: Dict[str, Any]) -> tuple[Dict[str, Any], int]:
+    """sklearn-style LGBMRegressor params → (`lgb.train` params, num_boost_round), as `fit` does."""
+    model = LGBMRegressor(**params)
+    train_params = model.get_params()
+    for key in ("silent", "importance_type", "n_estimators", "class_weight", "objective"):
+        train_params.pop(key, None)
+    train_params["objective"] = "regression"
+    if not any(k in train_params for k in ("verbosity", "verbose")):
+        train_params["verbose"] = -1
+    return train_params, model.n_estimators
+
+
+def _dataset_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    train_params, _ = booster_params(params)
+    dataset_params = dict(BINNING_PARAMS)
+    dataset_params["bin_construct_sample_cnt"] = train_params.get("subsample_for_bin", BINNING_PARAMS["bin_construct_sample_cnt"])
+    dataset_params["max_bin"] = train_params.get("max_bin", BINNING_PARAMS["max_bin"])
+    # The seed also drives the bin-construction sample, so it is part of the Dataset
+    dataset_params["seed"] = train_params.get("random_state")
+    dataset_params["verbose"] = -1
+    return dataset_params
+
+
+def dataset_key(X: pd.DataFrame, y: pd.Series, params: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr((list(X.columns), [str(t) for t in X.dtypes], sorted(_dataset_params(params).items()), lgb.__version__)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:24]
+
+
+def prune_dataset_cache(
+    cache_dir: Path | str = DATASET_CACHE_DIR,
+    max_bytes: int = DATASET_CACHE_MAX_BYTES,
+    keep: Path | None = None,
+) -> int:
+    """Delete the least recently used cached Datasets (oldest mtime first) until the
+    cache fits in `max_bytes`; `keep` is never deleted. Returns the number of files removed."""
+    entries = []
+    for path in Path(cache_dir).glob("*.bin"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:  # removed by a concurrent prune
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def binned_dataset(
+    X: pd.DataFrame,
+    y: pd.Series,
+    params: Dict[str, Any] | None = None,
+    cache_dir: Path | str | None = DATASET_CACHE_DIR,
+    max_cache_bytes: int = DATASET_CACHE_MAX_BYTES,
+) -> lgb.Dataset:
+    """Constructed (binned) training Dataset for (X, y), loaded from the cache when possible."""
+    params = params or {}
+    dataset_params = _dataset_params(params)
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"{dataset_key(X, y, params)}.bin"
+        if path.exists():
+            try:
+                os.utime(path)  # most recently used: pruned last
+            except OSError:
+                pass
+            return lgb.Dataset(str(path), params=dataset_params).construct()
+
+    dataset = lgb.Dataset(X, label=y, params=dataset_params, free_raw_data=True).construct()
+    if path is not None and "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        dataset.save_binary(str(tmp))
+        os.replace(tmp, path)  # atomic: concurrent builders never see a partial file
+        prune_dataset_cache(path.parent, max_cache_bytes, keep=path)
+    return dataset
+
+
+def binned_like(X: pd.DataFrame, y: pd.Series, train_set: lgb.Dataset) -> lgb.Dataset:
+    """(X, y) binned with the training Dataset's bin boundaries: eval splits for valid_sets, train subsets.
+
+    `Dataset.subset` would skip the re-binning, but LightGBM 3.3 cannot build subsets
+    under NumPy 2 (`np.array(..., copy=False)` on a list).
+    """
+    return lgb.Dataset(X, label=y, reference=train_set, params=train_set.params).construct()
+
+
+class BoosterRegressor:
+    """Fitted regressor around a trained Booster, as returned by `fit_regressor`.
+
+    Exposes the LGBMRegressor surface the pipeline uses (`predict`, `booster_`,
+    `get_params` / `set_params`, `n_estimators`, `best_score_`) without setting the
+    private fitted state of an sklearn estimator. `n_estimators` is the number of trees
+    the Booster holds; `rounds_trained_` the boosting rounds run (more when early
+    stopping cut the model back).
+    """
+
+    def __init__(self, booster: lgb.Booster, params: Dict[str, Any], rounds_trained: int | None = None):
+        self.booster_ = booster
+        self._params = {**params, "n_estimators": booster.current_iteration()}
+        self.rounds_trained_ = booster.current_iteration() if rounds_trained is None else rounds_trained
+
+    @property
+    def n_estimators(self) -> int:
+        return self._params["n_estimators"]
+
+    @property
+    def best_score_(self) -> dict:
+        return self.booster_.best_score
+
+    @property
+    def feature_name_(self) -> list[str]:
+        return self.booster_.feature_name()
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.booster_.num_feature()
+
+    def get_params(self, deep: bool = True) -> Dict[str, Any]:
+        return dict(self._params)
+
+    def set_params(self, **params) -> "BoosterRegressor":
+        self._params.update(params)
+        return self
+
+    def predict(self, X) -> np.ndarray:
+        return self.booster_.predict(X)
+
+    def __repr__(self) -> str:
+        return f"BoosterRegressor(n_estimators={self.n_estimators})"
+
+
+def regressor_from_booster(booster: lgb.Booster, params: Dict[str, Any]) -> BoosterRegressor:
+    """Fitted regressor around a trained Booster (`n_estimators` = its iterations)."""
+    return BoosterRegressor(booster, params)
+
+
+def load_regressor(path: Path | str, params: Dict[str, Any]) -> BoosterRegressor:
+    """Fitted regressor from a Booster text file (`booster_.save_model`)."""
+    return regressor_from_booster(lgb.Booster(model_file=str(path)), params)
+
+
+def continue_regressor(model, X: pd.DataFrame, y: pd.Series, num_boost_round: int) -> BoosterRegressor:
+    """`num_boost_round` more trees boosted on (X, y), starting from `model`'s predictions."""
+    params = model.get_params()
+    train_params, _ = booster_params(params)
+    # Left unconstructed: init_model has to score the raw rows for their init scores
+    train_set = lgb.Dataset(X, label=y, params=_dataset_params(params))
+    booster = lgb.train(train_params, train_set, num_boost_round=num_boost_round, init_model=model.booster_)
+    return regressor_from_booster(booster, params)
+
+
+def refit_regressor(model, X: pd.DataFrame, y: pd.Series, decay_rate: float = 0.9) -> BoosterRegressor:
+    """Same trees with leaf values refitted on (X, y): decay_rate * old + (1 - decay_rate) * new."""
+    booster = model.booster_.refit(X, y, decay_rate=decay_rate)
+    return regressor_from_booster(booster, model.get_params())
+
+
+def fit_regressor(params: Dict[str, Any], train_set: lgb.Dataset, **train_kwargs) -> BoosterRegressor:
+    """`LGBMRegressor(**params).fit(X, y)` on an already binned Dataset.
+
+    When early stopping kept fewer trees, `rounds_trained_` still holds the number of
+    boosting rounds actually run (`n_estimators` is the kept count).
+    """
+    train_params, num_boost_round = booster_params(params)
+    booster = lgb.train(train_params, train_set, num_boost_round=num_boost_round, **train_kwargs)
+    rounds_trained = booster.current_iteration()
+    if booster.best_iteration:  # early stopped: drop the trees after the best iteration
+        best, best_score = booster.best_iteration, booster.best_score
+        booster = lgb.Booster(model_str=booster.model_to_string(num_iteration=best))
+        booster.best_score = best_score
+    return BoosterRegressor(booster, params, rounds_trained=rounds_trained)
@@ -11,7 +11,9 @@ import pandas as pd
 from joblib import load
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+from src.storage import read_table
+
+DEFAULT_EVAL = Path("data/processed/feature_engineered_eval")  # .parquet or .csv, see src/storage.py
 DEFAULT_MODEL = Path("data/models/lgbm_model.pkl")
 
 
@@ -30,7 +32,7 @@ def evaluate_model(
     sample_frac: Optional[float] = None,
     random_state: int = 42,
 ) -> Dict[str, float]:
-    eval_df = pd.read_csv(eval_path)
+    eval_df = read_table(eval_path)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
 
     target = "price"
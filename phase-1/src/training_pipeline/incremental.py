@@ -0,0 +1,209 @@
+"""
+Warm-start retraining on newly arrived months.
+
+- Reads only the new cleaned rows and the cleaned eval split; the training history is
+  not re-read. The new rows are the raw rows of the new months cleaned like any split:
+  save them as data/raw/new.<fmt>, run `preprocess_split("new")`, and pass the
+  resulting data/processed/cleaning_new table as `new_path` (`--new`).
+- Encoders are updated, not refit: encoders fitted on the new rows are merged into the
+  saved ones (counts / target sums add up), which equals fitting on history + new.
+- `mode="continue"` boosts `n_rounds` more trees on the new rows starting from the
+  saved model; `mode="refit"` keeps the trees and refits their leaf values on the new
+  rows (`decay_rate` weighs the old values). Either way the cost follows the size of
+  the new data.
+- Drift guard: the updated model (eval encoded with the merged encoders) must stay
+  within `tolerance` of the saved model's eval RMSE (eval encoded with the old
+  encoders). Otherwise, or when the saved encoders carry no statistics to merge, it
+  falls back to a full feature-engineering + `train_model` run on the history
+  (`train_path`) plus the new rows, written as the cleaning_retrain table next to the
+  eval split; the feature-engineered tables there are rewritten from it.
+- Accepted updates overwrite the model, its compiled trees / bundle and the encoders.
+"""
+
+from __future__ import annotations
+import argparse
+import copy
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.feature_pipeline.feature_engineering import (
+    FrequencyEncoder,
+    SimpleTargetEncoder,
+    as_frequency_encoder,
+    engineer_features,
+    run_feature_engineering,
+)
+from src.inference_pipeline.bundle import BUNDLE_SUFFIX, export_inference_bundle
+from src.inference_pipeline.compiled_trees import compiled_trees_path, export_compiled_trees
+from src.schema import TARGET, apply_schema
+from src.storage import read_table, write_table
+from src.training_pipeline.dataset_cache import continue_regressor, refit_regressor
+from src.training_pipeline.train import DEFAULT_OUT, ENCODERS_DIR, train_model
+
+DEFAULT_EVAL = Path("data/processed/cleaning_eval")
+DEFAULT_TRAIN = Path("data/processed/cleaning_train")  # history before the new months (fallback only)
+MODES = ("continue", "refit")
+N_ROUNDS = 100
+DECAY_RATE = 0.9
+TOLERANCE = 0.02  # accepted relative eval RMSE increase before falling back to a full retrain
+
+
+def _metrics(y_true: pd.Series, y_pred: np.ndarray) -> Dict[str, float]:
+    return {
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "r2": float(r2_score(y_true, y_pred)),
+    }
+
+
+def _features(df: pd.DataFrame, freq_encoder, target_encoder, is_train: bool) -> Tuple[pd.DataFrame, pd.Series]:
+    """Cleaned rows → (X, y), engineered exactly like the feature-engineered tables."""
+    df = apply_schema(engineer_features(df.copy(), freq_encoder, target_encoder, is_train=is_train))
+    return df.drop(columns=[TARGET]), df[TARGET]
+
+
+def _load_encoders(encoders_dir: Path):
+    freq_path, target_path = encoders_dir / "freq_encoder.pkl", encoders_dir / "target_encoder.pkl"
+    freq_encoder = as_frequency_encoder(load(freq_path)) if freq_path.exists() else None
+    target_encoder = load(target_path) if target_path.exists() else None
+    return freq_encoder, target_encoder
+
+
+def merged_encoders(freq_encoder, target_encoder, new_df: pd.DataFrame):
+    """Copies of the saved encoders with the new rows' statistics merged in."""
+    if freq_encoder is not None:
+        freq_encoder = copy.deepcopy(freq_encoder).merge(FrequencyEncoder().fit(new_df["zipcode"]))
+    if target_encoder is not None:
+        target_encoder = copy.deepcopy(target_encoder).merge(
+            SimpleTargetEncoder().fit(new_df["city_full"], new_df[TARGET])
+        )
+    return freq_encoder, target_encoder
+
+
+def _full_retrain(reason: str, train_path, new_df: pd.DataFrame, eval_path, model_output, encoders_dir):
+    """Feature engineering + `train_model` from scratch on the history plus the new rows."""
+    print(f"⚠️ {reason}: falling back to a full retrain on {train_path} + {len(new_df):,} new rows")
+    processed_dir = Path(eval_path).parent  # the cleaned splits and their feature tables live together
+    history = pd.concat([read_table(train_path), new_df], ignore_index=True)
+    retrain_path = write_table(history, processed_dir / "cleaning_retrain")
+    run_feature_engineering(
+        in_train_path=retrain_path,
+        in_eval_path=eval_path,
+        in_holdout_path=processed_dir / "cleaning_holdout",
+        output_dir=processed_dir,
+        encoders_dir=encoders_dir,
+    )
+    model, metrics = train_model(
+        train_path=processed_dir / "feature_engineered_train",
+        eval_path=processed_dir / "feature_engineered_eval",
+        model_output=model_output,
+        encoders_dir=encoders_dir,
+    )
+    return model, metrics, "full"
+
+
+def incremental_train(
+    new_path: Path | str,
+    eval_path: Path | str = DEFAULT_EVAL,
+    model_path: Path | str = DEFAULT_OUT,
+    model_output: Path | str | None = None,
+    encoders_dir: Path | str = ENCODERS_DIR,
+    mode: str = "continue",
+    n_rounds: int = N_ROUNDS,
+    decay_rate: float = DECAY_RATE,
+    tolerance: float = TOLERANCE,
+    train_path: Path | str = DEFAULT_TRAIN,
+):
+    """Update the saved model with the new rows; full retrain if eval error degrades.
+
+    `new_path` is the cleaned table of the new months (see the module docstring); it
+    must not overlap the rows the saved model and encoders were fitted on.
+
+    Returns
+    -------
+    model : BoosterRegressor
+    metrics : dict[str, float]
+    strategy : "continue", "refit" or "full"
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode} (expected one of {MODES})")
+    encoders_dir = Path(encoders_dir)
+    out = Path(model_output or model_path)
+
+    model = load(model_path)
+    freq_encoder, target_encoder = _load_encoders(encoders_dir)
+    new_df = read_table(new_path)
+    eval_df = read_table(eval_path)
+    print(f"New rows: {len(new_df):,} ({new_df['date'].min()} to {new_df['date'].max()})")
+
+    X_eval, y_eval = _features(eval_df, freq_encoder, target_encoder, is_train=False)
+    baseline = _metrics(y_eval, model.predict(X_eval))
+
+    try:
+        freq_encoder, target_encoder = merged_encoders(freq_encoder, target_encoder, new_df)
+    except ValueError as e:  # encoders pickled before they kept their statistics
+        return _full_retrain(str(e), train_path, new_df, eval_path, out, encoders_dir)
+
+    t0 = time.perf_counter()
+    X_new, y_new = _features(new_df, freq_encoder, target_encoder, is_train=True)
+    if mode == "continue":
+        updated = continue_regressor(model, X_new, y_new, n_rounds)
+    else:
+        updated = refit_regressor(model, X_new, y_new, decay_rate=decay_rate)
+    elapsed = time.perf_counter() - t0
+
+    X_eval, y_eval = _features(eval_df, freq_encoder, target_encoder, is_train=False)
+    metrics = _metrics(y_eval, updated.predict(X_eval))
+    print(f"📊 Eval RMSE {baseline['rmse']:.2f} → {metrics['rmse']:.2f} after {mode} "
+          f"({updated.n_estimators} trees, {elapsed:.2f}s)")
+
+    if metrics["rmse"] > baseline["rmse"] * (1 + tolerance):
+        reason = f"eval RMSE degraded by more than {tolerance:.0%}"
+        return _full_retrain(reason, train_path, new_df, eval_path, out, encoders_dir)
+
+    if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+        encoders_dir.mkdir(parents=True, exist_ok=True)
+        out.parent.mkdir(parents=True, exist_ok=True)
+    if freq_encoder is not None:
+        dump(freq_encoder, encoders_dir / "freq_encoder.pkl")
+    if target_encoder is not None:
+        dump(target_encoder, encoders_dir / "target_encoder.pkl")
+    dump(updated, out)
+    trees_out = export_compiled_trees(updated, compiled_trees_path(out))
+    bundle_out = export_inference_bundle(
+        out.with_suffix(BUNDLE_SUFFIX),
+        updated,
+        feature_columns=list(X_new.columns),
+        freq_encoder_path=encoders_dir / "freq_encoder.pkl",
+        target_encoder_path=encoders_dir / "target_encoder.pkl",
+    )
+    print(f"✅ Model updated ({mode}). Saved to {out}")
+    print(f"   Compiled trees (NumPy-only inference) saved to {trees_out}")
+    print(f"   Single-file inference bundle saved to {bundle_out}")
+    print(f"   Encoders updated in {encoders_dir}/")
+    print(f"   MAE={metrics['mae']:.2f}  RMSE={metrics['rmse']:.2f}  R²={metrics['r2']:.4f}")
+
+    return updated, metrics, mode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm-start the saved model on newly arrived months.")
+    parser.add_argument("--new", type=str, required=True,
+                        help="Cleaned rows of the new months (e.g. data/processed/cleaning_new)")
+    parser.add_argument("--mode", type=str, default="continue", choices=MODES)
+    parser.add_argument("--n_rounds", type=int, default=N_ROUNDS, help="Trees added in continue mode")
+    parser.add_argument("--decay_rate", type=float, default=DECAY_RATE, help="Weight of the old leaf values in refit mode")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--train", type=str, default=str(DEFAULT_TRAIN),
+                        help="Cleaned history before the new months (fallback retrain)")
+    args = parser.parse_args()
+
+    incremental_train(new_path=args.new, mode=args.mode, n_rounds=args.n_rounds, decay_rate=args.decay_rate,
+                      tolerance=args.tolerance, train_path=args.train)
@@ -0,0 +1,106 @@
+"""
+Asynchronous, batched MLflow logging for tuning trials.
+
+- `TrialLogger.log_run(params, metrics)` only enqueues; a background thread creates
+  the run and writes its params + metrics in one `log_batch` call, draining up to
+  `batch_size` pending runs per wake-up.
+- The queue is bounded (`max_pending` runs): when the tracking store falls behind,
+  `log_run` blocks instead of buffering without limit.
+- `close()` (also registered with atexit, and called by the context manager) flushes
+  everything still queued before returning.
+- Tracking failures are reported once and never abort the optimization loop.
+- `in_loop_seconds` / `n_logged` measure how long the caller spent in tracking calls.
+"""
+
+from __future__ import annotations
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+MAX_PENDING = 1_000  # runs buffered before log_run blocks
+BATCH_SIZE = 50  # runs written per wake-up of the logging thread
+_STOP = object()
+
+
+class TrialLogger:
+    def __init__(
+        self,
+        experiment_id: str,
+        tracking_uri: Optional[str] = None,
+        max_pending: int = MAX_PENDING,
+        batch_size: int = BATCH_SIZE,
+    ):
+        self.experiment_id = experiment_id
+        self.client = MlflowClient(tracking_uri)
+        self.batch_size = batch_size
+        self.in_loop_seconds = 0.0
+        self.n_logged = 0
+        self.n_failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._drain, name="mlflow-trial-logger", daemon=True)
+        self._thread.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    def log_run(self, params: Dict, metrics: Dict[str, float], run_name: Optional[str] = None) -> None:
+        """Queue one run (params + final metrics) for logging; returns without waiting for the store."""
+        t0 = time.perf_counter()
+        self._queue.put((params, metrics, run_name, int(time.time() * 1000)))
+        self.in_loop_seconds += time.perf_counter() - t0
+
+    def flush(self) -> None:
+        """Block until every queued run is written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "TrialLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            for item in batch:
+                if item is not _STOP:
+                    self._write(*item)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, params: Dict, metrics: Dict[str, float], run_name: Optional[str], timestamp: int) -> None:
+        try:
+            tags = [RunTag("mlflow.runName", run_name)] if run_name else []
+            run_id = self.client.create_run(self.experiment_id, start_time=timestamp).info.run_id
+            self.client.log_batch(
+                run_id,
+                metrics=[Metric(k, float(v), timestamp, 0) for k, v in metrics.items()],
+                params=[Param(k, str(v)) for k, v in params.items()],
+                tags=tags,
+            )
+            self.client.set_terminated(run_id)
+            self.n_logged += 1
+        except Exception as e:  # tracking must never take the tuning run down
+            self.n_failed += 1
+            if self.n_failed == 1:
+                print(f"⚠️ MLflow logging failed ({e}); continuing without it")
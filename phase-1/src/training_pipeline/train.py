@@ -1,9 +1,12 @@
 """
 Train a baseline LightGBM model.
 
-- Reads feature-engineered train/eval CSVs.
-- Trains LGBMRegressor.
+- Reads feature-engineered train/eval tables (Parquet or CSV).
+- Trains LightGBM on the cached binned Dataset (see dataset_cache.py); the saved model is
+  a `BoosterRegressor` (LGBMRegressor-style predict / booster_ / get_params).
 - Returns metrics and saves model to `model_output`.
+- Also exports the trees as packed NumPy arrays (`*_trees.npz`) for LightGBM-free inference
+  and a single-file inference bundle (`*.bundle`: model + encoders + schema).
 """
 
 from __future__ import annotations
@@ -15,11 +18,16 @@ import numpy as np
 import pandas as pd
 from joblib import dump
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from lightgbm import LGBMRegressor
 
-DEFAULT_TRAIN = Path("data/processed/feature_engineered_train.csv")
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+from src.inference_pipeline.bundle import BUNDLE_SUFFIX, export_inference_bundle
+from src.inference_pipeline.compiled_trees import compiled_trees_path, export_compiled_trees
+from src.storage import read_table
+from src.training_pipeline.dataset_cache import DATASET_CACHE_DIR, binned_dataset, fit_regressor
+
+DEFAULT_TRAIN = Path("data/processed/feature_engineered_train")  # .parquet or .csv, see src/storage.py
+DEFAULT_EVAL = Path("data/processed/feature_engineered_eval")
 DEFAULT_OUT = Path("data/models/lgbm_model.pkl")
+ENCODERS_DIR = Path("models")  # where feature_engineering saves the fitted encoders
 
 
 def _maybe_sample(df: pd.DataFrame, sample_frac: Optional[float], random_state: int) -> pd.DataFrame:
@@ -38,16 +46,18 @@ def train_model(
     model_params: Optional[Dict] = None,
     sample_frac: Optional[float] = None,
     random_state: int = 42,
+    encoders_dir: Path | str = ENCODERS_DIR,
+    dataset_cache_dir: Path | str | None = DATASET_CACHE_DIR,
 ):
     """Train baseline LightGBM and save model.
 
     Returns
     -------
-    model : LGBMRegressor
+    model : BoosterRegressor
     metrics : dict[str, float]
     """
-    train_df = pd.read_csv(train_path)
-    eval_df = pd.read_csv(eval_path)
+    train_df = read_table(train_path)
+    eval_df = read_table(eval_path)
 
     train_df = _maybe_sample(train_df, sample_frac, random_state)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
@@ -73,8 +83,8 @@ def train_model(
     if model_params:
         params.update(model_params)
 
-    model = LGBMRegressor(**params)
-    model.fit(X_train, y_train)
+    train_set = binned_dataset(X_train, y_train, params, cache_dir=dataset_cache_dir)
+    model = fit_regressor(params, train_set)
 
     y_pred = model.predict(X_eval)
     mae = float(mean_absolute_error(y_eval, y_pred))
@@ -86,7 +96,17 @@ def train_model(
     if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
         out.parent.mkdir(parents=True, exist_ok=True)
     dump(model, out)
+    trees_out = export_compiled_trees(model, compiled_trees_path(out))
+    bundle_out = export_inference_bundle(
+        out.with_suffix(BUNDLE_SUFFIX),
+        model,
+        feature_columns=list(X_train.columns),
+        freq_encoder_path=Path(encoders_dir) / "freq_encoder.pkl",
+        target_encoder_path=Path(encoders_dir) / "target_encoder.pkl",
+    )
     print(f"✅ Model trained. Saved to {out}")
+    print(f"   Compiled trees (NumPy-only inference) saved to {trees_out}")
+    print(f"   Single-file inference bundle saved to {bundle_out}")
     print(f"   MAE={mae:.2f}  RMSE={rmse:.2f}  R²={r2:.4f}")
 
     return model, metrics
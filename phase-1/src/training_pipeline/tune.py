@@ -2,28 +2,133 @@
 Hyperparameter tuning with Optuna + MLflow.
 
 - Optimizes LightGBM params on eval set RMSE.
-- Logs trials to MLflow.
-- Retrains best model and saves to `model_output`.
+- The binned training Dataset is built (or loaded from the cache) once and shared by
+  every trial and the final retrain.
+- Logs trials to MLflow from a background thread (see tracking.py): the optimization
+  loop only enqueues each trial's params + metrics.
+- `n_workers > 1` runs trials concurrently in worker processes sharing one study in a
+  local SQLite storage; cores are split between them (`n_jobs = cores // n_workers`)
+  and every worker samples with its own seeded TPE sampler.
+- Trials report the eval RMSE every REPORT_EVERY boosting rounds; a pruner (median or
+  successive halving) stops unpromising trials, and every fit early-stops on the eval
+  split (n_estimators is an upper bound).
+- `search="halving"` runs successive halving instead: all n_trials configurations are
+  screened on a small time-stratified fraction of the train split (every year/month
+  keeps its share of rows), the best 1/eta move on to an eta-times larger fraction,
+  up to the full split. Fractions are nested row subsets of the loaded split, binned
+  once each with the full split's bin boundaries, so promotions never resample or
+  re-read. Uses Optuna's ask/tell: configurations dropped at a rung are told as pruned.
+- Reports the wall-clock time the study needed to reach its best RMSE.
+- Every process keeps the fitted model of its best trial so far (parallel workers hand
+  theirs over as Booster text under data/.tune_checkpoints/<study>/); the study's best
+  model is saved and logged as is instead of being retrained. A best trial without a
+  model (e.g. from an earlier run of a resumed study) is retrained.
+- Saves the best model to `model_output` (+ compiled `*_trees.npz` and `*.bundle` exports).
 """
 
 from __future__ import annotations
+import argparse
+import math
+import multiprocessing as mp
 import os
+import shutil
+import time
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+import lightgbm as lgb
 import numpy as np
 import optuna
 import pandas as pd
 from joblib import dump
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from lightgbm import LGBMRegressor
+
+from src.inference_pipeline.bundle import BUNDLE_SUFFIX, export_inference_bundle
+from src.inference_pipeline.compiled_trees import compiled_trees_path, export_compiled_trees
+from src.storage import read_table
+from src.training_pipeline.dataset_cache import (
+    DATASET_CACHE_DIR,
+    binned_dataset,
+    binned_like,
+    fit_regressor,
+    load_regressor,
+)
+from src.training_pipeline.tracking import TrialLogger
 
 import mlflow
 import mlflow.lightgbm
 
-DEFAULT_TRAIN = Path("data/processed/feature_engineered_train.csv")
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+DEFAULT_TRAIN = Path("data/processed/feature_engineered_train")  # .parquet or .csv, see src/storage.py
+DEFAULT_EVAL = Path("data/processed/feature_engineered_eval")
 DEFAULT_OUT = Path("data/models/lgbm_best_model.pkl")
+ENCODERS_DIR = Path("models")  # where feature_engineering saves the fitted encoders
+DEFAULT_STORAGE = "sqlite:///data/optuna_studies.db"  # shared study storage for parallel tuning
+CHECKPOINT_DIR = Path("data/.tune_checkpoints")  # best-trial Boosters handed over by parallel workers
+EARLY_STOPPING_ROUNDS = 50
+REPORT_EVERY = 10  # boosting rounds between intermediate reports (each one is a storage write)
+PRUNERS = ("median", "halving", "none")
+SEARCHES = ("tpe", "halving")
+HALVING_ETA = 3
+HALVING_MIN_FRACTION = 1 / 9
+
+
+def _make_pruner(name: str) -> optuna.pruners.BasePruner:
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=100, interval_steps=REPORT_EVERY)
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=REPORT_EVERY * 5)
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner: {name} (expected one of {PRUNERS})")
+
+
+def _pruning_callback(trial: optuna.Trial, valid_name: str = "eval", metric: str = "rmse"):
+    """LightGBM callback: report the eval RMSE to Optuna and stop the fit when the trial is pruned."""
+    def _callback(env: lgb.callback.CallbackEnv) -> None:
+        rounds = env.iteration + 1
+        if rounds % REPORT_EVERY:
+            return
+        for data_name, metric_name, value, _ in env.evaluation_result_list:
+            if data_name == valid_name and metric_name == metric:
+                trial.report(value, step=rounds)
+                if trial.should_prune():
+                    trial.set_user_attr("rounds", rounds)
+                    raise optuna.TrialPruned(f"pruned at round {rounds} (eval {metric}={value:.2f})")
+                return
+
+    _callback.order = 40  # after lgb.early_stopping (order 30)
+    return _callback
+
+
+def _early_stopping_kwargs(valid_set: lgb.Dataset, callbacks: list | None = None) -> dict:
+    return {
+        "valid_sets": [valid_set],
+        "valid_names": ["eval"],
+        "callbacks": [lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False), *(callbacks or [])],
+    }
+
+
+class _BestTrialModel:
+    """The fitted model of the best (lowest RMSE) trial offered so far; earlier ones are dropped."""
+
+    def __init__(self):
+        self.trial_number: Optional[int] = None
+        self.rmse = math.inf
+        self.model = None
+
+    def offer(self, trial_number: int, rmse: float, model) -> None:
+        if rmse < self.rmse:
+            self.trial_number, self.rmse, self.model = trial_number, rmse, model
+
+    def save(self, checkpoint_dir: Path | str) -> Optional[Path]:
+        """Write the kept Booster as text to <checkpoint_dir>/trial_<n>.txt."""
+        if self.model is None:
+            return None
+        path = Path(checkpoint_dir) / f"trial_{self.trial_number}.txt"
+        if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.model.booster_.save_model(str(path))
+        return path
 
 
 def _maybe_sample(df: pd.DataFrame, sample_frac: Optional[float], random_state: int) -> pd.DataFrame:
@@ -41,8 +146,8 @@ def _load_data(
     sample_frac: Optional[float],
     random_state: int,
 ):
-    train_df = pd.read_csv(train_path)
-    eval_df = pd.read_csv(eval_path)
+    train_df = read_table(train_path)
+    eval_df = read_table(eval_path)
     train_df = _maybe_sample(train_df, sample_frac, random_state)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
 
@@ -52,6 +157,185 @@ def _load_data(
     return X_train, y_train, X_eval, y_eval
 
 
+def _suggest_params(trial: optuna.Trial, random_state: int, n_jobs: int) -> Dict:
+    return {
+        "n_estimators": trial.suggest_int("n_estimators", 300, 900),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+        "num_leaves": trial.suggest_int("num_leaves", 31, 255),
+        "max_depth": trial.suggest_int("max_depth", -1, 12),
+        "subsample": trial.suggest_float("subsample", 0.5, 1.0),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+        "min_child_samples": trial.suggest_int("min_child_samples", 10, 60),
+        "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
+        "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
+        "random_state": random_state,
+        "n_jobs": n_jobs,
+        "verbosity": -1,
+        "metric": "rmse",
+    }
+
+
+def _fit_trial(
+    trial: optuna.Trial,
+    params: Dict,
+    train_set: lgb.Dataset,
+    valid_set: lgb.Dataset,
+    X_eval: pd.DataFrame,
+    y_eval: pd.Series,
+    logger: TrialLogger,
+    callbacks: list | None = None,
+    fraction: float = 1.0,
+) -> Tuple[float, object]:
+    """Fit one configuration, queue it for MLflow and return (eval RMSE, fitted model)."""
+    model = fit_regressor(params, train_set, **_early_stopping_kwargs(valid_set, callbacks))
+    # Boosting rounds run (incl. the ones past the early-stopping best), in full-data
+    # equivalents: a round on 1/9 of the rows counts 1/9
+    trial.set_user_attr("rounds", trial.user_attrs.get("rounds", 0) + model.rounds_trained_ * fraction)
+
+    y_pred = model.predict(X_eval)
+    rmse = float(np.sqrt(mean_squared_error(y_eval, y_pred)))
+    mae = float(mean_absolute_error(y_eval, y_pred))
+    r2 = float(r2_score(y_eval, y_pred))
+    trial.set_user_attr("mae", mae)
+    trial.set_user_attr("r2", r2)
+
+    logger.log_run({**params, "train_fraction": fraction}, {"rmse": rmse, "mae": mae, "r2": r2},
+                   run_name=f"trial-{trial.number}")
+    return rmse, model
+
+
+def _make_objective(
+    train_set, valid_set, X_eval, y_eval, random_state: int, n_jobs: int, best: _BestTrialModel, logger: TrialLogger
+):
+    def objective(trial: optuna.Trial):
+        params = _suggest_params(trial, random_state, n_jobs)
+        rmse, model = _fit_trial(trial, params, train_set, valid_set, X_eval, y_eval, logger,
+                                 [_pruning_callback(trial)])
+        best.offer(trial.number, rmse, model)
+        return rmse
+
+    return objective
+
+
+def time_stratified_ranks(X: pd.DataFrame, random_state: int) -> np.ndarray:
+    """Random rank in [0, 1) of every row within its (year, month).
+
+    `ranks < f` selects a fraction f of every month, and the selections for growing f
+    are nested.
+    """
+    period = X["year"].to_numpy(np.int64) * 12 + X["month"].to_numpy(np.int64)
+    order = np.lexsort((np.random.default_rng(random_state).random(len(X)), period))
+    sorted_period = period[order]
+    starts = np.flatnonzero(np.r_[True, sorted_period[1:] != sorted_period[:-1]])
+    sizes = np.diff(np.r_[starts, len(X)])
+    ranks = np.empty(len(X))
+    ranks[order] = (np.arange(len(X)) - np.repeat(starts, sizes)) / np.repeat(sizes, sizes)
+    return ranks
+
+
+def halving_fractions(min_fraction: float = HALVING_MIN_FRACTION, eta: int = HALVING_ETA) -> list[float]:
+    """Train fractions of the rungs, smallest first: [eta^-k, ..., 1/eta, 1]."""
+    n_rungs = max(0, math.ceil(math.log(1 / min_fraction, eta) - 1e-9))
+    return [float(eta) ** -k for k in range(n_rungs, -1, -1)]
+
+
+def _successive_halving(
+    study: optuna.Study,
+    train_set: lgb.Dataset,
+    valid_set: lgb.Dataset,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_eval: pd.DataFrame,
+    y_eval: pd.Series,
+    n_trials: int,
+    random_state: int,
+    best: _BestTrialModel,
+    logger: TrialLogger,
+    eta: int = HALVING_ETA,
+    min_fraction: float = HALVING_MIN_FRACTION,
+) -> None:
+    """Screen n_trials configurations on growing train fractions, keeping the best 1/eta at each rung."""
+    trials = [study.ask() for _ in range(n_trials)]
+    params = {t.number: _suggest_params(t, random_state, -1) for t in trials}
+    ranks = time_stratified_ranks(X_train, random_state)
+    samples = {1.0: train_set}  # fraction -> binned subset, built once
+    for rung, fraction in enumerate(halving_fractions(min_fraction, eta)):
+        if fraction not in samples:
+            rows = np.flatnonzero(ranks < fraction)
+            samples[fraction] = binned_like(X_train.iloc[rows], y_train.iloc[rows], train_set)
+        print(f"   Rung {rung}: {len(trials)} configs on {fraction:.1%} of train "
+              f"({samples[fraction].num_data():,} rows)")
+        scores = []
+        for trial in trials:
+            rmse, model = _fit_trial(trial, params[trial.number], samples[fraction], valid_set, X_eval, y_eval,
+                                     logger, fraction=fraction)
+            trial.report(rmse, step=rung)
+            scores.append(rmse)
+            if fraction == 1.0:
+                best.offer(trial.number, rmse, model)
+
+        if fraction == 1.0:
+            for trial, rmse in zip(trials, scores):
+                study.tell(trial, rmse)
+            return
+        order = np.argsort(scores, kind="stable")
+        keep = max(1, len(trials) // eta)
+        for i in order[keep:]:
+            study.tell(trials[i], state=optuna.trial.TrialState.PRUNED)
+        trials = [trials[i] for i in order[:keep]]
+
+
+def _tune_worker(
+    worker_id: int,
+    n_trials: int,
+    storage: str,
+    study_name: str,
+    train_path: Path | str,
+    eval_path: Path | str,
+    sample_frac: Optional[float],
+    random_state: int,
+    n_jobs: int,
+    dataset_cache_dir: Path | str | None,
+    tracking_uri: Optional[str],
+    experiment_name: str,
+    pruner: str,
+    checkpoint_dir: Path | str,
+) -> None:
+    """Run `n_trials` trials of the shared study in this process; save its best model to `checkpoint_dir`."""
+    if tracking_uri:
+        mlflow.set_tracking_uri(tracking_uri)
+    experiment = mlflow.set_experiment(experiment_name)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    X_train, y_train, X_eval, y_eval = _load_data(train_path, eval_path, sample_frac, random_state)
+    # Hits the Dataset binary the parent saved: no per-worker re-binning
+    train_set = binned_dataset(X_train, y_train, {"random_state": random_state, "n_jobs": n_jobs, "verbosity": -1},
+                               cache_dir=dataset_cache_dir)
+    valid_set = binned_like(X_eval, y_eval, train_set)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=storage,
+        sampler=optuna.samplers.TPESampler(seed=random_state + worker_id),
+        pruner=_make_pruner(pruner),
+    )
+    best = _BestTrialModel()
+    with TrialLogger(experiment.experiment_id, tracking_uri) as logger:
+        study.optimize(_make_objective(train_set, valid_set, X_eval, y_eval, random_state, n_jobs, best, logger),
+                       n_trials=n_trials)
+    best.save(checkpoint_dir)
+
+
+def time_to_best(study: optuna.Study, target: Optional[float] = None) -> Optional[float]:
+    """Seconds from the first trial start until a completed trial reached `target` (default: the best RMSE)."""
+    done = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+    if not done:
+        return None
+    target = study.best_value if target is None else target
+    start = min(t.datetime_start for t in done)
+    reached = [t.datetime_complete for t in done if t.value <= target]
+    return (min(reached) - start).total_seconds() if reached else None
+
+
 def tune_model(
     train_path: Path | str = DEFAULT_TRAIN,
     eval_path: Path | str = DEFAULT_EVAL,
@@ -61,59 +345,109 @@ def tune_model(
     tracking_uri: Optional[str] = None,
     experiment_name: str = "lightgbm_optuna_housing",
     random_state: int = 42,
+    encoders_dir: Path | str = ENCODERS_DIR,
+    dataset_cache_dir: Path | str | None = DATASET_CACHE_DIR,
+    n_workers: int = 1,
+    storage: Optional[str] = None,
+    study_name: Optional[str] = None,
+    pruner: str = "median",
+    search: str = "tpe",
 ) -> Tuple[Dict, Dict]:
     """Run Optuna tuning; save best model; return (best_params, best_metrics)."""
+    if search not in SEARCHES:
+        raise ValueError(f"Unknown search: {search} (expected one of {SEARCHES})")
+    if search == "halving" and n_workers > 1:
+        raise ValueError("search='halving' runs in a single process; use n_workers=1")
     if tracking_uri:
         mlflow.set_tracking_uri(tracking_uri)
-    mlflow.set_experiment(experiment_name)
+    experiment = mlflow.set_experiment(experiment_name)
 
     X_train, y_train, X_eval, y_eval = _load_data(train_path, eval_path, sample_frac, random_state)
+    fixed_params = {"random_state": random_state, "n_jobs": -1, "verbosity": -1}
+    train_set = binned_dataset(X_train, y_train, fixed_params, cache_dir=dataset_cache_dir)
+    valid_set = binned_like(X_eval, y_eval, train_set)
 
-    def objective(trial: optuna.Trial):
-        params = {
-            "n_estimators": trial.suggest_int("n_estimators", 300, 900),
-            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
-            "num_leaves": trial.suggest_int("num_leaves", 31, 255),
-            "max_depth": trial.suggest_int("max_depth", -1, 12),
-            "subsample": trial.suggest_float("subsample", 0.5, 1.0),
-            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-            "min_child_samples": trial.suggest_int("min_child_samples", 10, 60),
-            "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
-            "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
-            "random_state": random_state,
-            "n_jobs": -1,
-            "verbosity": -1,
-        }
-
-        with mlflow.start_run(nested=True):
-            model = LGBMRegressor(**params)
-            model.fit(X_train, y_train)
-
-            y_pred = model.predict(X_eval)
-            rmse = float(np.sqrt(mean_squared_error(y_eval, y_pred)))
-            mae = float(mean_absolute_error(y_eval, y_pred))
-            r2 = float(r2_score(y_eval, y_pred))
+    best = _BestTrialModel()
+    t0 = time.perf_counter()
+    if n_workers > 1:
+        storage = storage or DEFAULT_STORAGE
+        if storage.startswith("sqlite:///") and "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
+            Path(storage[len("sqlite:///"):]).parent.mkdir(parents=True, exist_ok=True)
+        study_name = study_name or f"{experiment_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        study = optuna.create_study(direction="minimize", storage=storage, study_name=study_name, load_if_exists=True,
+                                    pruner=_make_pruner(pruner))
+        n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+        shares = [n_trials // n_workers + (i < n_trials % n_workers) for i in range(n_workers)]
+        checkpoint_dir = CHECKPOINT_DIR / study_name
+        # spawn: LightGBM's OpenMP runtime is not fork-safe once the parent has trained
+        ctx = mp.get_context("spawn")
+        workers = [
+            ctx.Process(target=_tune_worker, args=(
+                i, share, storage, study_name, train_path, eval_path, sample_frac, random_state, n_jobs,
+                dataset_cache_dir, tracking_uri, experiment_name, pruner, checkpoint_dir,
+            ))
+            for i, share in enumerate(shares) if share
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        failed = [w.exitcode for w in workers if w.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} tuning worker(s) failed (exit codes {failed})")
+        study = optuna.load_study(study_name=study_name, storage=storage)
+        print(f"✅ {len(study.trials)} trials in {len(workers)} workers x {n_jobs} threads (study '{study_name}')")
+        checkpoint = checkpoint_dir / f"trial_{study.best_trial.number}.txt"
+        if checkpoint.exists():
+            best.offer(study.best_trial.number, study.best_value, load_regressor(checkpoint, study.best_trial.params))
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    else:
+        study = optuna.create_study(
+            direction="minimize",
+            storage=storage,
+            study_name=study_name,
+            sampler=optuna.samplers.TPESampler(seed=random_state),
+            pruner=_make_pruner(pruner),
+            load_if_exists=storage is not None,
+        )
+        with TrialLogger(experiment.experiment_id, tracking_uri) as logger:
+            if search == "halving":
+                _successive_halving(study, train_set, valid_set, X_train, y_train, X_eval, y_eval, n_trials,
+                                    random_state, best, logger)
+            else:
+                study.optimize(_make_objective(train_set, valid_set, X_eval, y_eval, random_state, -1, best, logger),
+                               n_trials=n_trials)
+        n_runs = logger.n_logged + logger.n_failed
+        print(f"   MLflow: {logger.n_logged} trial runs logged in the background; "
+              f"{1000 * logger.in_loop_seconds / max(n_runs, 1):.2f} ms per run spent in the loop")
+    elapsed = time.perf_counter() - t0
+    to_best = time_to_best(study)
+    print(f"⏱️ Tuning took {elapsed:.1f}s; best RMSE {study.best_value:.2f} reached after {to_best:.1f}s")
+    pruned = [t for t in study.trials if t.state == optuna.trial.TrialState.PRUNED]
+    rounds = sum(t.user_attrs.get("rounds", 0) for t in study.trials)
+    budget = sum(t.params.get("n_estimators", 0) for t in study.trials)
+    print(f"   {len(pruned)}/{len(study.trials)} trials pruned; {rounds:.0f} of {budget} boosting rounds trained "
+          f"(full-data equivalent)")
 
-            mlflow.log_params(params)
-            mlflow.log_metrics({"rmse": rmse, "mae": mae, "r2": r2})
-
-        return rmse
-
-    study = optuna.create_study(direction="minimize")
-    study.optimize(objective, n_trials=n_trials)
-
-    best_params = study.best_trial.params
+    best_trial = study.best_trial
+    best_params = best_trial.params
     print("✅ Best params from Optuna:", best_params)
 
-    # Retrain best model
-    best_model = LGBMRegressor(**{**best_params, "random_state": random_state, "n_jobs": -1, "verbosity": -1})
-    best_model.fit(X_train, y_train)
-    y_pred = best_model.predict(X_eval)
-    best_metrics = {
-        "rmse": float(np.sqrt(mean_squared_error(y_eval, y_pred))),
-        "mae": float(mean_absolute_error(y_eval, y_pred)),
-        "r2": float(r2_score(y_eval, y_pred)),
-    }
+    if best.trial_number == best_trial.number:
+        # Reuse the best trial's fitted model (and its eval metrics) instead of retraining
+        best_model = best.model
+        best_model.set_params(**fixed_params)
+        best_metrics = {"rmse": best_trial.value, "mae": best_trial.user_attrs["mae"], "r2": best_trial.user_attrs["r2"]}
+        print(f"♻️ Reusing the model of trial {best_trial.number} ({best_model.n_estimators} rounds)")
+    else:
+        best_model = fit_regressor({**best_params, **fixed_params}, train_set, **_early_stopping_kwargs(valid_set))
+        print(f"   Retrained best model, early-stopped at {best_model.n_estimators} of {best_params['n_estimators']} rounds")
+        y_pred = best_model.predict(X_eval)
+        best_metrics = {
+            "rmse": float(np.sqrt(mean_squared_error(y_eval, y_pred))),
+            "mae": float(mean_absolute_error(y_eval, y_pred)),
+            "r2": float(r2_score(y_eval, y_pred)),
+        }
     print("📊 Best tuned model metrics:", best_metrics)
 
     # Save to models/
@@ -121,16 +455,37 @@ def tune_model(
     if "AWS_LAMBDA_FUNCTION_NAME" not in os.environ:
         out.parent.mkdir(parents=True, exist_ok=True)
     dump(best_model, out)
+    trees_out = export_compiled_trees(best_model, compiled_trees_path(out))
+    bundle_out = export_inference_bundle(
+        out.with_suffix(BUNDLE_SUFFIX),
+        best_model,
+        feature_columns=list(X_train.columns),
+        freq_encoder_path=Path(encoders_dir) / "freq_encoder.pkl",
+        target_encoder_path=Path(encoders_dir) / "target_encoder.pkl",
+    )
     print(f"✅ Best model saved to {out}")
+    print(f"   Compiled trees (NumPy-only inference) saved to {trees_out}")
+    print(f"   Single-file inference bundle saved to {bundle_out}")
 
     # Log final best model to MLflow
     with mlflow.start_run(run_name="best_lgbm_model"):
         mlflow.log_params(best_params)
         mlflow.log_metrics(best_metrics)
-        mlflow.lightgbm.log_model(best_model, "model")
+        mlflow.lightgbm.log_model(best_model.booster_, "model")
 
     return best_params, best_metrics
 
 
 if __name__ == "__main__":
-    tune_model()
+    parser = argparse.ArgumentParser(description="Optuna tuning for the LightGBM model.")
+    parser.add_argument("--n_trials", type=int, default=15)
+    parser.add_argument("--n_workers", type=int, default=1, help="Trials running concurrently (processes)")
+    parser.add_argument("--storage", type=str, default=None, help=f"Optuna storage URL (parallel default: {DEFAULT_STORAGE})")
+    parser.add_argument("--study_name", type=str, default=None)
+    parser.add_argument("--pruner", type=str, default="median", choices=PRUNERS)
+    parser.add_argument("--search", type=str, default="tpe", choices=SEARCHES,
+                        help="tpe: full-data trials with pruning; halving: successive halving over train fractions")
+    args = parser.parse_args()
+
+    tune_model(n_trials=args.n_trials, n_workers=args.n_workers, storage=args.storage, study_name=args.study_name,
+               pruner=args.pruner, search=args.search)
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Raw city spellings (as in the source data) → metro centroid
+METROS = {
+    "Boston-Cambridge-Newton, MA-NH": (42.36, -71.06),
+    "Denver-Aurora-Centennial, CO": (39.74, -104.99),
+    "Seattle-Tacoma-Bellevue, WA": (47.61, -122.33),
+    "Houston-Pasadena-The Woodlands, TX": (29.76, -95.37),
+}
+RAW_CITIES = [
+    "Boston-Cambridge-Newton",
+    "  BOSTON–Cambridge-Newton ",  # en dash, case and spaces normalize to the same city
+    "Denver-Aurora-Lakewood",  # old name, CITY_MAPPING → Denver-Aurora-Centennial
+    "Seattle-Tacoma-Bellevue",
+    "Houston",
+]
+
+
+def make_raw(rng: np.random.Generator, n: int, start: str = "2015-01-31", end: str = "2021-12-31") -> pd.DataFrame:
+    """Synthetic RAW rows (holdout schema subset) with a learnable price."""
+    dates = pd.date_range(start, end, freq="ME").strftime("%Y-%m-%d")
+    city = rng.choice(RAW_CITIES, n)
+    zipcode = rng.integers(0, 40, n) + 10_000 + 1_000 * np.array([RAW_CITIES.index(c) for c in city])
+    df = pd.DataFrame({
+        "date": rng.choice(dates, n),
+        "zipcode": zipcode,
+        "city_full": city,
+        "median_list_price": rng.lognormal(12.5, 0.5, n).round(),
+        "median_ppsf": rng.lognormal(5.5, 0.4, n),
+        "homes_sold": rng.integers(0, 400, n).astype(float),
+        "Per Capita Income": rng.normal(35_000, 9_000, n),
+    })
+    df["median_sale_price"] = df["median_list_price"] * rng.uniform(0.9, 1.1, n)
+    df["price"] = 0.9 * df["median_list_price"] + 40 * df["median_ppsf"] + rng.normal(0, 20_000, n)
+    return df
+
+
+def write_metros(path) -> str:
+    pd.DataFrame(
+        [(name, lat, lng) for name, (lat, lng) in METROS.items()], columns=["metro_full", "lat", "lng"]
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def metros_csv(tmp_path_factory):
+    return write_metros(tmp_path_factory.mktemp("metros") / "usmetros.csv")
+
+
+@pytest.fixture(scope="session")
+def artifacts(tmp_path_factory, metros_csv):
+    """Small model trained end to end (preprocess → features → train) on synthetic rows."""
+    from src.feature_pipeline.feature_engineering import run_feature_engineering
+    from src.feature_pipeline.preprocess import run_preprocess
+    from src.storage import write_table
+    from src.training_pipeline.train import train_model
+
+    root = tmp_path_factory.mktemp("artifacts")
+    (root / "raw").mkdir()
+    rng = np.random.default_rng(0)
+    raw = make_raw(rng, 3_000)
+    dates = pd.to_datetime(raw["date"])
+    splits = {
+        "train": raw[dates < "2020-01-01"],
+        "eval": raw[(dates >= "2020-01-01") & (dates < "2021-01-01")],
+        "holdout": raw[dates >= "2021-01-01"],
+    }
+    for split, df in splits.items():
+        write_table(df, root / "raw" / split)
+    run_preprocess(raw_dir=root / "raw", processed_dir=root / "processed", metros_path=metros_csv,
+                   zip_centroids_path=None)
+    run_feature_engineering(
+        in_train_path=root / "processed" / "cleaning_train",
+        in_eval_path=root / "processed" / "cleaning_eval",
+        in_holdout_path=root / "processed" / "cleaning_holdout",
+        output_dir=root / "processed",
+        encoders_dir=root / "models",
+    )
+    model_path = root / "models" / "lgbm_model.pkl"
+    model, _ = train_model(
+        train_path=root / "processed" / "feature_engineered_train",
+        eval_path=root / "processed" / "feature_engineered_eval",
+        model_output=model_path,
+        model_params={"n_estimators": 30, "n_jobs": 1},
+        encoders_dir=root / "models",
+        dataset_cache_dir=None,
+    )
+    return SimpleNamespace(
+        root=root,
+        raw=splits["holdout"].reset_index(drop=True),
+        model=model,
+        model_path=model_path,
+        freq_encoder_path=root / "models" / "freq_encoder.pkl",
+        target_encoder_path=root / "models" / "target_encoder.pkl",
+        train_features_path=root / "processed" / "feature_engineered_train",
+        metros_path=metros_csv,
+    )
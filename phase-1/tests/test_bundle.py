@@ -0,0 +1,69 @@
+import dataclasses
+import shutil
+
+import numpy as np
+import pytest
+from joblib import load
+
+from src.feature_pipeline.preprocess import load_metro_table
+from src.inference_pipeline.bundle import read_inference_bundle, read_manifest, write_inference_bundle
+from src.inference_pipeline.inference import predict
+from src.inference_pipeline.registry import ArtifactBundle, ArtifactRegistry
+from src.storage import read_columns
+
+
+@pytest.fixture(scope="module")
+def bundle_path(artifacts, tmp_path_factory):
+    feature_columns = [c for c in read_columns(artifacts.train_features_path) if c != "price"]
+    return write_inference_bundle(
+        tmp_path_factory.mktemp("bundle") / "model.bundle",
+        artifacts.model,
+        feature_columns,
+        freq_encoder=load(artifacts.freq_encoder_path),
+        target_encoder=load(artifacts.target_encoder_path),
+        metros=load_metro_table(artifacts.metros_path),
+    )
+
+
+def test_round_trip_predicts_like_the_separate_artifacts(artifacts, bundle_path):
+    separate = ArtifactRegistry().get(artifacts.model_path, artifacts.freq_encoder_path,
+                                      artifacts.target_encoder_path, artifacts.train_features_path)
+    separate = dataclasses.replace(separate, metros=load_metro_table(artifacts.metros_path))
+
+    expected = predict(artifacts.raw, bundle=separate)["predicted_price"].to_numpy()
+    for use_compiled_trees in (True, False):
+        parts = read_inference_bundle(bundle_path, verify=True, use_compiled_trees=use_compiled_trees)
+        assert parts["feature_columns"] == separate.feature_columns
+        got = predict(artifacts.raw, bundle=ArtifactBundle(**parts))["predicted_price"].to_numpy()
+        assert np.allclose(got, expected, rtol=0)
+
+
+def test_truncated_file_is_rejected(bundle_path, tmp_path):
+    truncated = tmp_path / "truncated.bundle"
+    data = bundle_path.read_bytes()
+    truncated.write_bytes(data[: len(data) - 100])
+    with pytest.raises(ValueError, match="truncated"):
+        read_inference_bundle(truncated)
+
+
+def test_tampered_section_fails_verification(bundle_path, tmp_path):
+    manifest, data_start = read_manifest(bundle_path)
+    section = manifest["sections"]["trees.value"]
+    tampered = tmp_path / "tampered.bundle"
+    shutil.copy(bundle_path, tampered)
+    with open(tampered, "r+b") as f:
+        f.seek(data_start + section["offset"])
+        first = f.read(1)
+        f.seek(data_start + section["offset"])
+        f.write(bytes([first[0] ^ 0xFF]))
+
+    read_inference_bundle(tampered)  # the default cold-start read only checks the structure
+    with pytest.raises(ValueError, match="Checksum mismatch in bundle section 'trees.value'"):
+        read_inference_bundle(tampered, verify=True)
+
+
+def test_not_a_bundle(tmp_path):
+    path = tmp_path / "model.bundle"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="Not an inference bundle"):
+        read_inference_bundle(path)
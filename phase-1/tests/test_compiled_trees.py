@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+
+from src.inference_pipeline.compiled_trees import CompiledTrees, export_compiled_trees
+
+
+def _frame(rng: np.random.Generator, n: int, nan_rate: float) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "median list price": rng.lognormal(12.5, 0.5, n),  # space: LightGBM stores it as median_list_price
+        "homes_sold": rng.integers(0, 50, n).astype(float),  # many exact zeros
+        "lat": rng.uniform(25, 48, n),
+        "month": rng.integers(1, 13, n).astype(float),
+    })
+    for col in ("median list price", "homes_sold"):
+        df.loc[rng.random(n) < nan_rate, col] = np.nan
+    return df
+
+
+def _target(df: pd.DataFrame, rng: np.random.Generator) -> np.ndarray:
+    return (df["median list price"].fillna(3e5) + 2_000 * df["homes_sold"].fillna(-10)
+            + 500 * df["lat"] + rng.normal(0, 1e4, len(df)))
+
+
+@pytest.mark.parametrize("params", [{}, {"zero_as_missing": True}, {"use_missing": False}])
+def test_compiled_trees_match_lightgbm_with_missing_values(tmp_path, params):
+    rng = np.random.default_rng(0)
+    train = _frame(rng, 2_000, nan_rate=0.2)
+    model = LGBMRegressor(n_estimators=40, num_leaves=15, min_child_samples=5, random_state=0, n_jobs=1,
+                          verbosity=-1, **params).fit(train, _target(train, rng))
+
+    test = _frame(rng, 500, nan_rate=0.3)
+    test.loc[rng.random(500) < 0.3, "lat"] = np.nan  # NaN in a feature that had none in training
+    test.loc[:50, "homes_sold"] = 0.0
+    compiled = CompiledTrees.load(export_compiled_trees(model, tmp_path / "model_trees.npz"))
+
+    expected = model.predict(test)
+    assert np.allclose(compiled.predict(test), expected, rtol=0)
+    assert np.allclose(compiled.predict(test.to_numpy(), block_size=7), expected, rtol=0)
+
+
+def test_misaligned_frames_are_rejected(tmp_path):
+    rng = np.random.default_rng(1)
+    train = _frame(rng, 300, nan_rate=0.0)
+    model = LGBMRegressor(n_estimators=5, random_state=0, n_jobs=1, verbosity=-1).fit(train, _target(train, rng))
+    compiled = CompiledTrees.from_model(model)
+
+    with pytest.raises(ValueError, match="do not match"):
+        compiled.predict(train[["lat", "median list price", "homes_sold", "month"]])
+    with pytest.raises(ValueError, match="do not match"):
+        compiled.predict(train.rename(columns={"lat": "latitude"}))
+    with pytest.raises(ValueError, match="Expected 4 features"):
+        compiled.predict(train.to_numpy()[:, :3])
@@ -0,0 +1,69 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+
+from src.training_pipeline.dataset_cache import binned_dataset, fit_regressor, prune_dataset_cache
+
+PARAMS = {"n_estimators": 40, "learning_rate": 0.1, "num_leaves": 15, "random_state": 0, "n_jobs": 1}
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame({"median_list_price": rng.lognormal(12.5, 0.5, 800), "median_ppsf": rng.lognormal(5.5, 0.4, 800),
+                      "year": rng.integers(2012, 2022, 800)})
+    y = pd.Series(0.9 * X["median_list_price"] + 40 * X["median_ppsf"] + rng.normal(0, 20_000, 800))
+    return X, y
+
+
+def test_cache_hit_fits_the_same_model_as_a_fresh_dataset(tmp_path, data):
+    X, y = data
+    fresh = fit_regressor(PARAMS, binned_dataset(X, y, PARAMS, cache_dir=None))
+
+    binned_dataset(X, y, PARAMS, cache_dir=tmp_path)  # miss: builds and saves
+    assert len(list(tmp_path.glob("*.bin"))) == 1
+    cached = fit_regressor(PARAMS, binned_dataset(X, y, PARAMS, cache_dir=tmp_path))  # hit: loads the file
+
+    assert cached.booster_.dump_model()["tree_info"] == fresh.booster_.dump_model()["tree_info"]
+    np.testing.assert_array_equal(cached.predict(X), fresh.predict(X))
+    # ... and both score like a plain LGBMRegressor fit
+    np.testing.assert_allclose(fresh.predict(X), LGBMRegressor(**PARAMS).fit(X, y).predict(X), rtol=1e-10)
+
+
+def test_fitted_model_exposes_the_regressor_surface(data):
+    X, y = data
+    model = fit_regressor(PARAMS, binned_dataset(X, y, PARAMS, cache_dir=None))
+
+    assert model.n_estimators == model.rounds_trained_ == 40
+    assert model.get_params()["num_leaves"] == 15 and model.n_features_in_ == 3
+    assert model.set_params(n_jobs=4).get_params()["n_jobs"] == 4
+    restored = pickle.loads(pickle.dumps(model))
+    np.testing.assert_array_equal(restored.predict(X), model.predict(X))
+
+
+def test_prune_removes_least_recently_used_files(tmp_path, data):
+    for i, name in enumerate(["old", "mid", "new"]):
+        (tmp_path / f"{name}.bin").write_bytes(b"x" * 100)
+        os.utime(tmp_path / f"{name}.bin", ns=(i * 10**9, i * 10**9))
+
+    assert prune_dataset_cache(tmp_path, max_bytes=250) == 1
+    assert sorted(p.stem for p in tmp_path.glob("*.bin")) == ["mid", "new"]
+    assert prune_dataset_cache(tmp_path, max_bytes=50, keep=tmp_path / "mid.bin") == 1
+    assert [p.stem for p in tmp_path.glob("*.bin")] == ["mid"]
+
+    # A hit refreshes the entry, so the Dataset saved next evicts the other one
+    X, y = data
+    binned_dataset(X, y, PARAMS, cache_dir=tmp_path)
+    hit = next(p for p in tmp_path.glob("*.bin") if p.stem != "mid")
+    size = hit.stat().st_size
+    (tmp_path / "mid.bin").write_bytes(b"x" * size)
+    os.utime(tmp_path / "mid.bin", ns=(10**9, 10**9))
+    os.utime(hit, ns=(0, 0))
+    binned_dataset(X, y, PARAMS, cache_dir=tmp_path)
+    assert hit.stat().st_mtime_ns > 0
+    binned_dataset(X.iloc[:400], y.iloc[:400], PARAMS, cache_dir=tmp_path, max_cache_bytes=2 * size)
+    assert hit.exists() and not (tmp_path / "mid.bin").exists()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_pipeline.dates import date_features, date_parts_of, parse_dates
+
+
+@pytest.fixture
+def dates():
+    rng = np.random.default_rng(3)
+    months = pd.date_range("2012-01-31", "2023-12-31", freq="ME").strftime("%Y-%m-%d")
+    return pd.Series(rng.choice(months, 2_000), index=np.arange(2_000) * 3, name="date")
+
+
+def test_date_features_match_pandas(dates):
+    parsed, parts = date_features(dates)
+    expected = pd.to_datetime(dates)
+    pd.testing.assert_series_equal(parsed, expected)
+    for part in ("year", "quarter", "month"):
+        np.testing.assert_array_equal(parts[part], getattr(expected.dt, part).to_numpy())
+
+
+def test_other_formats_fall_back_to_inference():
+    dates = pd.Series(["01/31/2020", "02/29/2020", "01/31/2020"])
+    parsed, parts = date_features(dates)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(dates))
+    assert parts["month"].tolist() == [1, 2, 1]
+    pd.testing.assert_series_equal(parse_dates(dates), pd.to_datetime(dates))
+
+
+def test_missing_and_parsed_dates(dates):
+    with_missing = dates.copy()
+    with_missing.iloc[[0, 5]] = None
+    pd.testing.assert_series_equal(parse_dates(with_missing), pd.to_datetime(with_missing))
+
+    already = pd.to_datetime(dates)
+    assert parse_dates(already) is already
+    pd.testing.assert_series_equal(date_features(already)[0], already)
+
+
+def test_date_parts_of_one_value():
+    assert date_parts_of("2021-08-31") == (2021, 3, 8)
+    assert date_parts_of("08/31/2021") == (2021, 3, 8)
+    assert date_parts_of("not a date") is None
+    assert date_parts_of("NaT") is None
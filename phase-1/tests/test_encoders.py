@@ -0,0 +1,91 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import load
+
+from src.feature_pipeline.feature_engineering import FrequencyEncoder, SimpleTargetEncoder, stream_feature_engineering
+from src.storage import read_table
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(1)
+    cities = np.array(["Boston", "Denver", "Seattle", "Houston", "Austin"], dtype=object)
+    a = pd.DataFrame({"city": rng.choice(cities[:3], 300), "zipcode": rng.integers(10_000, 10_050, 300)})
+    b = pd.DataFrame({"city": rng.choice(cities[1:], 200), "zipcode": rng.integers(10_030, 10_080, 200)})
+    # Integer-valued targets: the merged sums are exact, whatever the summation order
+    a["price"] = rng.integers(100_000, 900_000, len(a)).astype(float)
+    b["price"] = rng.integers(100_000, 900_000, len(b)).astype(float)
+    b.loc[b.index[:3], "price"] = np.nan
+    return a, b, pd.concat([a, b], ignore_index=True)
+
+
+def _assert_same_table(merged, full, stats=()):
+    np.testing.assert_array_equal(merged.categories, full.categories)
+    np.testing.assert_array_equal(merged.values, full.values)
+    for name in stats:
+        np.testing.assert_array_equal(getattr(merged, name), getattr(full, name))
+    assert list(merged.categories) == sorted(merged.categories)  # the lookup table stays sorted
+
+
+def test_merged_target_encoder_equals_one_fit(rows):
+    a, b, both = rows
+    merged = SimpleTargetEncoder().fit(a["city"], a["price"]).merge(SimpleTargetEncoder().fit(b["city"], b["price"]))
+    full = SimpleTargetEncoder().fit(both["city"], both["price"])
+
+    _assert_same_table(merged, full, stats=("counts", "sums"))
+    assert (merged.n_rows, merged.target_sum, merged.global_mean) == (full.n_rows, full.target_sum, full.global_mean)
+
+    queries = pd.Series(["Austin", "Boston", "Nowhere", None, "Denver"])  # unseen and missing → global mean
+    pd.testing.assert_series_equal(merged.transform(queries), full.transform(queries))
+    assert merged.transform(queries).iloc[2] == full.global_mean
+
+
+def test_merged_frequency_encoder_equals_one_fit(rows):
+    a, b, both = rows
+    merged = FrequencyEncoder().fit(a["zipcode"]).merge(FrequencyEncoder().fit(b["zipcode"]))
+    full = FrequencyEncoder().fit(both["zipcode"])
+
+    _assert_same_table(merged, full)
+    queries = pd.Series([10_000, 10_079, 99_999, 10_040])
+    pd.testing.assert_series_equal(merged.transform(queries), full.transform(queries))
+    assert merged.transform(queries).iloc[2] == 0  # unseen zipcode
+
+
+def test_partial_fit_matches_fit(rows):
+    _, _, both = rows
+    streamed = SimpleTargetEncoder()
+    for start in range(0, len(both), 125):
+        chunk = both.iloc[start:start + 125]
+        streamed.partial_fit(chunk["city"], chunk["price"])
+    _assert_same_table(streamed, SimpleTargetEncoder().fit(both["city"], both["price"]), stats=("counts", "sums"))
+
+
+def test_lookup_matches_the_mapping_after_a_pickle_round_trip(rows):
+    a, _, _ = rows
+    encoder = pickle.loads(pickle.dumps(SimpleTargetEncoder().fit(a["city"], a["price"])))
+    queries = pd.Series(["Seattle", "Boston", "Austin", "Denver"])
+    expected = queries.map(encoder.mapping).fillna(encoder.global_mean)
+    pd.testing.assert_series_equal(encoder.transform(queries), expected)
+
+
+def test_streamed_feature_engineering_matches_in_memory(artifacts, tmp_path):
+    processed = artifacts.root / "processed"
+    freq_encoder, target_encoder = stream_feature_engineering(
+        in_train_path=processed / "cleaning_train",
+        in_eval_path=processed / "cleaning_eval",
+        in_holdout_path=processed / "cleaning_holdout",
+        output_dir=tmp_path,
+        encoders_dir=tmp_path / "models",
+        chunksize=97,
+    )
+
+    _assert_same_table(freq_encoder, load(artifacts.freq_encoder_path))
+    in_memory = load(artifacts.target_encoder_path)
+    np.testing.assert_array_equal(target_encoder.categories, in_memory.categories)
+    np.testing.assert_allclose(target_encoder.values, in_memory.values, rtol=1e-12)
+    for split in ("train", "eval", "holdout"):
+        pd.testing.assert_frame_equal(read_table(tmp_path / f"feature_engineered_{split}"),
+                                      read_table(processed / f"feature_engineered_{split}"), rtol=1e-12)
@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+from joblib import load
+
+from src.storage import read_table, resolve_table
+from src.training_pipeline.incremental import incremental_train
+
+
+@pytest.fixture
+def workdir(artifacts, tmp_path, monkeypatch):
+    """Copies of the cleaned splits, model and encoders; the 2021 holdout plays the new months."""
+    monkeypatch.chdir(tmp_path)
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    for split in ("train", "eval", "holdout"):
+        src = resolve_table(artifacts.root / "processed" / f"cleaning_{split}")
+        shutil.copy(src, processed / src.name)
+    new = resolve_table(processed / "cleaning_holdout")
+    shutil.copytree(artifacts.root / "models", tmp_path / "models")
+    return tmp_path, new
+
+
+def test_fallback_retrains_on_history_plus_new_rows(workdir):
+    root, new_path = workdir
+    history, new = read_table(root / "processed" / "cleaning_train"), read_table(new_path)
+
+    model, metrics, strategy = incremental_train(
+        new_path=new_path,
+        eval_path=root / "processed" / "cleaning_eval",
+        model_path=root / "models" / "lgbm_model.pkl",
+        encoders_dir=root / "models",
+        train_path=root / "processed" / "cleaning_train",
+        tolerance=-1.0,  # no update is good enough: always fall back
+    )
+
+    assert strategy == "full"
+    trained_on = read_table(root / "processed" / "feature_engineered_train")
+    assert len(trained_on) == len(history) + len(new)
+    encoder = load(root / "models" / "target_encoder.pkl")
+    assert encoder.n_rows == len(history) + len(new)  # the new rows reach the refitted encoders too
+    assert model.n_features_in_ == trained_on.shape[1] - 1 and metrics["rmse"] > 0
+
+
+def test_accepted_update_adds_trees_and_merges_encoders(workdir):
+    root, new_path = workdir
+    before = load(root / "models" / "target_encoder.pkl")
+
+    model, _, strategy = incremental_train(
+        new_path=new_path,
+        eval_path=root / "processed" / "cleaning_eval",
+        model_path=root / "models" / "lgbm_model.pkl",
+        encoders_dir=root / "models",
+        n_rounds=5,
+        tolerance=10.0,
+    )
+
+    assert strategy == "continue"
+    assert model.n_estimators == load(root / "models" / "lgbm_model.pkl").n_estimators == 30 + 5
+    assert load(root / "models" / "target_encoder.pkl").n_rows == before.n_rows + len(read_table(new_path))
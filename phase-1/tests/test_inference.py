@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from src.inference_pipeline import inference
+from src.inference_pipeline.inference import predict, predict_stream
+from src.storage import read_table, write_table
+
+
+@pytest.fixture
+def paths(artifacts):
+    return dict(
+        model_path=artifacts.model_path,
+        freq_encoder_path=artifacts.freq_encoder_path,
+        target_encoder_path=artifacts.target_encoder_path,
+        train_features_path=artifacts.train_features_path,
+    )
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet"])
+def test_streamed_chunks_match_in_memory_predict(artifacts, paths, tmp_path, output_format):
+    raw_path = write_table(artifacts.raw, tmp_path / "raw", fmt="csv")
+    expected = predict(read_table(raw_path), **paths).reset_index(drop=True)
+
+    out = tmp_path / f"predictions.{output_format}"
+    n_rows = predict_stream(raw_path, out, chunksize=37, **paths)
+
+    streamed = read_table(out, compact=False)
+    assert n_rows == len(expected) == len(streamed)
+    pd.testing.assert_series_equal(streamed["predicted_price"], expected["predicted_price"])
+    pd.testing.assert_series_equal(streamed["actual_price"], expected["actual_price"])
+
+
+def test_worker_processes_write_the_same_file_as_one_process(artifacts, paths, tmp_path):
+    raw_path = write_table(artifacts.raw, tmp_path / "raw", fmt="csv")
+    predict_stream(raw_path, tmp_path / "serial.csv", chunksize=50, workers=1, **paths)
+    predict_stream(raw_path, tmp_path / "parallel.csv", chunksize=50, workers=2, **paths)
+
+    assert (tmp_path / "parallel.csv").read_bytes() == (tmp_path / "serial.csv").read_bytes()
+    assert inference._WORKER_BUNDLE is None  # not pinned in the parent after scoring
@@ -0,0 +1,58 @@
+from src.feature_pipeline import load
+from src.pipeline import Stage, code_closure, default_stages, run_pipeline
+
+
+def test_stage_code_includes_transitive_src_imports():
+    stages = {stage.name: stage for stage in default_stages()}
+
+    train_code = code_closure(stages["train"].code)
+    # train → bundle → preprocess / feature_engineering → dates
+    for module in ("src.inference_pipeline.bundle", "src.feature_pipeline.preprocess",
+                   "src.feature_pipeline.feature_engineering", "src.feature_pipeline.dates",
+                   "src.training_pipeline.dataset_cache", "src.storage", "src.schema"):
+        assert module in train_code
+    assert not any(name.startswith(("lightgbm", "pandas")) for name in train_code)
+
+    assert "src.feature_pipeline.dates" in code_closure([load])
+
+
+def _stages(tmp_path, runs):
+    source, doubled, total = tmp_path / "source.txt", tmp_path / "doubled.txt", tmp_path / "total.txt"
+
+    def double():
+        runs.append("double")
+        doubled.write_text(" ".join(str(2 * int(v)) for v in source.read_text().split()))
+
+    def add():
+        runs.append("add")
+        total.write_text(str(sum(int(v) for v in doubled.read_text().split())))
+
+    return [
+        Stage("double", double, inputs=[source], outputs=[doubled]),
+        Stage("add", add, inputs=[doubled], outputs=[total], params={"op": "sum"}, deps=["double"]),
+    ]
+
+
+def test_unchanged_stages_are_served_from_the_cache(tmp_path):
+    (tmp_path / "source.txt").write_text("1 2 3")
+    runs = []
+    cache_dir = tmp_path / "cache"
+
+    first = run_pipeline(_stages(tmp_path, runs), cache_dir=cache_dir)
+    assert [r.status for r in first] == ["miss", "miss"] and runs == ["double", "add"]
+
+    runs.clear()
+    (tmp_path / "total.txt").unlink()  # a hit restores missing outputs
+    second = run_pipeline(_stages(tmp_path, runs), cache_dir=cache_dir)
+    assert [r.status for r in second] == ["hit", "hit"] and runs == []
+    assert [r.key for r in second] == [r.key for r in first]
+    assert (tmp_path / "total.txt").read_text() == "12"
+
+    # New input contents re-run the stage; the unchanged downstream input is still a hit
+    (tmp_path / "source.txt").write_text("1 2 3 ")
+    third = run_pipeline(_stages(tmp_path, runs), cache_dir=cache_dir)
+    assert [r.status for r in third] == ["miss", "hit"] and runs == ["double"]
+
+    runs.clear()
+    forced = run_pipeline(_stages(tmp_path, runs), force=("double",), cache_dir=cache_dir)
+    assert [r.status for r in forced] == ["forced", "forced"] and runs == ["double", "add"]
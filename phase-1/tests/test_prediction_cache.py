@@ -0,0 +1,95 @@
+import numpy as np
+from joblib import dump
+
+from src.inference_pipeline import prediction_cache
+from src.inference_pipeline.inference import predict
+from src.inference_pipeline.prediction_cache import PredictionCache, row_keys
+from src.inference_pipeline.registry import ArtifactRegistry
+
+
+class _Scorer:
+    """Counts the rows that actually reach the model."""
+
+    def __init__(self, X: np.ndarray, offset: float = 0.0):
+        self.X, self.offset, self.rows = X, offset, 0
+
+    def __call__(self, idx: np.ndarray) -> np.ndarray:
+        self.rows += len(idx)
+        return self.X[idx].sum(axis=1) + self.offset
+
+
+def test_cached_predictions_are_bit_identical_to_fresh_ones(artifacts):
+    bundle = ArtifactRegistry().get(artifacts.model_path, artifacts.freq_encoder_path,
+                                    artifacts.target_encoder_path, artifacts.train_features_path)
+    cache = PredictionCache()
+    fresh = predict(artifacts.raw, bundle=bundle)["predicted_price"].to_numpy()
+
+    first = predict(artifacts.raw, bundle=bundle, cache=cache)["predicted_price"].to_numpy()
+    assert cache.stats()["misses"] == len(artifacts.raw) and cache.stats()["hits"] == 0
+    second = predict(artifacts.raw, bundle=bundle, cache=cache)["predicted_price"].to_numpy()
+    assert cache.stats()["hits"] == len(artifacts.raw)
+
+    assert first.tobytes() == fresh.tobytes()
+    assert second.tobytes() == fresh.tobytes()
+
+
+def test_keys_are_exact_and_canonical():
+    X = np.array([[0.0, np.nan], [-0.0, np.nan], [0.0, 1.0]])
+    keys = row_keys("v1", X)
+    assert keys[0] == keys[1]  # -0.0 == 0.0, one NaN pattern
+    assert keys[0] != keys[2]
+    assert row_keys("v2", X)[0] != keys[0]
+
+
+def test_new_model_version_is_scored_again():
+    X = np.random.default_rng(0).normal(size=(20, 3))
+    cache = PredictionCache()
+    old, new = _Scorer(X), _Scorer(X, offset=1.0)
+
+    cache.predict("v1", X, old)
+    preds = cache.predict("v2", X, new)
+    assert new.rows == len(X)
+    np.testing.assert_array_equal(preds, X.sum(axis=1) + 1.0)
+
+
+def test_reloaded_bundle_drops_its_entries(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    dump({"model": 1}, model_path)
+    registry = ArtifactRegistry()
+    cache = PredictionCache(registry=registry)
+    X = np.arange(10, dtype=float).reshape(5, 2)
+
+    old = registry.get(model_path)
+    cache.predict(old.version, X, _Scorer(X))
+    assert len(cache) == 5
+
+    registry.reload(model_path)
+    assert len(cache) == 0
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    X = np.random.default_rng(1).normal(size=(10, 4))
+    cache = PredictionCache(ttl_seconds=60)
+    scorer = _Scorer(X)
+
+    cache.predict("v1", X, scorer)
+    now[0] += 59
+    cache.predict("v1", X, scorer)
+    assert scorer.rows == len(X)  # still fresh
+
+    now[0] += 2
+    cache.predict("v1", X, scorer)
+    assert scorer.rows == 2 * len(X)  # expired → scored again
+
+
+def test_lru_bound():
+    X = np.arange(30, dtype=float).reshape(15, 2)
+    cache = PredictionCache(maxsize=10)
+    cache.predict("v1", X, _Scorer(X))
+    assert len(cache) == 10
+
+    scorer = _Scorer(X)
+    cache.predict("v1", X[-10:], scorer)
+    assert scorer.rows == 0  # the 10 most recent rows were kept
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_pipeline.preprocess import (
+    CITY_MAPPING,
+    build_zip_centroids,
+    canonicalize_cities,
+    clean_and_merge,
+    load_metro_table,
+    normalize_city,
+)
+
+
+def test_canonicalize_cities_matches_the_row_by_row_mapping():
+    cities = pd.Series(
+        ["Denver-Aurora-Lakewood", "  BOSTON–Cambridge-Newton ", float("nan"), "Atlantis", "DC_Metro",
+         "Boston-Cambridge-Newton", "houston", "Atlantis", float("nan")],
+        index=[10, 11, 12, 13, 14, 15, 16, 17, 18],
+        name="city_full",
+    )
+    mapping = {normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()}
+    expected = pd.Series([mapping.get(normalize_city(c), normalize_city(c)) for c in cities],
+                         index=cities.index, name=cities.name, dtype=object)
+
+    result = canonicalize_cities(cities)
+    pd.testing.assert_series_equal(result, expected)
+    assert result[10] == "denver-aurora-centennial, co"  # old metro name → current one
+    assert result[11] == result[15] == "boston-cambridge-newton, ma-nh"  # dash, case and spaces
+    assert result[13] == "atlantis"  # unmapped cities are only normalized
+    assert result[[12, 18]].isna().all()
+
+
+def test_metro_lookup_matches_a_merge_and_keeps_the_index(tmp_path):
+    metros = pd.DataFrame({
+        "metro_full": ["Boston-Cambridge-Newton, MA-NH", "Seattle-Tacoma-Bellevue, WA",
+                       "Seattle-Tacoma-Bellevue, WA", "Denver-Aurora-Centennial, CO"],
+        "lat": [42.36, 47.61, 0.0, 39.74],  # duplicate metro: the first row wins
+        "lng": [-71.06, -122.33, 0.0, -104.99],
+    })
+    metros.to_csv(tmp_path / "metros.csv", index=False)
+    df = pd.DataFrame(
+        {"city_full": ["Seattle-Tacoma-Bellevue", "Atlantis", "Denver-Aurora-Lakewood", "Boston-Cambridge-Newton"],
+         "price": [1.0, 2.0, 3.0, 4.0]},
+        index=[7, 3, 5, 3],
+    )
+
+    out = clean_and_merge(df.copy(), metros_path=str(tmp_path / "metros.csv"), zip_centroids_path=None)
+
+    first = metros.assign(metro_full=metros["metro_full"].map(normalize_city)).drop_duplicates("metro_full")
+    expected = canonicalize_cities(df["city_full"]).to_frame().merge(
+        first, how="left", left_on="city_full", right_on="metro_full")
+    assert list(out.index) == [7, 3, 5, 3]
+    np.testing.assert_array_equal(out["lat"], expected["lat"])
+    np.testing.assert_array_equal(out["lng"], expected["lng"])
+    assert np.isnan(out["lat"].iloc[1])  # unknown city
+
+
+def test_metro_table_is_read_once_until_the_file_changes(tmp_path):
+    path = tmp_path / "metros.csv"
+    pd.DataFrame({"metro_full": ["Seattle-Tacoma-Bellevue, WA"], "lat": [47.61], "lng": [-122.33]}).to_csv(path, index=False)
+    table = load_metro_table(path)
+    assert load_metro_table(path) is table
+
+    pd.DataFrame({"metro_full": ["Seattle-Tacoma-Bellevue, WA", "Boston-Cambridge-Newton, MA-NH"],
+                  "lat": [47.61, 42.36], "lng": [-122.33, -71.06]}).to_csv(path, index=False)
+    assert len(load_metro_table(path)) == 2
+    assert load_metro_table(tmp_path / "missing.csv") is None
+
+
+def test_unmatched_cities_get_the_metro_nearest_to_their_zipcode(tmp_path, metros_csv):
+    gazetteer = tmp_path / "2023_Gaz_zcta_national.txt"
+    gazetteer.write_text(
+        "GEOID\tALAND\tAWATER\tINTPTLAT\tINTPTLONG                                                                \n"
+        "02139\t4755000\t0\t42.364\t-71.104\n"  # Cambridge, MA → Boston
+        "80014\t17560000\t0\t39.662\t-104.837\n"  # Aurora, CO → Denver
+        "98402\t2050000\t0\t47.254\t-122.442\n"  # Tacoma, WA → Seattle
+    )
+    centroids_path = build_zip_centroids(gazetteer, tmp_path / "zip_centroids.csv")
+    centroids = pd.read_csv(centroids_path)
+    assert list(centroids.columns) == ["zipcode", "lat", "lng"]
+    assert centroids["zipcode"].tolist() == [2139, 80014, 98402]
+
+    df = pd.DataFrame({
+        "city_full": ["Cambridge", "Aurora", "Tacoma", "Seattle-Tacoma-Bellevue", "Atlantis"],
+        "zipcode": [2139, 80014, 98402, 2139, 11111],  # a metro match wins over the zipcode; unknown zipcode stays NaN
+    })
+    out = clean_and_merge(df, metros_path=metros_csv, zip_centroids_path=str(centroids_path))
+
+    metros = load_metro_table(metros_csv)
+    expected = [metros.lookup([normalize_city(name)]) for name in
+                ("Boston-Cambridge-Newton, MA-NH", "Denver-Aurora-Centennial, CO",
+                 "Seattle-Tacoma-Bellevue, WA", "Seattle-Tacoma-Bellevue, WA")]
+    np.testing.assert_array_equal(out["lat"].iloc[:4], [lat[0] for lat, _ in expected])
+    np.testing.assert_array_equal(out["lng"].iloc[:4], [lng[0] for _, lng in expected])
+    assert out[["lat", "lng"]].iloc[4].isna().all()
+
+
+def test_nearest_metro_matches_a_great_circle_scan(metros_csv):
+    metros = load_metro_table(metros_csv)
+    rng = np.random.default_rng(2)
+    lat, lng = rng.uniform(25, 49, 500), rng.uniform(-125, -67, 500)
+
+    def haversine(lat1, lng1, lat2, lng2):
+        lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        return 2 * np.arcsin(np.sqrt(a))
+
+    distances = haversine(lat[:, None], lng[:, None], metros.lat[None, :], metros.lng[None, :])
+    np.testing.assert_array_equal(metros.nearest(lat, lng), distances.argmin(axis=1))
+    assert len(metros.nearest(np.empty(0), np.empty(0))) == 0
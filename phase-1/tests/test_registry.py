@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+from joblib import dump
+
+from src.inference_pipeline.registry import ArtifactRegistry
+
+
+def _model(path, value) -> str:
+    dump({"model": value}, path)
+    return str(path)
+
+
+def _rewrite(path, value) -> None:
+    """Replace the file with a new model; bump the mtime past the filesystem's resolution."""
+    mtime_ns = os.stat(path).st_mtime_ns + 10**9
+    _model(path, value)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_lru_eviction_at_capacity_notifies_listeners(tmp_path):
+    registry = ArtifactRegistry(maxsize=2)
+    discarded = []
+    registry.add_discard_listener(discarded.append)
+    paths = [_model(tmp_path / f"m{i}.pkl", i) for i in range(3)]
+
+    first = registry.get(paths[0])
+    second = registry.get(paths[1])
+    registry.get(paths[0])  # most recently used: paths[1] is the LRU entry now
+    registry.get(paths[2])
+
+    assert len(registry) == 2
+    assert registry.peek(paths[1]) is None
+    assert registry.peek(paths[0]) is first
+    assert discarded == [second.version]
+
+
+def test_changed_file_gets_a_new_version(tmp_path):
+    registry = ArtifactRegistry()
+    discarded = []
+    registry.add_discard_listener(discarded.append)
+    path = _model(tmp_path / "model.pkl", 1)
+
+    old = registry.get(path)
+    assert registry.get(path) is old  # unchanged: served from memory
+
+    _rewrite(path, 2)
+    new = registry.get(path)
+    assert new is not old and new.version != old.version
+    assert new.model == {"model": 2}
+    assert discarded == [old.version]
+
+
+def test_no_revalidation_serves_the_cached_bundle(tmp_path):
+    registry = ArtifactRegistry(revalidate=False)
+    path = _model(tmp_path / "model.pkl", 1)
+    old = registry.get(path)
+
+    _rewrite(path, 2)
+    assert registry.get(path) is old
+    assert registry.reload(path).model == {"model": 2}
+
+
+def test_invalidate_and_reload_fire_listeners(tmp_path):
+    registry = ArtifactRegistry()
+    discarded = []
+    registry.add_discard_listener(discarded.append)
+    a, b = _model(tmp_path / "a.pkl", 1), _model(tmp_path / "b.pkl", 2)
+    bundle_a, bundle_b = registry.get(a), registry.get(b)
+
+    reloaded = registry.reload(a)
+    assert reloaded is not bundle_a and discarded == [bundle_a.version]
+
+    registry.invalidate(b)
+    assert registry.peek(b) is None and registry.peek(a) is reloaded
+    assert discarded == [bundle_a.version, bundle_b.version]
+
+    registry.invalidate()
+    assert len(registry) == 0 and discarded[-1] == reloaded.version
+
+
+def test_feature_columns_from_a_suffixless_table(tmp_path):
+    model = _model(tmp_path / "model.pkl", 1)
+    pd.DataFrame({"year": [2020], "lat": [1.0], "price": [3.0]}).to_csv(tmp_path / "features.csv", index=False)
+
+    bundle = ArtifactRegistry().get(model, train_features_path=tmp_path / "features")
+    assert bundle.feature_columns == ["year", "lat"]
@@ -0,0 +1,54 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_pipeline.preprocess import OUTLIER_PRICE, load_metro_table
+from src.inference_pipeline.inference import predict
+from src.inference_pipeline.registry import ArtifactRegistry
+from src.inference_pipeline.row_plan import predict_record
+
+
+@pytest.fixture(scope="module")
+def bundle(artifacts):
+    bundle = ArtifactRegistry().get(artifacts.model_path, artifacts.freq_encoder_path,
+                                    artifacts.target_encoder_path, artifacts.train_features_path)
+    # Ship the metros table with the bundle so both paths fill lat/lng from it
+    return dataclasses.replace(bundle, metros=load_metro_table(artifacts.metros_path))
+
+
+def test_fast_path_matches_predict_bit_for_bit(artifacts, bundle):
+    records = artifacts.raw.head(50).to_dict("records")
+    records.append({**records[0], "zipcode": 99_999, "city_full": "Nowhere"})  # unseen zipcode and city
+    records.append({k: v for k, v in records[1].items() if k not in ("price", "homes_sold")})  # missing columns
+
+    for record in records:
+        fast = predict_record(record, bundle)
+        assert fast is not None
+        expected = predict(pd.DataFrame([record]), bundle=bundle)
+        assert fast[0] == expected["predicted_price"].iloc[0]
+        if "price" in record:
+            assert fast[1] == expected["actual_price"].iloc[0]
+        else:
+            assert fast[1] is None
+
+
+@pytest.mark.parametrize("change", [
+    {"median_list_price": OUTLIER_PRICE + 1},  # dropped by remove_outliers
+    {"median_list_price": float("nan")},
+    {"median_ppsf": "1200"},  # non-numeric feature
+    {"date": 20200131},
+    {"city_full": 42},
+    {"price": "n/a"},
+])
+def test_records_the_plan_cannot_reproduce_fall_back(artifacts, bundle, change):
+    record = {**artifacts.raw.iloc[0].to_dict(), **change}
+    assert predict_record(record, bundle) is None
+
+
+def test_outlier_boundary_is_kept(artifacts, bundle):
+    record = {**artifacts.raw.iloc[0].to_dict(), "median_list_price": float(OUTLIER_PRICE)}
+    fast = predict_record(record, bundle)
+    assert fast is not None
+    assert np.isfinite(fast[0])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from src.feature_pipeline.preprocess import OUTLIER_PRICE, remove_outliers
+from src.schema import TARGET
+from src.storage import read_table, write_table
+
+# Compact dtypes (float32 measurements, small ints) may only move the metrics by noise
+REL_TOLERANCE = 0.01
+
+
+def _frame(rng: np.random.Generator, n: int) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "year": rng.integers(2012, 2020, n),
+        "month": rng.integers(1, 13, n),
+        "median_list_price": rng.lognormal(12.5, 0.5, n),
+        "median_ppsf": rng.lognormal(5.5, 0.4, n),
+        "homes_sold": rng.integers(0, 400, n).astype(float),
+        "Per Capita Income": rng.normal(35_000, 9_000, n),
+        "lat": rng.uniform(25, 48, n),
+        "lng": rng.uniform(-124, -70, n),
+        "zipcode_freq": rng.integers(1, 200, n),
+        "city_full_encoded": rng.lognormal(12.8, 0.4, n),
+    })
+    df[TARGET] = (0.9 * df["median_list_price"] + 40 * df["median_ppsf"] + 0.2 * df["city_full_encoded"]
+                  + 800 * (df["year"] - 2012) + rng.normal(0, 20_000, n))
+    return df
+
+
+def _metrics(train: pd.DataFrame, test: pd.DataFrame) -> tuple[float, float]:
+    model = LGBMRegressor(n_estimators=100, learning_rate=0.1, num_leaves=31, random_state=0, n_jobs=1, verbosity=-1)
+    model.fit(train.drop(columns=[TARGET]), train[TARGET])
+    pred = model.predict(test.drop(columns=[TARGET]))
+    return float(np.sqrt(mean_squared_error(test[TARGET], pred))), float(mean_absolute_error(test[TARGET], pred))
+
+
+def test_compact_schema_keeps_model_accuracy(tmp_path):
+    rng = np.random.default_rng(0)
+    train_csv = write_table(_frame(rng, 4_000), tmp_path / "train", fmt="csv")
+    test_csv = write_table(_frame(rng, 1_000), tmp_path / "test", fmt="csv")
+
+    default = [read_table(p, compact=False) for p in (train_csv, test_csv)]
+    compact = [read_table(p, compact=True) for p in (train_csv, test_csv)]
+    assert default[0]["median_ppsf"].dtype == np.float64
+    assert compact[0]["homes_sold"].dtype == np.float32 and compact[0]["year"].dtype == np.int16
+    assert compact[0]["median_list_price"].dtype == np.float64 and compact[0][TARGET].dtype == np.float64
+
+    rmse_default, mae_default = _metrics(*default)
+    rmse_compact, mae_compact = _metrics(*compact)
+    assert rmse_compact == pytest.approx(rmse_default, rel=REL_TOLERANCE)
+    assert mae_compact == pytest.approx(mae_default, rel=REL_TOLERANCE)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_outlier_cutoff_survives_the_compact_schema(tmp_path, fmt):
+    prices = [OUTLIER_PRICE - 1, OUTLIER_PRICE, OUTLIER_PRICE + 1, 123_456_789.5]
+    df = pd.DataFrame({"median_list_price": prices, "median_sale_price": prices,
+                       "lat": [42.360_081_7] * 4, "lng": [-71.058_880_1] * 4})
+    path = write_table(df, tmp_path / "cleaning_train", fmt=fmt)
+
+    read = read_table(path)
+    pd.testing.assert_frame_equal(read, df)  # no rounding: 19,000,001 is not read back as 19,000,000
+    assert remove_outliers(read)["median_list_price"].tolist() == [OUTLIER_PRICE - 1, OUTLIER_PRICE]
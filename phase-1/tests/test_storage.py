@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from src.storage import read_table, resolve_table, table_exists, write_part, write_table
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"zipcode": [10_001, 10_002], "price": [1.5, 2.5]})
+
+
+def test_explicit_suffix_must_exist(tmp_path, frame):
+    csv = write_table(frame, tmp_path / "train", fmt="csv")
+
+    assert resolve_table(csv) == csv
+    with pytest.raises(FileNotFoundError):
+        resolve_table(tmp_path / "train.parquet")  # no fallback to the CSV next to it
+    assert not table_exists(tmp_path / "train.parquet")
+
+
+def test_suffixless_stem_falls_back_across_formats(tmp_path, frame, monkeypatch):
+    monkeypatch.setenv("PIPELINE_STORAGE_FORMAT", "parquet")
+    csv = write_table(frame, tmp_path / "train", fmt="csv")
+    assert resolve_table(tmp_path / "train") == csv
+
+    parquet = write_table(frame, tmp_path / "train", fmt="parquet")
+    assert resolve_table(tmp_path / "train") == parquet  # the configured format wins
+    pd.testing.assert_frame_equal(read_table(tmp_path / "train"), read_table(csv))
+
+    with pytest.raises(FileNotFoundError):
+        resolve_table(tmp_path / "missing")
+
+
+def test_part_directory(tmp_path, frame):
+    write_part(frame, tmp_path / "train", 0)
+    write_part(frame, tmp_path / "train", 1)
+    assert resolve_table(tmp_path / "train") == tmp_path / "train"
+    assert len(read_table(tmp_path / "train")) == 2 * len(frame)
@@ -0,0 +1,83 @@
+import threading
+import types
+
+import pytest
+
+pytest.importorskip("mlflow")
+
+from src.training_pipeline import tracking  # noqa: E402
+
+
+class _Client:
+    """Records the runs written; optionally blocks until released or fails every call."""
+
+    def __init__(self, tracking_uri=None, fail=False):
+        self.runs, self.batches = {}, []
+        self.entered, self.release = threading.Event(), threading.Event()
+        self.release.set()
+        self.fail = fail
+
+    def create_run(self, experiment_id, start_time=None):
+        self.entered.set()
+        self.release.wait()
+        if self.fail:
+            raise ConnectionError("tracking server unreachable")
+        run_id = str(len(self.runs))
+        self.runs[run_id] = {"experiment_id": experiment_id, "terminated": False}
+        return types.SimpleNamespace(info=types.SimpleNamespace(run_id=run_id))
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self.runs[run_id].update(metrics={m.key: m.value for m in metrics}, params={p.key: p.value for p in params},
+                                 tags={t.key: t.value for t in tags})
+
+    def set_terminated(self, run_id):
+        self.runs[run_id]["terminated"] = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = _Client()
+    monkeypatch.setattr(tracking, "MlflowClient", lambda tracking_uri=None: client)
+    return client
+
+
+def test_every_queued_run_is_written_on_close(client):
+    with tracking.TrialLogger("7") as logger:
+        for i in range(120):
+            logger.log_run({"num_leaves": i}, {"rmse": float(i)}, run_name=f"trial-{i}")
+
+    assert logger.n_logged == 120 and logger.n_failed == 0
+    run = client.runs["5"]
+    assert run == {"experiment_id": "7", "terminated": True, "metrics": {"rmse": 5.0},
+                   "params": {"num_leaves": "5"}, "tags": {"mlflow.runName": "trial-5"}}
+
+
+def test_log_run_blocks_once_max_pending_runs_are_queued(client):
+    client.release.clear()  # the store stalls
+    logger = tracking.TrialLogger("0", max_pending=2, batch_size=1)
+    logger.log_run({}, {"rmse": 1.0})
+    assert client.entered.wait(timeout=5)  # taken by the logging thread, which waits on the store
+    logger.log_run({}, {"rmse": 2.0})
+    logger.log_run({}, {"rmse": 3.0})  # queue full now
+
+    blocked = threading.Thread(target=logger.log_run, args=({}, {"rmse": 4.0}))
+    blocked.start()
+    blocked.join(timeout=0.2)
+    assert blocked.is_alive()
+
+    client.release.set()
+    blocked.join(timeout=5)
+    assert not blocked.is_alive()
+    logger.close()
+    assert logger.n_logged == 4
+
+
+def test_tracking_failures_never_raise(monkeypatch, capsys):
+    monkeypatch.setattr(tracking, "MlflowClient", lambda tracking_uri=None: _Client(fail=True))
+    with tracking.TrialLogger("0") as logger:
+        for _ in range(3):
+            logger.log_run({}, {"rmse": 1.0})
+        logger.flush()
+        assert logger.n_failed == 3
+
+    assert capsys.readouterr().out.count("MLflow logging failed") == 1
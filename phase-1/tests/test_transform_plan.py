@@ -0,0 +1,46 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_pipeline.preprocess import OUTLIER_PRICE, load_metro_table
+from src.inference_pipeline.inference import _featurize
+from src.inference_pipeline.registry import ArtifactRegistry
+from src.inference_pipeline.transform_plan import compile_transform_plan
+
+
+@pytest.fixture(scope="module")
+def bundle(artifacts):
+    bundle = ArtifactRegistry().get(artifacts.model_path, artifacts.freq_encoder_path,
+                                    artifacts.target_encoder_path, artifacts.train_features_path)
+    return dataclasses.replace(bundle, metros=load_metro_table(artifacts.metros_path))
+
+
+@pytest.fixture
+def raw(artifacts):
+    df = artifacts.raw.head(200).copy()
+    extra = df.iloc[:6].copy()
+    extra.iloc[0, extra.columns.get_loc("date")] = "2021-12-31"  # duplicate that differs only by date
+    extra.iloc[1, extra.columns.get_loc("city_full")] = f"  {str(extra.iloc[1]['city_full']).upper()} "  # same city after cleaning
+    extra.iloc[2, extra.columns.get_loc("median_list_price")] = OUTLIER_PRICE + 1
+    extra.iloc[3, extra.columns.get_loc("median_list_price")] = OUTLIER_PRICE  # boundary: kept
+    extra.iloc[3, extra.columns.get_loc("homes_sold")] = -1.0
+    extra.iloc[4, extra.columns.get_loc("city_full")] = "Atlantis"  # unknown city: no metro, global mean
+    extra.iloc[5, extra.columns.get_loc("city_full")] = None
+    extra.iloc[4:, extra.columns.get_loc("homes_sold")] = [-2.0, -3.0]
+    return pd.concat([df, extra], ignore_index=False)  # repeated index labels, as in a concatenated input
+
+
+def test_fused_plan_matches_step_by_step_featurization(bundle, raw):
+    before = raw.copy()
+    plan = compile_transform_plan(bundle, tuple(bundle.feature_columns))
+    X, index, y_true = plan.transform(raw)
+    fused = plan.restore_dtypes(plan.to_frame(X, index))
+
+    expected, expected_y = _featurize(raw.copy(), bundle, bundle.feature_columns)
+
+    pd.testing.assert_frame_equal(raw, before)  # the input is never mutated
+    assert len(expected) == len(raw) - 5  # two duplicate pairs dropped, one outlier removed
+    pd.testing.assert_frame_equal(fused, expected)
+    np.testing.assert_array_equal(y_true, np.asarray(expected_y))
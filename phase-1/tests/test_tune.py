@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+from joblib import load
+
+pytest.importorskip("mlflow")
+
+from src.training_pipeline import tune  # noqa: E402
+
+
+@pytest.fixture
+def tune_kwargs(artifacts, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # checkpoints and the dataset cache stay under tmp_path
+    return dict(
+        train_path=artifacts.train_features_path,
+        eval_path=artifacts.root / "processed" / "feature_engineered_eval",
+        encoders_dir=artifacts.root / "models",
+        tracking_uri=f"file:{tmp_path / 'mlruns'}",
+        dataset_cache_dir=tmp_path / "cache",
+    )
+
+
+def _trial_params(storage: str, study_name: str) -> list[tuple]:
+    study = tune.optuna.load_study(study_name=study_name, storage=storage)
+    return sorted(tuple(sorted(t.params.items())) for t in study.trials)
+
+
+def test_seeded_parallel_tuning_is_reproducible(tune_kwargs, tmp_path):
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    runs = []
+    for name in ("first", "second"):
+        best_params, best_metrics = tune.tune_model(
+            **tune_kwargs, model_output=tmp_path / name / "model.pkl", n_trials=4, n_workers=2,
+            storage=storage, study_name=name, pruner="none",
+        )
+        runs.append((best_params, best_metrics, _trial_params(storage, name)))
+
+    # Every worker samples from its own seeded sampler (the startup trials are random),
+    # so the same configurations are tried whichever worker finishes first
+    assert runs[0][2] == runs[1][2] and len(runs[0][2]) == 4
+    assert runs[0][0] == runs[1][0]
+    assert runs[0][1] == pytest.approx(runs[1][1], rel=1e-9)
+    assert not (tmp_path / "data" / ".tune_checkpoints" / "first").exists()
+
+
+class _NoTracking:
+    def log_run(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def datasets(tune_kwargs):
+    X_train, y_train, X_eval, y_eval = tune._load_data(tune_kwargs["train_path"], tune_kwargs["eval_path"], None, 0)
+    train_set = tune.binned_dataset(X_train, y_train, {"random_state": 0, "n_jobs": 1}, cache_dir=None)
+    return train_set, tune.binned_like(X_eval, y_eval, train_set), X_train, y_train, X_eval, y_eval
+
+
+def _study(pruner):
+    return tune.optuna.create_study(direction="minimize", sampler=tune.optuna.samplers.TPESampler(seed=0), pruner=pruner)
+
+
+def test_pruned_trials_stop_at_the_first_report(datasets):
+    train_set, valid_set, _, _, X_eval, y_eval = datasets
+    best = tune._BestTrialModel()
+    study = _study(tune.optuna.pruners.ThresholdPruner(upper=0.0))  # any RMSE prunes
+    study.optimize(tune._make_objective(train_set, valid_set, X_eval, y_eval, 0, 1, best, _NoTracking()), n_trials=3)
+
+    assert all(t.state == tune.optuna.trial.TrialState.PRUNED for t in study.trials)
+    assert all(t.user_attrs["rounds"] == tune.REPORT_EVERY for t in study.trials)
+    assert all(list(t.intermediate_values) == [tune.REPORT_EVERY] for t in study.trials)
+    assert best.model is None
+
+
+def test_completed_trials_early_stop_and_count_the_rounds_run(datasets):
+    train_set, valid_set, _, _, X_eval, y_eval = datasets
+    best = tune._BestTrialModel()
+    study = _study(tune.optuna.pruners.NopPruner())
+    study.optimize(tune._make_objective(train_set, valid_set, X_eval, y_eval, 0, 1, best, _NoTracking()), n_trials=3)
+
+    for trial in study.trials:
+        assert trial.state == tune.optuna.trial.TrialState.COMPLETE
+        assert trial.user_attrs["rounds"] <= trial.params["n_estimators"]
+        steps = list(trial.intermediate_values)
+        assert steps == list(range(tune.REPORT_EVERY, steps[-1] + 1, tune.REPORT_EVERY))
+    # The kept model is cut back to its best iteration; the rounds run include the patience after it
+    assert best.trial_number == study.best_trial.number
+    assert best.model.n_estimators <= best.model.rounds_trained_ <= best.model.n_estimators + tune.EARLY_STOPPING_ROUNDS
+    assert study.best_trial.user_attrs["rounds"] == best.model.rounds_trained_
+
+
+def test_halving_fractions():
+    assert tune.halving_fractions(1 / 9, 3) == [1 / 9, 1 / 3, 1.0]
+    assert tune.halving_fractions(0.2, 2) == [0.125, 0.25, 0.5, 1.0]  # first rung at most min_fraction
+    assert tune.halving_fractions(1.0, 3) == [1.0]
+
+
+def test_time_stratified_fractions_are_nested_and_keep_every_month(datasets):
+    X_train = datasets[2]
+    ranks = tune.time_stratified_ranks(X_train, random_state=0)
+    np.testing.assert_array_equal(ranks, tune.time_stratified_ranks(X_train, random_state=0))
+    months = X_train["year"].astype(int) * 12 + X_train["month"].astype(int)
+    sizes = months.value_counts()
+
+    previous = np.zeros(len(X_train), dtype=bool)
+    for fraction in tune.halving_fractions():
+        selected = ranks < fraction
+        assert not (previous & ~selected).any()  # nested: promotions only add rows
+        kept = months[selected].value_counts().reindex(sizes.index, fill_value=0)
+        assert (kept == np.ceil(sizes * fraction)).all()  # every month keeps its share
+        previous = selected
+    assert previous.all()
+
+
+def test_successive_halving_promotes_the_best_third(datasets):
+    train_set, valid_set, X_train, y_train, X_eval, y_eval = datasets
+    best = tune._BestTrialModel()
+    study = _study(tune.optuna.pruners.NopPruner())
+    tune._successive_halving(study, train_set, valid_set, X_train, y_train, X_eval, y_eval, 9, 0, best, _NoTracking())
+
+    states = [t.state for t in study.trials]
+    assert states.count(tune.optuna.trial.TrialState.COMPLETE) == 1
+    assert states.count(tune.optuna.trial.TrialState.PRUNED) == 8
+    # Rung 0 scores all 9 configurations; the 3 best reach rung 1; the best of those trains on everything
+    rungs = [len(t.intermediate_values) for t in study.trials]
+    assert sorted(rungs) == [1] * 6 + [2] * 2 + [3]
+    third_best = sorted(t.intermediate_values[0] for t in study.trials)[2]
+    assert all(t.intermediate_values[0] <= third_best for t in study.trials if len(t.intermediate_values) > 1)
+    assert best.trial_number == study.best_trial.number
+
+
+def test_best_trial_model_is_reused_not_retrained(tune_kwargs, tmp_path, monkeypatch, capsys):
+    fits = []
+    fit_regressor = tune.fit_regressor
+    monkeypatch.setattr(tune, "fit_regressor", lambda *a, **k: fits.append(1) or fit_regressor(*a, **k))
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    out = tmp_path / "model.pkl"
+
+    _, best_metrics = tune.tune_model(**tune_kwargs, model_output=out, n_trials=3, storage=storage,
+                                      study_name="reuse", pruner="none")
+    assert len(fits) == 3  # one fit per trial, none after the study
+    assert "Reusing the model of trial" in capsys.readouterr().out
+
+    X_eval, y_eval = tune._load_data(tune_kwargs["train_path"], tune_kwargs["eval_path"], None, 0)[2:]
+    saved = load(out)
+    rmse = float(np.sqrt(np.mean((y_eval.to_numpy() - saved.predict(X_eval)) ** 2)))
+    assert rmse == pytest.approx(best_metrics["rmse"], rel=1e-12)
+
+    # Resuming the study without new trials: the best trial has no model in this process
+    fits.clear()
+    tune.tune_model(**tune_kwargs, model_output=out, n_trials=0, storage=storage, study_name="reuse", pruner="none")
+    assert len(fits) == 1
+    assert "Retrained best model" in capsys.readouterr().out